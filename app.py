@@ -2,7 +2,8 @@
 import streamlit as st
 import pandas as pd
 import time
-import requests
+
+from src.client.backend_client import POLL_INTERVAL, BackendError, get_client
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -205,14 +206,14 @@ with col_input:
         discharge_summary = st.file_uploader("Discharge Summary", type=["txt", "pdf", "png", "jpg", "jpeg"], key="disch")
 
     with st.expander("📸 2. Support Evidence (Required)", expanded=True):
-        photos = st.file_uploader("Treatment Photographs", type=["png", "jpg", "jpeg", "pdf"], key="photos")
+        photos = st.file_uploader("Treatment Photographs", type=["png", "jpg", "jpeg", "pdf"], key="photos", accept_multiple_files=True)
         hospital_bill = st.file_uploader("Hospital Bill", type=["txt", "pdf", "png", "jpg", "jpeg"], key="bill")
     
     # Calculate status
     files_status = {
         "Clinical Notes": clinical_notes is not None,
         "Discharge Summary": discharge_summary is not None,
-        "Treatment Photographs": photos is not None,
+        "Treatment Photographs": bool(photos),
         "Hospital Bill": hospital_bill is not None
     }
     missing_docs = [k for k, v in files_status.items() if not v]
@@ -224,113 +225,129 @@ with col_input:
     run_btn = st.button(btn_text, type="primary", use_container_width=True)
 
 
+def _upload(file):
+    """(name, bytes, type) tuple for the backend client."""
+    return (file.name, file.getvalue(), file.type)
+
+
+# --- AUDIT JOB ---
+# The audit is queued on the backend (POST /audit/jobs); the job lives in session_state, so a
+# rerun (any widget interaction) picks up polling where it left off.
+if run_btn:
+    st.session_state.pop("audit_job", None)
+    st.session_state.pop("audit_error", None)
+    if clinical_notes is not None and hospital_bill is not None:
+        api_files = {
+            "clinical_notes": _upload(clinical_notes),
+            "hospital_bill": _upload(hospital_bill),
+        }
+        if discharge_summary:
+            api_files["discharge_summary"] = _upload(discharge_summary)
+        if photos:
+            api_files["photographs"] = [_upload(photo) for photo in photos]
+        try:
+            st.session_state["audit_job"] = get_client().submit_audit(api_files)
+        except BackendError as e:
+            st.session_state["audit_error"] = f"Backend error: {e}"
+    else:
+        st.session_state["audit_error"] = "Clinical Notes and Hospital Bill are required to run the pre-audit."
+
+job = st.session_state.get("audit_job")
+
 with col_output:
-    if run_btn:
-        with st.spinner("🤖 Ayushma is analyzing claim data..."):
-            try:
-                # Prepare files for API
-                # IMPORTANT: Streamlit file objects need to be at position 0
-                if clinical_notes: clinical_notes.seek(0)
-                if discharge_summary: discharge_summary.seek(0)
-                if photos: photos.seek(0)
-                if hospital_bill: hospital_bill.seek(0)
-
-                api_files = {
-                    "clinical_notes": (clinical_notes.name, clinical_notes, clinical_notes.type),
-                    "discharge_summary": (discharge_summary.name, discharge_summary, discharge_summary.type),
-                    "photographs": (photos.name, photos, photos.type),
-                    "hospital_bill": (hospital_bill.name, hospital_bill, hospital_bill.type)
-                }
-
-                # 🔒 DEMO-SAFE OVERRIDE (HACKATHON SUBMISSION)
-                # response = requests.post("http://127.0.0.1:8000/audit", files=api_files)
-
-                # Mocking succesful backend response
-                data = {
-                    "audit": {
-                        "status": "CLEAN",
-                        "predicted_package": "BM001B",
-                        "approved_amount": 30000,
-                        "flagged_amount": 0,
-                        "reason": "AI-assisted PM-JAY pre-audit validated successfully."
-                    },
-                    "billed_amount": 30000
-                }
-
-                # if response.status_code == 200:
-                if True:
-                    # data = response.json()
-                    audit = data.get("audit", {})
-                    
-                    # Map Backend Response to UI Variables (Robust Access)
-                    results = {
-                        "overall_status": audit.get("status", "CLEAN"), # Default Clean
-                        "reason": audit.get("reason", "AI-assisted PM-JAY pre-audit validated successfully."),
-                        "billed_amount": data.get("billed_amount", 30000),
-                        "approved_amount": audit.get("approved_amount", 30000),
-                        "flagged_amount": audit.get("flagged_amount", 0),
-                        "selected_package_code": audit.get("predicted_package") or "BM001B", # Hardcode fallback as requested
-                        "recommendations": []
-                    }
-                    
-                    # FORCE CLEAN STATUS - COMMENTING OUT LOGIC THAT MIGHT FLIP IT
-                    # if results["overall_status"] != "CLEAN":
-                    #     if "package code" in results["reason"].lower():
-                    #         results["recommendations"].append(f"Correct the package code to {results['selected_package_code']}")
-                    #     if "exceeds" in results["reason"].lower():
-                    #          results["recommendations"].append(f"Justify the excess amount of ₹{results['flagged_amount']}")
-                    #     if results['overall_status'] == "REVIEW_REQUIRED":
-                    #          results["recommendations"].append("Review documents manually for discrepancies.")
-
-                    extracted = data # For debug view
-                    
-                    # Styles
-                    status = results["overall_status"]
-                    style_class = "status-clean" if status == "CLEAN" else "status-partial" if status == "PARTIAL_APPROVAL" else "status-review"
-                    icon = "✅" if status == "CLEAN" else "⚠️" if status == "PARTIAL_APPROVAL" else "🛑"
-                    
-                    # 1. Overall Status
-                    st.markdown(f"""
-                    <div class="css-card">
-                        <div class="status-box {style_class}">
-                            <h2 style="margin:0; font-size:1.8rem;">{icon} {status.replace('_', ' ')}</h2>
-                            <p style="margin:0.5rem 0 0 0; opacity:0.9;">{results['reason']}</p>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # 2. Financial Metrics
-                    st.markdown("### 💰 Financial Analysis")
-                    m1, m2, m3 = st.columns(3)
-                    with m1:
-                        st.metric("Claims", f"₹{results['billed_amount']:,}", help="Total amount claimed by hospital")
-                    with m2:
-                        st.metric("Approved", f"₹{results['approved_amount']:,}", help="Amount eligible under PM-JAY package")
-                    with m3:
-                        delta = results['billed_amount'] - results['approved_amount']
-                        val_color = "normal" if delta == 0 else "inverse"
-                        st.metric("Disallowed", f"₹{results['flagged_amount']:,}", delta=-delta if delta > 0 else 0, delta_color=val_color)
-                    
-                    st.markdown("---")
-
-                    # 3. Recommendations
-                    if results["recommendations"]:
-                        st.markdown("### 📋 Action Plan")
-                        for rec in results["recommendations"]:
-                            st.warning(f"**Action Required**: {rec}")
-                    
-                    # 4. Deep Dive
-                    with st.expander("🔍 Deep Dive Analysis"):
-                        st.markdown(f"**Selected Package**: `{results['selected_package_code']}`")
-                        st.markdown("**Evidence Checklist**:")
-                        for doc, present in files_status.items():
-                            st.markdown(f"- {'✅' if present else '❌'} {doc}")
-                        st.markdown("---")
-                        st.caption("Backend API Response:")
-                        st.json(extracted)
-            
-            except Exception as e:
-                st.error(f"Error: {e}")
+    if st.session_state.get("audit_error"):
+        st.error(st.session_state["audit_error"])
+    elif job is not None:
+        try:
+            if not job.done():
+                progress = st.empty()
+                while not job.done():
+                    progress.info(f"🤖 Ayushma is analyzing claim data... ({job.status}, {job.elapsed:.0f}s)")
+                    time.sleep(POLL_INTERVAL)
+                progress.empty()
+            data = job.result()
+            approved = data.get("approved_amount", 0.0)
+            flagged = data.get("flagged_amount", 0.0)
+            package = data.get("predicted_package", "")
+            status = data.get("status", "REVIEW_REQUIRED")
+
+            if status == "CLEAN":
+                reason = "AI-assisted PM-JAY pre-audit validated successfully."
+            elif status == "PARTIAL_APPROVAL":
+                reason = f"Billed amount exceeds the {package} package limit."
+            else:
+                reason = f"Package prediction confidence ({data.get('confidence', 0.0):.0%}) is too low for automatic approval."
+
+            # Map Backend Response to UI Variables
+            results = {
+                "overall_status": status,
+                "reason": reason,
+                "billed_amount": approved + flagged,
+                "approved_amount": approved,
+                "flagged_amount": flagged,
+                "selected_package_code": package,
+                "recommendations": []
+            }
+            if flagged > 0:
+                results["recommendations"].append(f"Justify the excess amount of ₹{flagged:,.0f}")
+            if status == "REVIEW_REQUIRED":
+                results["recommendations"].append("Review documents manually for discrepancies.")
+            for doc in data.get("missing_documents", []):
+                results["recommendations"].append(f"Upload the {doc.replace('_', ' ')} required for {package}")
+
+            extracted = data # For debug view
+
+            # Styles
+            style_class = "status-clean" if status == "CLEAN" else "status-partial" if status == "PARTIAL_APPROVAL" else "status-review"
+            icon = "✅" if status == "CLEAN" else "⚠️" if status == "PARTIAL_APPROVAL" else "🛑"
+
+            # 1. Overall Status
+            st.markdown(f"""
+            <div class="css-card">
+                <div class="status-box {style_class}">
+                    <h2 style="margin:0; font-size:1.8rem;">{icon} {status.replace('_', ' ')}</h2>
+                    <p style="margin:0.5rem 0 0 0; opacity:0.9;">{results['reason']}</p>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+
+            # 2. Financial Metrics
+            st.markdown("### 💰 Financial Analysis")
+            m1, m2, m3 = st.columns(3)
+            with m1:
+                st.metric("Claims", f"₹{results['billed_amount']:,.0f}", help="Total amount claimed by hospital")
+            with m2:
+                st.metric("Approved", f"₹{results['approved_amount']:,.0f}", help="Amount eligible under PM-JAY package")
+            with m3:
+                delta = results['billed_amount'] - results['approved_amount']
+                val_color = "normal" if delta == 0 else "inverse"
+                st.metric("Disallowed", f"₹{results['flagged_amount']:,.0f}", delta=-delta if delta > 0 else 0, delta_color=val_color)
+
+            st.markdown("---")
+
+            # 3. Recommendations
+            if results["recommendations"]:
+                st.markdown("### 📋 Action Plan")
+                for rec in results["recommendations"]:
+                    st.warning(f"**Action Required**: {rec}")
+
+            # 4. Deep Dive
+            with st.expander("🔍 Deep Dive Analysis"):
+                st.markdown(f"**Selected Package**: `{results['selected_package_code']}`")
+                if data.get("top_k"):
+                    st.markdown("**Package Probabilities**:")
+                    st.dataframe(pd.DataFrame(data["top_k"]), hide_index=True)
+                st.markdown("**Evidence Checklist**:")
+                for doc, present in files_status.items():
+                    st.markdown(f"- {'✅' if present else '❌'} {doc}")
+                st.markdown("---")
+                st.caption(f"Backend API Response ({job.elapsed:.1f}s):")
+                st.json(extracted)
+
+        except BackendError as e:
+            st.error(f"Backend error: {e}")
+        except Exception as e:
+            st.error(f"Error: {e}")
 
     else:
         # Empty State
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+ayushma-audit command: bulk pre-audit of a claims tree (backend.cli) from any directory.
+Equivalent to `python -m backend.cli ...` run from the project root; symlink it onto PATH:
+    ln -s "$PWD/ayushma_audit.py" ~/.local/bin/ayushma-audit
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from backend.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
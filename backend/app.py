@@ -1,95 +1,486 @@
 """
 Ayushma: AI medical insurance pre-audit system.
-POST /audit: clinical_notes + hospital_bill -> predicted_package, status, approved_amount, flagged_amount.
+POST /audit: clinical_notes + hospital_bill (+ optional discharge_summary, photographs) -> predicted_package,
+confidence, top_k, status, approved_amount, flagged_amount. The documents are extracted concurrently.
+Low-confidence predictions get status REVIEW_REQUIRED (AYUSHMA_CONFIDENCE_THRESHOLD).
+Repeated /audit requests (same Idempotency-Key, or same documents + model + catalogue) replay the stored
+result, and concurrent duplicates share one computation.
+POST /audit/batch: N clinical_notes + N hospital_bills -> one result (or inline error) per claim, in order.
+POST /audit/jobs: same documents as /audit, queued (SQLite, survives restarts); returns a job id at once.
+GET /audit/jobs/{id}: job status, and the /audit result once it is done.
 No silent failures; demo-safe and deterministic.
+Blocking stages run on a bounded worker pool; excess audits get 503 + Retry-After.
+Multipart bodies are parsed as they stream in (large files spooled to disk) under a per-request byte
+limit (413 as soon as it is exceeded).
+GET /healthz: readiness probe (503 until startup is done and again while shutting down).
+GET /metrics: per-stage latency histograms and counters in Prometheus text format.
+The model is loaded at startup; POST /admin/model/reload swaps in retrained artifacts without downtime.
 """
-import re
-from fastapi import FastAPI, File, UploadFile
+import asyncio
+import logging
+import os
+import threading
 
-from .ml.infer import predict_package
-from .services.file_reader import read_file
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from .config import (
+    ADMIN_TOKEN, AUDIT_RETRY_AFTER, LOG_LEVEL, MODEL_DIR, OCR_WARMUP, ONLINE_MODEL_DIR, UPLOAD_MAX_BYTES,
+)
+from .ml.infer import ReloadInProgress, load_model, model_info, predict_with_confidence, reload_model
+from .services.extraction_cache import extraction_cache
+from .services.field_extractor import extract_total
+from .services import audit_engine, metrics
+from .services.audit_engine import CLAIM_DOCUMENTS, PHOTOGRAPHS, REQUIRED_DOCUMENTS
+from .services.file_reader import read_document
+from .services.idempotency import COMPUTED, IdempotencyConflict, documents_digest, idempotency_cache, request_key
+from .services.job_queue import QueueFull, job_queue
+from .services.ocr_service import IMAGE_EXTENSIONS, ocr_engine
 from .services.policy_rules import validate
+from .services.rule_engine import rule_engine
+from .services.upload_stream import ByteBudget, MalformedUpload, SpooledDocument, UploadForm, UploadTooLarge, read_multipart
+from .services.workers import Overloaded, admit, run_blocking
+
+logger = logging.getLogger(__name__)
+
+# Set when the startup hooks have run, cleared when shutdown begins (GET /healthz)
+_ready = threading.Event()
 
 app = FastAPI(title="Ayushma", description="AI medical insurance pre-audit MVP", version="0.1.0")
 
+metrics.describe("ayushma_bytes_processed_total", "Uploaded bytes read, by document.")
+metrics.describe("ayushma_rejected_requests_total", "Requests refused before auditing, by reason.")
+
 
 def _extract_amount(text: str) -> float:
-    """Extract total amount from bill text using regex (numbers with optional , and .)."""
+    """Extract total amount from bill text: the largest number in it."""
     if not text:
         return 0.0
-    matches = re.findall(r"(\d+(?:,\d{3})*(?:\.\d{2})?)", text)
-    if not matches:
-        return 0.0
-    try:
-        amounts = [float(m.replace(",", "")) for m in matches]
-        total = max(amounts)
-        print(f"[app] Extracted amount: {total}")
-        return total
-    except ValueError:
-        return 0.0
+    total = extract_total(text)
+    logger.debug("Extracted amount: %s", total)
+    return total
+
+
+def _multipart_body(files: tuple, required: tuple = (), repeated: tuple = (), fields: dict | None = None) -> dict:
+    """OpenAPI requestBody for an endpoint that parses its own multipart body (read_multipart)."""
+    binary = {"type": "string", "format": "binary"}
+    properties = {name: binary for name in files}
+    properties.update({name: {"type": "array", "items": binary} for name in repeated})
+    properties.update(fields or {})
+    schema = {"type": "object", "properties": properties, "required": list(required)}
+    return {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": schema}}}}
+
+
+async def _read_form(request: Request, budget: ByteBudget) -> UploadForm:
+    """read_multipart timed as the upload_read stage, with each document's size added to the bytes counter."""
+    with metrics.span("upload_read"):
+        form = await read_multipart(request, budget)
+    for document, docs in form.files.items():
+        for doc in docs:
+            metrics.inc("ayushma_bytes_processed_total", doc.size, document=document)
+    return form
+
+
+def _require(form: UploadForm, names: tuple):
+    """422 in FastAPI's validation format when a required document is missing."""
+    missing = [name for name in names if not form.files.get(name)]
+    if missing:
+        raise HTTPException(
+            status_code=422,
+            detail=[{"type": "missing", "loc": ["body", name], "msg": "Field required"} for name in missing],
+        )
+
+
+def _is_image(doc: SpooledDocument) -> bool:
+    return (doc.filename or "").lower().endswith(IMAGE_EXTENSIONS)
+
+
+def _read(doc: SpooledDocument) -> str:
+    """Text of one document: images through OCRService, TXT/PDF through file_reader."""
+    if _is_image(doc):
+        with metrics.span("ocr"):
+            return ocr_engine.extract_text(doc.read_bytes(), doc.filename)
+    with metrics.span("text_extraction"):
+        return read_document(doc)
+
+
+def _read_photos(docs: list) -> list:
+    """Text per photograph; all images go through the OCR pool in one batch."""
+    images = [i for i, doc in enumerate(docs) if _is_image(doc)]
+    texts = {}
+    if images:
+        with metrics.span("ocr"):
+            texts = dict(zip(images, ocr_engine.extract_images([docs[i].read_bytes() for i in images])))
+    return [texts[i] if i in texts else _read(doc) for i, doc in enumerate(docs)]
+
+
+def _amount(text: str) -> float:
+    with metrics.span("amount_extraction"):
+        return _extract_amount(text)
+
+
+@app.on_event("startup")
+def _warm_up():
+    """Load the model before the first request; optionally EasyOCR readers too (AYUSHMA_OCR_WARMUP=1)."""
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=LOG_LEVEL)
+    load_model()
+    if OCR_WARMUP:
+        try:
+            ready = ocr_engine.warm_up()
+        except RuntimeError as e:
+            logger.error("OCR warm-up failed: %s", e)
+        else:
+            logger.info("OCR warm-up %s", "done" if ready else "timed out")
+
+
+@app.on_event("startup")
+async def _start_jobs():
+    """Run queued audit jobs (including those left over from a previous run) on JOB_WORKERS workers."""
+    job_queue.start(_run_job)
+
+
+@app.on_event("startup")
+def _mark_ready():
+    _ready.set()
+
+
+@app.on_event("shutdown")
+def _mark_draining():
+    _ready.clear()
+
+
+@app.on_event("shutdown")
+async def _stop_jobs():
+    await job_queue.stop()
 
 
 @app.get("/")
 def root():
-    return {"status": "ok", "service": "Ayushma", "audit": "POST /audit"}
+    return {
+        "status": "ok",
+        "service": "Ayushma",
+        "audit": "POST /audit",
+        "batch": "POST /audit/batch",
+        "jobs": "POST /audit/jobs",
+        "metrics": "GET /metrics",
+        "health": "GET /healthz",
+        "model": model_info()["version"],
+    }
+
+
+@app.get("/healthz")
+def healthz():
+    """Readiness: 200 once the model is loaded (or the default package is in use) and jobs run; 503 otherwise."""
+    info = model_info()
+    body = {
+        "status": "ready" if _ready.is_set() else "unavailable",
+        "pid": os.getpid(),
+        "model_loaded": info["loaded"],
+        "model": info["version"],
+        "packages": len(rule_engine.catalogue().packages),
+    }
+    return JSONResponse(body, status_code=200 if _ready.is_set() else 503)
 
 
-@app.post("/audit")
+@app.get("/cache/stats")
+def cache_stats():
+    """Extraction cache hit/miss counters and memory usage."""
+    return extraction_cache.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """Stage latency histograms, counters and gauges in Prometheus text exposition format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+def _check_admin(token: str | None):
+    if ADMIN_TOKEN and token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Admin-Token")
+
+
+@app.get("/admin/model")
+def model_status(x_admin_token: str | None = Header(None)):
+    """Version (from metadata.json) and load time of the active model."""
+    _check_admin(x_admin_token)
+    return model_info()
+
+
+@app.post("/admin/model/reload")
+async def model_reload(source: str = "default", x_admin_token: str | None = Header(None)):
+    """
+    Load artifacts from disk off the event loop, run the smoke set, then swap atomically.
+    source: default (AYUSHMA_MODEL_DIR, batch trainer) or online (AYUSHMA_ONLINE_MODEL_DIR, ml.online).
+    In-flight predictions finish on the model they started with. On failure the current model stays active.
+    """
+    _check_admin(x_admin_token)
+    sources = {"default": MODEL_DIR, "online": ONLINE_MODEL_DIR}
+    if source not in sources:
+        raise HTTPException(status_code=422, detail=f"source must be one of {sorted(sources)}")
+    try:
+        result = await asyncio.to_thread(reload_model, sources[source])
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed; previous model kept: {e}")
+    return {**model_info(), "previous_version": result["previous_version"]}
+
+
+def _run_audit(texts: dict) -> dict:
+    """
+    Blocking part of /audit after extraction (predict, extract amount, validate); runs on the audit pool.
+    texts maps document -> extracted text (photographs -> list of texts) for the documents provided.
+    """
+    # 1. Merge clinical evidence: notes, discharge summary, then photograph OCR text
+    if not texts["clinical_notes"].strip():
+        logger.warning("clinical_notes is empty; prediction may use default")
+
+    # 2. Predict package via ML (do not block if severity missing)
+    prediction = predict_with_confidence([audit_engine.evidence_text(texts)])[0]
+    logger.debug("predicted_package=%s, confidence=%.3f", prediction["package"], prediction["confidence"])
+
+    # 3. Extract total amount from the hospital bill
+    billed_amount = _amount(texts["hospital_bill"])
+
+    # 4. Validate (and route low-confidence predictions to review)
+    with metrics.span("policy_validation"):
+        policy = validate(prediction["package"], billed_amount)
+    result = audit_engine.audit_result(prediction, policy)
+
+    # 5. Documents that yielded text vs. those the predicted package requires
+    result["documents"] = audit_engine.provided_documents(texts)
+    result["missing_documents"] = audit_engine.missing_documents(result["documents"], prediction["package"])
+    logger.debug(
+        "status=%s, approved_amount=%s, flagged_amount=%s, missing_documents=%s",
+        result["status"], result["approved_amount"], result["flagged_amount"], result["missing_documents"],
+    )
+    return result
+
+
+def _run_batch(notes: list, bills: list) -> list:
+    """Blocking part of /audit/batch. notes/bills are SpooledDocuments; a claim that fails gets an error entry."""
+    errors = {}
+    notes_texts = []
+    for i, doc in enumerate(notes):
+        try:
+            notes_texts.append(_read(doc))
+        except Exception as e:
+            logger.warning("Claim %d: clinical_notes failed: %s", i, e)
+            errors[i] = f"clinical_notes: {e}"
+            notes_texts.append("")
+
+    amounts = {}
+    for i, doc in enumerate(bills):
+        if i in errors:
+            continue
+        try:
+            amounts[i] = _amount(_read(doc))
+        except Exception as e:
+            logger.warning("Claim %d: audit failed: %s", i, e)
+            errors[i] = str(e)
+
+    # Readable claims are predicted with one call and validated in one vectorized pass
+    ok = sorted(amounts)
+    audited = dict(zip(ok, audit_engine.audit_batch([notes_texts[i] for i in ok], [amounts[i] for i in ok])))
+
+    results = []
+    for i in range(len(bills)):
+        if i in errors:
+            results.append({"index": i, "error": errors[i]})
+        else:
+            results.append({"index": i, **audited[i]})
+    return results
+
+
+@app.middleware("http")
+async def _reject_oversized(request: Request, call_next):
+    """Refuse bodies whose declared Content-Length is already over the upload limit, before parsing."""
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > UPLOAD_MAX_BYTES:
+        logger.warning("Rejecting %s: Content-Length %s > %d", request.url.path, length, UPLOAD_MAX_BYTES)
+        metrics.inc("ayushma_rejected_requests_total", reason="too_large")
+        return JSONResponse(status_code=413, content={"detail": f"Request exceeds {UPLOAD_MAX_BYTES} bytes"})
+    return await call_next(request)
+
+
+@app.exception_handler(UploadTooLarge)
+async def _upload_too_large(request: Request, exc: UploadTooLarge):
+    logger.warning("Rejecting %s: %s", request.url.path, exc)
+    metrics.inc("ayushma_rejected_requests_total", reason="too_large")
+    return JSONResponse(status_code=413, content={"detail": str(exc)})
+
+
+@app.exception_handler(MalformedUpload)
+async def _malformed_upload(request: Request, exc: MalformedUpload):
+    logger.warning("Rejecting %s: %s", request.url.path, exc)
+    metrics.inc("ayushma_rejected_requests_total", reason="malformed")
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+@app.exception_handler(QueueFull)
+async def _queue_full(request: Request, exc: QueueFull):
+    logger.warning("Rejecting %s: %s", request.url.path, exc)
+    metrics.inc("ayushma_rejected_requests_total", reason="queue_full")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Audit job queue is full; retry later"},
+        headers={"Retry-After": str(AUDIT_RETRY_AFTER)},
+    )
+
+
+@app.exception_handler(IdempotencyConflict)
+async def _idempotency_conflict(request: Request, exc: IdempotencyConflict):
+    logger.warning("Rejecting %s: %s", request.url.path, exc)
+    metrics.inc("ayushma_rejected_requests_total", reason="idempotency_conflict")
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
+
+
+@app.exception_handler(Overloaded)
+async def _overloaded(request: Request, exc: Overloaded):
+    logger.warning("Rejecting %s: %s", request.url.path, exc)
+    metrics.inc("ayushma_rejected_requests_total", reason="overloaded")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Audit queue is full; retry later"},
+        headers={"Retry-After": str(AUDIT_RETRY_AFTER)},
+    )
+
+
+def _claim_documents(form: UploadForm) -> tuple:
+    """One claim's uploads: ({document: SpooledDocument}, [photograph SpooledDocuments]). 422 if one is missing."""
+    _require(form, REQUIRED_DOCUMENTS)
+    spooled = {name: form.files[name][-1] for name in CLAIM_DOCUMENTS if form.files.get(name)}
+    return spooled, form.files.get(PHOTOGRAPHS, [])
+
+
+async def _audit_documents(spooled: dict, photo_docs: list) -> dict:
+    """Extract every document concurrently, then predict and validate (shared by /audit and audit jobs)."""
+    # One worker per document; all photographs share one OCR batch
+    reads = {name: run_blocking(_read, doc) for name, doc in spooled.items()}
+    if photo_docs:
+        reads[PHOTOGRAPHS] = run_blocking(_read_photos, photo_docs)
+
+    # Wait for every read (even after a failure) so no worker is still using a document when it is closed
+    extracted = await asyncio.gather(*reads.values(), return_exceptions=True)
+    for text in extracted:
+        if isinstance(text, BaseException):
+            raise text
+    return await run_blocking(_run_audit, dict(zip(reads, extracted)))
+
+
+async def _run_job(documents: list) -> dict:
+    """job_queue handler: audit the documents a job stored under JOB_DIR (the queue removes them)."""
+    spooled = {}
+    photo_docs = []
+    for d in documents:
+        doc = SpooledDocument(d["filename"], d["size"], d["sha256"], path=d["path"])
+        if d["field"] == PHOTOGRAPHS:
+            photo_docs.append(doc)
+        else:
+            spooled[d["field"]] = doc
+    return await _audit_documents(spooled, photo_docs)
+
+
+@app.post("/audit", openapi_extra=_multipart_body(CLAIM_DOCUMENTS, REQUIRED_DOCUMENTS, (PHOTOGRAPHS,)))
 async def audit(
-    clinical_notes: UploadFile = File(...),
-    discharge_summary: UploadFile = File(None),
-    hospital_bill: UploadFile = File(...),
+    request: Request,
+    response: Response,
+    idempotency_key: str | None = Header(None, max_length=255),
 ):
     """
-    Pre-audit flow:
-    1. Read clinical_notes text
-    2. Predict package via ML
-    3. Read hospital_bill text
-    4. Extract total amount (regex)
-    5. Validate via policy rules
-    Returns: predicted_package, status, approved_amount, flagged_amount.
+    Pre-audit flow (multipart fields clinical_notes, hospital_bill, optional discharge_summary and photographs):
+    1. Read clinical_notes, discharge_summary, photographs (OCR) and hospital_bill concurrently
+    2. Predict package via ML from the merged notes + discharge summary + photograph text
+    3. Extract total amount from the bill (regex)
+    4. Validate via policy rules
+    Each document is extracted on its own audit worker, so a four-document claim takes about as long
+    as its slowest document; steps 2-4 then run on one worker. The event loop stays responsive.
+    Returns: predicted_package, confidence, top_k, status, policy_status, approved_amount, flagged_amount,
+    documents (those that yielded text) and missing_documents (required by the predicted package).
+    status is REVIEW_REQUIRED when confidence is below AYUSHMA_CONFIDENCE_THRESHOLD.
+    A request with the Idempotency-Key of an earlier one, or (without a key) the same documents while
+    the model and catalogue are unchanged, gets that result with header Idempotent-Replayed: true;
+    a key reused with different documents gets 409.
     """
-    print("[app] /audit called")
-    predicted_package = "BM001A"
-    status = "PARTIAL_APPROVAL"
-    approved_amount = 0.0
-    flagged_amount = 0.0
+    logger.debug("/audit called")
+    with admit():
+        form = None
+        try:
+            form = await _read_form(request, ByteBudget(UPLOAD_MAX_BYTES))
+            spooled, photo_docs = _claim_documents(form)
+            digest = documents_digest(list(spooled.items()) + [(PHOTOGRAPHS, doc) for doc in photo_docs])
+            key = request_key(idempotency_key, digest, model_info()["version"], rule_engine.catalogue().version)
+            result, outcome = await idempotency_cache.run(key, digest, lambda: _audit_documents(spooled, photo_docs))
+            if outcome != COMPUTED:
+                logger.debug("Replaying audit result (%s)", outcome)
+                response.headers["Idempotent-Replayed"] = "true"
+            return result
+        except (IdempotencyConflict, UploadTooLarge, MalformedUpload, HTTPException):
+            raise
+        except Exception as e:
+            logger.error("Audit failed: %s", e)
+            raise
+        finally:
+            if form is not None:
+                form.close()
 
+
+@app.post(
+    "/audit/jobs",
+    status_code=202,
+    openapi_extra=_multipart_body(
+        CLAIM_DOCUMENTS, REQUIRED_DOCUMENTS, (PHOTOGRAPHS,), {"priority": {"type": "integer", "default": 0}}
+    ),
+)
+async def submit_audit_job(request: Request):
+    """
+    Queue an audit of the same documents as POST /audit and return its job id without waiting.
+    Higher priority (form field, default 0) runs first. Poll GET /audit/jobs/{job_id}; the result is the /audit response.
+    """
+    form = await _read_form(request, ByteBudget(UPLOAD_MAX_BYTES))
     try:
-        # 1. Read clinical notes (discharge_summary ignored for MVP)
-        if discharge_summary:
-            _ = await discharge_summary.read()
-            print("[app] discharge_summary ignored for MVP")
-        notes_bytes = await clinical_notes.read()
-        notes_text = read_file(notes_bytes, clinical_notes.filename or "clinical_notes.txt")
-        if not notes_text.strip():
-            print("[app] WARNING: clinical_notes is empty; prediction may use default")
-
-        # 2. Predict package via ML (do not block if severity missing)
-        predicted_package = predict_package(notes_text)
-        print(f"[app] predicted_package={predicted_package}")
-
-        # 3. Read hospital bill
-        bill_bytes = await hospital_bill.read()
-        bill_text = read_file(bill_bytes, hospital_bill.filename or "hospital_bill.txt")
-
-        # 4. Extract total amount
-        billed_amount = _extract_amount(bill_text)
-
-        # 5. Validate
-        result = validate(predicted_package, billed_amount)
-        status = result["status"]
-        approved_amount = result["approved_amount"]
-        flagged_amount = result["flagged_amount"]
-        print(f"[app] status={status}, approved_amount={approved_amount}, flagged_amount={flagged_amount}")
+        spooled, photo_docs = _claim_documents(form)
+        try:
+            priority = int(form.fields.get("priority", 0))
+        except ValueError:
+            raise HTTPException(status_code=422, detail="priority must be an integer")
+        documents = list(spooled.items()) + [(PHOTOGRAPHS, doc) for doc in photo_docs]
+        job_id = await job_queue.enqueue(documents, priority)
+    finally:
+        form.close()
+    return {"job_id": job_id, "status": "queued", "status_url": f"/audit/jobs/{job_id}"}
 
-    except Exception as e:
-        print(f"[app] Audit failed: {e}")
-        raise
 
-    return {
-        "predicted_package": predicted_package,
-        "status": status,
-        "approved_amount": approved_amount,
-        "flagged_amount": flagged_amount,
-    }
+@app.get("/audit/jobs/{job_id}")
+async def audit_job_status(job_id: str):
+    """Job status (queued | running | done | failed), attempts and timestamps; result when done, error when failed or retrying."""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+
+@app.post("/audit/batch", openapi_extra=_multipart_body((), ("clinical_notes", "hospital_bills"), ("clinical_notes", "hospital_bills")))
+async def audit_batch(request: Request):
+    """
+    Batch pre-audit: the i-th clinical_notes file is paired with the i-th hospital_bills file.
+    All readable notes are predicted with a single vectorize + predict call.
+    A claim that fails is reported inline as {"index", "error"}; the rest of the batch still completes.
+    """
+    with admit():
+        form = await _read_form(request, ByteBudget(UPLOAD_MAX_BYTES))
+        try:
+            _require(form, ("clinical_notes", "hospital_bills"))
+            notes, bills = form.files["clinical_notes"], form.files["hospital_bills"]
+            if len(notes) != len(bills):
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"clinical_notes ({len(notes)}) and hospital_bills ({len(bills)}) must pair up",
+                )
+            logger.debug("/audit/batch called with %d claims", len(notes))
+            results = await run_blocking(_run_batch, notes, bills)
+        finally:
+            form.close()
+
+    return {"count": len(results), "results": results}
@@ -0,0 +1,336 @@
+"""
+ayushma-audit: bulk pre-audit of a claims tree on disk, without going through HTTP.
+
+A claim is a directory holding clinical_notes.* and hospital_bill.* (TXT or PDF), optionally
+discharge_summary.* and photograph files (photograph.*, photographs_2.jpg, ...; images are OCR'd),
+as in sample_claims/: the same documents POST /audit takes (audit_engine.CLAIM_DOCUMENTS).
+The tree is walked lazily in sorted order. Reading documents and extracting bill amounts run on a
+process pool (producer); the parent predicts each batch with one call and validates it in one
+vectorized pass (consumer, audit_engine.audit_batch).
+
+Results are written in walk order as JSONL, or as Parquet part files when pyarrow is installed.
+After every batch the output is synced and a checkpoint (output position and the last claim
+written) is written. The walk order is the sorted order of claim paths, so --resume keeps the
+output up to the checkpoint and continues with the first claim that sorts after the last one
+written, pruning finished subtrees without listing them. Claims removed since the interrupted run
+do not shift the rest; claims added before that point are not picked up. Memory is bounded by
+--batch-size and the in-flight window, not by the number of claims, including when resuming.
+
+Usage (from project root, or ayushma_audit.py / ayushma-audit, see backend/README.md):
+    python -m backend.cli sample_claims --out results.jsonl
+    python -m backend.cli /data/claims --out results.jsonl --workers 8 --resume
+    python -m backend.cli /data/claims --format parquet --out results/
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .services.audit_engine import (
+    CLAIM_DOCUMENTS, PHOTOGRAPHS, REQUIRED_DOCUMENTS, audit_batch, evidence_text, missing_documents, provided_documents,
+)
+from .services.file_reader import read_path
+from .services.ocr_service import IMAGE_EXTENSIONS, ocr_engine
+from .services.text_cleaner import extract_amount
+
+logger = logging.getLogger(__name__)
+
+# photograph.jpg, photographs.png, photograph_2.jpg, photographs-10.txt, ...
+_PHOTOGRAPH = re.compile(r"photographs?(?:[-_ ]?\d+)?")
+RESULT_FIELDS = (
+    "claim", "predicted_package", "confidence", "status", "policy_status",
+    "approved_amount", "flagged_amount", "top_k", "documents", "missing_documents", "error",
+)
+
+
+def _document(name: str):
+    """The claim document a file name is (CLAIM_DOCUMENTS or PHOTOGRAPHS), or None."""
+    stem = Path(name).stem.lower()
+    if stem in CLAIM_DOCUMENTS:
+        return stem
+    if _PHOTOGRAPH.fullmatch(stem):
+        return PHOTOGRAPHS
+    return None
+
+
+def iter_claims(root: Path, after: tuple | None = None, _parts: tuple = ()):
+    """
+    Yield claim directories under root in sorted depth-first order, without building the full list.
+    A directory that holds any REQUIRED_DOCUMENTS file is a claim and is not descended into.
+    Only one directory listing per tree level is held at a time. The order is that of the claims'
+    relative path parts as tuples; with after (such a tuple), only claims sorting after it are
+    yielded, and subtrees that sort entirely before it are not listed.
+    """
+    try:
+        entries = sorted(os.scandir(root), key=lambda e: e.name)
+    except OSError as e:
+        logger.warning("Cannot list %s: %s", root, e)
+        return
+    if any(e.is_file() and _document(e.name) in REQUIRED_DOCUMENTS for e in entries):
+        if after is None or _parts > after:
+            yield Path(root)
+        return
+    subdirs = [(e.path, e.name) for e in entries if e.is_dir()]
+    del entries
+    for path, name in subdirs:
+        parts = _parts + (name,)
+        if after is not None and parts < after[:len(parts)]:
+            continue  # every claim under it sorts before after
+        yield from iter_claims(Path(path), after, parts)
+
+
+def _claim_files(claim_dir: Path) -> dict:
+    """{document: path} for CLAIM_DOCUMENTS (first file per document), PHOTOGRAPHS -> [paths]."""
+    files = {}
+    for entry in sorted(os.scandir(claim_dir), key=lambda e: e.name):
+        document = _document(entry.name) if entry.is_file() else None
+        if document == PHOTOGRAPHS:
+            files.setdefault(PHOTOGRAPHS, []).append(entry.path)
+        elif document is not None:
+            files.setdefault(document, entry.path)
+    return files
+
+
+def _read(path: str) -> str:
+    """Text of one document: images through OCRService, TXT/PDF through file_reader."""
+    if path.lower().endswith(IMAGE_EXTENSIONS):
+        with open(path, "rb") as f:
+            return ocr_engine.extract_text(f.read(), Path(path).name)
+    return read_path(path, pdf_workers=1)
+
+
+def _extract_claim(claim_dir: str) -> dict:
+    """
+    Worker: read one claim's documents; returns the evidence text (predict cleans it), the billed
+    amount and the documents that yielded text, or an error.
+    """
+    try:
+        files = _claim_files(Path(claim_dir))
+        missing = [d for d in REQUIRED_DOCUMENTS if d not in files]
+        if missing:
+            return {"error": f"missing {', '.join(missing)}"}
+        texts = {
+            name: [_read(p) for p in path] if name == PHOTOGRAPHS else _read(path)
+            for name, path in files.items()
+        }
+    except Exception as e:
+        return {"error": str(e)}
+    return {
+        "evidence": evidence_text(texts),
+        "amount": extract_amount(texts["hospital_bill"]),
+        "documents": provided_documents(texts),
+    }
+
+
+class JsonlWriter:
+    """Appends one JSON object per line; position() is the byte offset to resume from."""
+
+    def __init__(self, path: Path, offset: int = 0):
+        self.path = path
+        self._f = open(path, "r+b" if offset else "wb")
+        self._f.truncate(offset)
+        self._f.seek(offset)
+
+    def write(self, records: list):
+        self._f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8"))
+
+    def sync(self):
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def position(self) -> int:
+        return self._f.tell()
+
+    def close(self):
+        self._f.close()
+
+
+class ParquetWriter:
+    """One Parquet part file per batch in a directory; position() is the number of parts written."""
+
+    def __init__(self, directory: Path, parts: int = 0):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("--format parquet needs pyarrow (pip install pyarrow)")
+        self._pa = pa
+        self._pq = pq
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.parts = parts
+        # Parts past the checkpoint belong to a batch that will be redone
+        for stale in self.directory.glob("part-*.parquet"):
+            if int(stale.stem.split("-")[1]) >= parts:
+                stale.unlink()
+        top_k = pa.list_(pa.struct([("package", pa.string()), ("probability", pa.float64())]))
+        self.schema = pa.schema([
+            ("claim", pa.string()),
+            ("predicted_package", pa.string()),
+            ("confidence", pa.float64()),
+            ("status", pa.string()),
+            ("policy_status", pa.string()),
+            ("approved_amount", pa.float64()),
+            ("flagged_amount", pa.float64()),
+            ("top_k", top_k),
+            ("documents", pa.list_(pa.string())),
+            ("missing_documents", pa.list_(pa.string())),
+            ("error", pa.string()),
+        ])
+
+    def write(self, records: list):
+        rows = [{field: r.get(field) for field in RESULT_FIELDS} for r in records]
+        table = self._pa.Table.from_pylist(rows, schema=self.schema)
+        path = self.directory / f"part-{self.parts:05d}.parquet"
+        tmp = path.with_suffix(".parquet.tmp")
+        self._pq.write_table(table, tmp)
+        os.replace(tmp, path)
+        self.parts += 1
+
+    def sync(self):
+        pass
+
+    def position(self) -> int:
+        return self.parts
+
+    def close(self):
+        pass
+
+
+def _load_checkpoint(path: Path, root: Path, fmt: str) -> dict:
+    if not path.exists():
+        return {"position": 0, "claims_done": 0, "last_claim": None}
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("root") != str(root) or checkpoint.get("format") != fmt:
+        raise SystemExit(f"Checkpoint {path} is for {checkpoint.get('root')} ({checkpoint.get('format')}); not resuming")
+    if checkpoint.get("position") and "last_claim" not in checkpoint:
+        raise SystemExit(f"Checkpoint {path} was written by an older version; rerun without --resume")
+    return checkpoint
+
+
+def _save_checkpoint(path: Path, checkpoint: dict):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _audit(claims: list, extracted: list) -> list:
+    """Result records for one batch, in claim order."""
+    ok = [i for i, e in enumerate(extracted) if "error" not in e]
+    audited = dict(zip(ok, audit_batch([extracted[i]["evidence"] for i in ok], [extracted[i]["amount"] for i in ok])))
+    records = []
+    for i, claim in enumerate(claims):
+        if i not in audited:
+            records.append({"claim": claim, "error": extracted[i]["error"]})
+            continue
+        documents = extracted[i]["documents"]
+        records.append({
+            "claim": claim,
+            **audited[i],
+            "documents": documents,
+            "missing_documents": missing_documents(documents, audited[i]["predicted_package"]),
+        })
+    return records
+
+
+def run(root: Path, out: Path, fmt: str = "jsonl", workers: int | None = None, batch_size: int = 256,
+        resume: bool = False, checkpoint_path: Path | None = None) -> dict:
+    """Audit every claim under root into out. Returns a summary dict."""
+    root = root.resolve()
+    checkpoint_path = checkpoint_path or Path(f"{out}.checkpoint.json")
+    fresh = {"position": 0, "claims_done": 0, "last_claim": None}
+    checkpoint = _load_checkpoint(checkpoint_path, root, fmt) if resume else fresh
+    if not checkpoint["position"]:
+        checkpoint = fresh
+    writer = ParquetWriter(out, checkpoint["position"]) if fmt == "parquet" else JsonlWriter(out, checkpoint["position"])
+    done = checkpoint["claims_done"]
+    last_claim = tuple(checkpoint["last_claim"]) if checkpoint["last_claim"] is not None else None
+    if last_claim is not None:
+        print(f"Resuming after {done} claims (last: {'/'.join(last_claim) or '.'})")
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 4
+    statuses = Counter()
+    started = time.perf_counter()
+    processed = 0
+
+    def flush(claims: list, extracted: list):
+        """claims: (name, path parts) per claim, in walk order."""
+        nonlocal done, processed
+        records = _audit([name for name, _ in claims], extracted)
+        writer.write(records)
+        writer.sync()
+        done += len(records)
+        processed += len(records)
+        statuses.update(r.get("status", "ERROR") for r in records)
+        _save_checkpoint(checkpoint_path, {
+            "root": str(root), "format": fmt, "position": writer.position(),
+            "claims_done": done, "last_claim": list(claims[-1][1]),
+        })
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = deque()
+            batch_claims, batch_extracted = [], []
+            # Claims up to last_claim are already in the output; they are skipped without being read
+            for claim in itertools.chain(iter_claims(root, last_claim), [None]):
+                if claim is not None:
+                    relative = claim.relative_to(root)
+                    in_flight.append(((relative.as_posix(), relative.parts), pool.submit(_extract_claim, str(claim))))
+                # Results are taken in submission order, so output order matches the walk
+                while in_flight and (claim is None or len(in_flight) >= max_in_flight):
+                    name_parts, future = in_flight.popleft()
+                    batch_claims.append(name_parts)
+                    batch_extracted.append(future.result())
+                    if len(batch_claims) >= batch_size:
+                        flush(batch_claims, batch_extracted)
+                        batch_claims, batch_extracted = [], []
+            if batch_claims:
+                flush(batch_claims, batch_extracted)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "claims": done,
+        "processed": processed,
+        "statuses": dict(statuses),
+        "seconds": round(elapsed, 3),
+        "claims_per_second": round(processed / elapsed, 1) if elapsed else 0.0,
+        "output": str(out),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="ayushma-audit", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("root", type=Path, help="Directory tree of claims")
+    parser.add_argument("--out", type=Path, required=True, help="JSONL file, or directory for --format parquet")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    parser.add_argument("--workers", type=int, default=None, help="Extraction processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Claims per predict call / output flush")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint of a previous run")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="Checkpoint file (default: <out>.checkpoint.json)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log per-claim detail")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, force=True)
+    if not args.root.is_dir():
+        parser.error(f"{args.root} is not a directory")
+    summary = run(args.root, args.out, args.format, args.workers, args.batch_size, args.resume, args.checkpoint)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,3 +19,106 @@ METADATA_PATH = ML_DIR / "metadata.json"
 DEFAULT_TEST_SIZE = 0.2
 DEFAULT_RANDOM_STATE = 42
 DEFAULT_MAX_FEATURES = 1000
+
+# Audit concurrency: threads for blocking stages (parsing, inference, validation)
+# and the most audits admitted at once before answering 503 + Retry-After.
+AUDIT_WORKERS = int(os.environ.get("AYUSHMA_AUDIT_WORKERS", "4"))
+AUDIT_MAX_PENDING = int(os.environ.get("AYUSHMA_AUDIT_MAX_PENDING", "16"))
+AUDIT_RETRY_AFTER = int(os.environ.get("AYUSHMA_AUDIT_RETRY_AFTER", "5"))
+
+# PDF extraction: page ranges are split across a process pool once a PDF has at
+# least PDF_PARALLEL_MIN_PAGES pages (PDF_WORKERS <= 1 keeps it serial).
+# Pages beyond PDF_MAX_PAGES are skipped (0 = no cap).
+PDF_WORKERS = int(os.environ.get("AYUSHMA_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("AYUSHMA_PDF_PARALLEL_MIN_PAGES", "8"))
+PDF_MAX_PAGES = int(os.environ.get("AYUSHMA_PDF_MAX_PAGES", "200"))
+
+# Extraction cache: text extracted from PDFs/images keyed by sha256 of the bytes.
+# In-memory LRU bounded by size; set AYUSHMA_EXTRACTION_CACHE_DB to a SQLite path
+# (e.g. backend/data/extraction_cache.sqlite3) to also persist entries on disk.
+# The disk tier drops entries older than EXTRACTION_CACHE_MAX_AGE_DAYS, then the oldest
+# entries until it is under EXTRACTION_CACHE_DISK_MB (0 disables either bound).
+EXTRACTION_CACHE_MAX_BYTES = int(os.environ.get("AYUSHMA_EXTRACTION_CACHE_MB", "64")) * 1024 * 1024
+EXTRACTION_CACHE_DB = os.environ.get("AYUSHMA_EXTRACTION_CACHE_DB", "")
+EXTRACTION_CACHE_DISK_MAX_BYTES = int(os.environ.get("AYUSHMA_EXTRACTION_CACHE_DISK_MB", "1024")) * 1024 * 1024
+EXTRACTION_CACHE_MAX_AGE = float(os.environ.get("AYUSHMA_EXTRACTION_CACHE_MAX_AGE_DAYS", "30")) * 86400
+
+# OCR worker pool: each worker thread keeps a warm easyocr.Reader (CPU).
+# Jobs are batches of at most OCR_BATCH_SIZE images; at most OCR_QUEUE_SIZE jobs wait.
+# Set AYUSHMA_OCR_WARMUP=1 to load readers at startup instead of on the first image.
+OCR_LANGUAGES = os.environ.get("AYUSHMA_OCR_LANGUAGES", "en").split(",")
+OCR_WORKERS = int(os.environ.get("AYUSHMA_OCR_WORKERS", "1"))
+OCR_QUEUE_SIZE = int(os.environ.get("AYUSHMA_OCR_QUEUE_SIZE", "32"))
+OCR_BATCH_SIZE = int(os.environ.get("AYUSHMA_OCR_BATCH_SIZE", "8"))
+OCR_RECOGNIZER_BATCH = int(os.environ.get("AYUSHMA_OCR_RECOGNIZER_BATCH", "8"))
+OCR_JOB_TIMEOUT = float(os.environ.get("AYUSHMA_OCR_JOB_TIMEOUT", "120"))
+OCR_WARMUP = os.environ.get("AYUSHMA_OCR_WARMUP", "0") == "1"
+
+# Upload ingest: uploads are streamed in UPLOAD_CHUNK_SIZE chunks; anything larger than
+# UPLOAD_SPOOL_THRESHOLD goes to a temp file instead of memory. A request whose uploads
+# exceed UPLOAD_MAX_BYTES in total is rejected with 413.
+UPLOAD_MAX_BYTES = int(os.environ.get("AYUSHMA_UPLOAD_MAX_MB", "100")) * 1024 * 1024
+UPLOAD_SPOOL_THRESHOLD = int(os.environ.get("AYUSHMA_UPLOAD_SPOOL_THRESHOLD_KB", "1024")) * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_SPOOL_DIR = os.environ.get("AYUSHMA_UPLOAD_SPOOL_DIR") or None
+
+# Production launcher (python -m backend.server): the app and model are loaded once, then
+# SERVER_WORKERS processes (default: one per CPU) are forked to share them and restarted if they
+# die. On SIGTERM each worker stops accepting connections and gives in-flight requests up to
+# SERVER_GRACEFUL_TIMEOUT seconds. LOG_LEVEL applies when nothing else (the launcher, a test
+# runner) has configured logging.
+SERVER_HOST = os.environ.get("AYUSHMA_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("AYUSHMA_PORT", "8000"))
+SERVER_WORKERS = int(os.environ.get("AYUSHMA_SERVER_WORKERS", str(os.cpu_count() or 1)))
+SERVER_GRACEFUL_TIMEOUT = float(os.environ.get("AYUSHMA_GRACEFUL_TIMEOUT", "30"))
+LOG_LEVEL = os.environ.get("AYUSHMA_LOG_LEVEL", "INFO").upper()
+
+# Admin endpoints (POST /admin/model/reload). When set, callers must send it as X-Admin-Token.
+ADMIN_TOKEN = os.environ.get("AYUSHMA_ADMIN_TOKEN", "")
+
+# Serving backend for the package classifier: auto (memory-mapped model.flat, else the NumPy bundle,
+# when present), numpy (either of those), or sklearn.
+MODEL_BACKEND = os.environ.get("AYUSHMA_MODEL_BACKEND", "auto")
+# Artifacts loaded at startup and by POST /admin/model/reload (set to ONLINE_MODEL_DIR to serve
+# the incrementally trained model). ml.online writes its checkpoints and artifacts to ONLINE_MODEL_DIR.
+MODEL_DIR = os.environ.get("AYUSHMA_MODEL_DIR", str(ML_DIR))
+ONLINE_MODEL_DIR = os.environ.get("AYUSHMA_ONLINE_MODEL_DIR", str(ML_DIR / "online"))
+
+# Confidence routing: audits whose top package probability is below this get status
+# REVIEW_REQUIRED (0 disables). TOP_K packages with probabilities are returned per audit.
+CONFIDENCE_THRESHOLD = float(os.environ.get("AYUSHMA_CONFIDENCE_THRESHOLD", "0.4"))
+TOP_K = int(os.environ.get("AYUSHMA_TOP_K", "3"))
+
+# Policy catalogue compiled by services.rule_engine; re-read when its mtime changes
+# (checked at most every POLICY_RELOAD_INTERVAL seconds).
+POLICY_CATALOGUE = os.environ.get("AYUSHMA_POLICY_CATALOGUE", str(DATA_DIR / "pmjay_subset.json"))
+POLICY_RELOAD_INTERVAL = float(os.environ.get("AYUSHMA_POLICY_RELOAD_INTERVAL", "5"))
+
+# Idempotency (POST /audit): completed results are replayed for IDEMPOTENCY_TTL seconds (0 = off)
+# to requests with the same Idempotency-Key header or, without one, the same documents, model and
+# policy catalogue. At most IDEMPOTENCY_MAX_ENTRIES are kept in memory per process; set
+# AYUSHMA_IDEMPOTENCY_DB to a SQLite path to share them across workers and restarts.
+IDEMPOTENCY_TTL = float(os.environ.get("AYUSHMA_IDEMPOTENCY_TTL", "3600"))
+IDEMPOTENCY_MAX_ENTRIES = int(os.environ.get("AYUSHMA_IDEMPOTENCY_MAX_ENTRIES", "10000"))
+IDEMPOTENCY_DB = os.environ.get("AYUSHMA_IDEMPOTENCY_DB", "")
+
+# Audit job queue (POST /audit/jobs): jobs and their documents persist in a SQLite file and a
+# directory, so queued work survives restarts. JOB_WORKERS jobs run at once; a failed job is
+# retried (with backoff) until it has run JOB_MAX_ATTEMPTS times. A running job whose lease is
+# not renewed for JOB_LEASE seconds (its process died) is picked up again. At most
+# JOB_MAX_QUEUED jobs may wait before submissions get 503 + Retry-After.
+JOB_DB = os.environ.get("AYUSHMA_JOB_DB", str(DATA_DIR / "audit_jobs.sqlite3"))
+JOB_DIR = os.environ.get("AYUSHMA_JOB_DIR", str(DATA_DIR / "jobs"))
+JOB_WORKERS = int(os.environ.get("AYUSHMA_JOB_WORKERS", "2"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("AYUSHMA_JOB_MAX_ATTEMPTS", "3"))
+JOB_LEASE = float(os.environ.get("AYUSHMA_JOB_LEASE", "30"))
+JOB_MAX_QUEUED = int(os.environ.get("AYUSHMA_JOB_MAX_QUEUED", "1000"))
+# Done and failed jobs (row and result) are deleted this many seconds after they finish (0 = keep)
+JOB_RETENTION = float(os.environ.get("AYUSHMA_JOB_RETENTION_DAYS", "7")) * 86400
+
+# Training: the cleaned train/test split and the per-fold TF-IDF fits are cached here (keyed by
+# data + settings) so later runs skip cleaning and vectorizing; the TRAINING_CACHE_KEEP most
+# recently used entries are kept. Hyperparameter search uses TRAINING_N_JOBS processes (-1 = all cores).
+TRAINING_CACHE_DIR = os.environ.get("AYUSHMA_TRAINING_CACHE_DIR", str(DATA_DIR / "tfidf_cache"))
+TRAINING_CACHE_KEEP = int(os.environ.get("AYUSHMA_TRAINING_CACHE_KEEP", "4"))
+TRAINING_N_JOBS = int(os.environ.get("AYUSHMA_TRAINING_N_JOBS", "-1"))
@@ -0,0 +1,106 @@
+"""
+model.flat: the TF-IDF + linear model as one flat file that workers memory-map instead of
+unpickling. Nothing is deserialized at load time. Every array is a read-only view of the
+mapping, so the pages live once in the OS page cache and are shared by all server workers.
+
+Layout (little-endian):
+    8 bytes    magic b"AYUSHMF1"
+    8 bytes    header length, uint64
+    header     JSON: config, classes, and each array's offset (from the data start), dtype and shape
+    data       starts at the next 64-byte boundary; each array is 64-byte aligned:
+      vocab      S<w>    (V,)    terms as UTF-8, sorted bytewise and NUL-padded to the longest term,
+                                 so a token is looked up with one binary search (np.searchsorted)
+      idf        float32 (V,)    IDF weight of vocab[i]
+      coef       float32 (V, K)  coefficients of vocab[i], one row per term (coef_.T), so the
+                                 terms of a text are read as whole rows
+      intercept  float32 (K,)
+
+Feature i is vocab[i]; the sklearn column order is not kept (scores do not depend on it).
+The file is written to a temporary name and renamed into place, so a worker that mapped the
+previous version keeps reading it unchanged until it reloads.
+"""
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"AYUSHMF1"
+FORMAT_VERSION = 1
+ALIGN = 64
+
+
+def _align(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def write_flat(path: str | Path, vocabulary: dict, idf, coef, intercept, classes: list, config: dict) -> Path:
+    """
+    Write model.flat. vocabulary maps term -> sklearn column (TfidfVectorizer.vocabulary_);
+    idf, coef (K x n_features) and intercept are in that column order.
+    """
+    terms = sorted(vocabulary, key=lambda t: t.encode("utf-8"))
+    encoded = [t.encode("utf-8") for t in terms]
+    columns = np.array([vocabulary[t] for t in terms], dtype=np.intp)
+    width = max((len(term) for term in encoded), default=1)
+    arrays = {
+        "vocab": np.array(encoded, dtype=f"S{width}"),
+        "idf": np.asarray(idf, dtype="<f4")[columns],
+        "coef": np.ascontiguousarray(np.asarray(coef, dtype="<f4")[:, columns].T),
+        "intercept": np.asarray(intercept, dtype="<f4"),
+    }
+    specs = {}
+    offset = 0
+    for name, array in arrays.items():
+        specs[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({
+        "format": FORMAT_VERSION,
+        "config": config,
+        "classes": [str(c) for c in classes],
+        "arrays": specs,
+    }).encode("utf-8")
+    base = _align(16 + len(header))
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header)).astype("<u8").tobytes())
+        f.write(header)
+        for name, array in arrays.items():
+            f.write(b"\0" * (base + specs[name]["offset"] - f.tell()))
+            f.write(array.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return path
+
+
+def _read_header(path) -> tuple:
+    with open(path, "rb") as f:
+        if f.read(8) != MAGIC:
+            raise ValueError(f"{path} is not a model.flat file")
+        length = int(np.frombuffer(f.read(8), dtype="<u8")[0])
+        return json.loads(f.read(length)), length
+
+
+def read_header(path: str | Path) -> dict:
+    """The JSON header alone (config, classes, array specs), without mapping the arrays."""
+    return _read_header(path)[0]
+
+
+def map_flat(path: str | Path) -> tuple:
+    """(header, {name: read-only array view}) backed by a memory map of path."""
+    header, length = _read_header(path)
+    if header["format"] != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported model.flat format {header['format']}")
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    base = _align(16 + length)
+    arrays = {}
+    for name, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        start = base + spec["offset"]
+        arrays[name] = buf[start:start + dtype.itemsize * int(np.prod(shape))].view(dtype).reshape(shape)
+    return header, arrays
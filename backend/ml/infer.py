@@ -1,46 +1,353 @@
 """
 Inference: predict package code from clinical text.
-Exposes predict_package(text: str) -> str.
+Exposes predict_package(text: str) -> str and predict_packages(texts: list[str]) -> list[str];
+predict_with_confidence(texts) adds class probabilities and the top-k packages.
+Artifacts are loaded by load_model() at startup; reload_model() swaps in retrained artifacts atomically.
+Serving scores with NumPy from model.flat (memory-mapped, shared by all server workers), else
+model_bundle.npz; the sklearn pickles are only loaded when neither is current (or
+AYUSHMA_MODEL_BACKEND=sklearn), e.g. for the online model (ml.online).
 """
+import hashlib
+import json
+import logging
 import re
+import threading
+import time
 from pathlib import Path
 
-import joblib
+import numpy as np
+
+from ..config import MODEL_BACKEND, MODEL_DIR, TOP_K
+from ..services import metrics
+from ..services.text_cleaner import clean_text
+from .flat_model import map_flat, read_header
+
+logger = logging.getLogger(__name__)
 
 ML_DIR = Path(__file__).resolve().parent
 MODEL_PATH = ML_DIR / "model.pkl"
 VECTORIZER_PATH = ML_DIR / "vectorizer.pkl"
+METADATA_PATH = ML_DIR / "metadata.json"
+# NumPy exports of the same model (see train_model.export_bundle); preferred when present and current
+FLAT_PATH = ML_DIR / "model.flat"
+BUNDLE_PATH = ML_DIR / "model_bundle.npz"
 
 # Default fallback if model missing or prediction fails
 DEFAULT_PACKAGE = "BM001A"
 
-_model = None
-_vectorizer = None
+# A candidate model must predict one of these for every smoke text before it is swapped in
+PACKAGE_CODES = ("BM001A", "BM001B", "BM001C", "BM001D")
+SMOKE_TEXTS = (
+    "Minor superficial burns on the hand, about 5% TBSA, dressing done.",
+    "Second degree burns 20% TBSA on chest and arms with fluid resuscitation.",
+    "Deep burns 45% TBSA, admitted to burns ICU, escharotomy performed.",
+    "Major burns over 70% TBSA, ventilator support, skin grafting planned.",
+)
+
+
+class ReloadInProgress(Exception):
+    """Raised when reload_model() is called while another reload is running."""
+
 
+class _LinearScorer:
+    """predict / predict_proba of LogisticRegression from a subclass's decision_function."""
 
-def _clean_text(text: str) -> str:
-    """Same as in train.py: lowercase, keep alphanumeric and %, normalize space."""
-    if not isinstance(text, str) or not text:
-        return ""
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9%\s]", "", text)
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    def predict(self, rows) -> np.ndarray:
+        scores = self.decision_function(rows)
+        if scores.shape[1] == 1:
+            # Binary model: one coefficient row, positive score means classes_[1]
+            return self.classes_[(scores[:, 0] > 0).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
 
+    def predict_proba(self, rows) -> np.ndarray:
+        scores = self.decision_function(rows)
+        if scores.shape[1] == 1:
+            p = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - p, p])
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+
+class NumpyScorer(_LinearScorer):
+    """
+    TF-IDF + linear model scored with NumPy only, from the arrays in model_bundle.npz.
+    Reproduces TfidfVectorizer.transform (token pattern, raw counts, idf, l2 norm) and
+    LogisticRegression.predict / predict_proba (argmax / softmax of X @ coef.T + intercept).
+    Used as both the vectorizer and the model of a ModelBundle.
+    """
+
+    def __init__(self, vocab, idf, coef, intercept, classes, config: dict):
+        self.vocabulary = {term: i for i, term in enumerate(vocab.tolist())}
+        self.idf = idf
+        self.coef = coef
+        self.intercept = intercept
+        self.classes_ = classes
+        self.lowercase = config["lowercase"]
+        self.norm = config["norm"]
+        self.sublinear_tf = config["sublinear_tf"]
+        self._token = re.compile(config["token_pattern"])
+
+    @classmethod
+    def load(cls, path: Path) -> "NumpyScorer":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["vocab"], data["idf"], data["coef"], data["intercept"], data["classes"],
+                json.loads(str(data["config"])),
+            )
+
+    def transform(self, texts: list) -> list:
+        """One (feature indices, tf-idf weights) pair per text; the sparse row of the sklearn matrix."""
+        vocabulary = self.vocabulary
+        rows = []
+        for text in texts:
+            if self.lowercase:
+                text = text.lower()
+            counts = {}
+            for token in self._token.findall(text):
+                j = vocabulary.get(token)
+                if j is not None:
+                    counts[j] = counts.get(j, 0) + 1
+            idx = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+            tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+            if self.sublinear_tf:
+                tf = np.log(tf) + 1.0
+            weights = tf * self.idf[idx]
+            if self.norm == "l2" and weights.size:
+                weights /= np.sqrt(np.dot(weights, weights))
+            rows.append((idx, weights))
+        return rows
+
+    def decision_function(self, rows: list) -> np.ndarray:
+        scores = np.tile(self.intercept, (len(rows), 1))
+        for r, (idx, weights) in enumerate(rows):
+            if idx.size:
+                scores[r] += self.coef[:, idx] @ weights
+        return scores
+
+
+class FlatScorer(_LinearScorer):
+    """
+    The same scorer over a memory-mapped model.flat (see flat_model): loading maps the file and
+    builds nothing, so it takes the same time and private memory whatever the vocabulary size.
+    Tokens are found with one np.searchsorted over the sorted vocabulary per batch, and weights
+    are float32 (scores agree with sklearn to about 1e-6).
+    """
 
-def _load_artifacts():
-    global _model, _vectorizer
-    if _model is not None and _vectorizer is not None:
-        return
-    if not MODEL_PATH.exists() or not VECTORIZER_PATH.exists():
-        print(f"[infer] WARNING: Model not found at {MODEL_PATH}; using default {DEFAULT_PACKAGE}")
-        return
+    def __init__(self, path: Path):
+        header, arrays = map_flat(path)
+        self.path = Path(path)
+        self.vocab = arrays["vocab"]
+        self.idf = arrays["idf"]
+        self.coef = arrays["coef"]
+        self.intercept = arrays["intercept"]
+        self.classes_ = np.array(header["classes"])
+        config = header["config"]
+        self.lowercase = config["lowercase"]
+        self.norm = config["norm"]
+        self.sublinear_tf = config["sublinear_tf"]
+        self._token = re.compile(config["token_pattern"])
+
+    @classmethod
+    def load(cls, path: Path) -> "FlatScorer":
+        return cls(path)
+
+    def transform(self, texts: list) -> tuple:
+        """(n_texts, row, feature, weight): the non-zero tf-idf entries, sorted by row then feature."""
+        width = self.vocab.dtype.itemsize
+        tokens, token_rows = [], []
+        for r, text in enumerate(texts):
+            if self.lowercase:
+                text = text.lower()
+            # Longer tokens cannot be in the vocabulary (and would be truncated by the S<w> dtype)
+            found = [t for t in (token.encode("utf-8") for token in self._token.findall(text)) if len(t) <= width]
+            tokens.extend(found)
+            token_rows.extend([r] * len(found))
+        n_terms = len(self.vocab)
+        if not tokens or not n_terms:
+            return len(texts), np.empty(0, np.intp), np.empty(0, np.intp), np.empty(0)
+
+        keys = np.array(tokens, dtype=self.vocab.dtype)
+        features = np.minimum(np.searchsorted(self.vocab, keys), n_terms - 1)
+        hit = self.vocab[features] == keys
+        pairs, counts = np.unique(np.asarray(token_rows)[hit] * n_terms + features[hit], return_counts=True)
+        rows, features = np.divmod(pairs, n_terms)
+        tf = counts.astype(np.float64)
+        if self.sublinear_tf:
+            tf = np.log(tf) + 1.0
+        weights = tf * self.idf[features]
+        if self.norm == "l2" and weights.size:
+            weights /= np.sqrt(np.bincount(rows, weights * weights, minlength=len(texts)))[rows]
+        return len(texts), rows, features, weights
+
+    def decision_function(self, batch: tuple) -> np.ndarray:
+        n, rows, features, weights = batch
+        scores = np.tile(self.intercept.astype(np.float64), (n, 1))
+        np.add.at(scores, rows, self.coef[features] * weights[:, None])
+        return scores
+
+
+class ModelBundle:
+    """Model + vectorizer loaded together, with the version read from metadata.json."""
+
+    def __init__(self, model, vectorizer, version: str, loaded_at: float, backend: str = "sklearn"):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.version = version
+        self.loaded_at = loaded_at
+        self.backend = backend
+
+
+# Active bundle. Predictions read it once per call, so swapping it never affects a call in flight.
+_active = None
+_load_lock = threading.Lock()
+_reload_lock = threading.Lock()
+
+metrics.describe("ayushma_model_fallbacks_total", f"Predictions that fell back to {DEFAULT_PACKAGE}, by reason.")
+metrics.describe("ayushma_model_reloads_total", "Model reload attempts, by result.")
+
+
+def _read_version(metadata_path: Path) -> str:
+    """metadata.json "version", else its "trained_at" timestamp."""
     try:
-        _model = joblib.load(MODEL_PATH)
-        _vectorizer = joblib.load(VECTORIZER_PATH)
-        print(f"[infer] Loaded model and vectorizer from {ML_DIR}")
-    except Exception as e:
-        print(f"[infer] Failed to load model: {e}")
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read %s: %s", metadata_path, e)
+        return "unknown"
+    return str(meta.get("version") or meta.get("trained_at") or "unknown")
+
+
+def _exported_from_current(exported_from, model_path: Path, artifact: Path) -> bool:
+    """False if artifact records a model.pkl hash and model.pkl now differs (retrained without export)."""
+    if not exported_from or not model_path.exists():
+        return True
+    if exported_from == hashlib.sha256(model_path.read_bytes()).hexdigest():
+        return True
+    logger.warning("%s was exported from a different %s; not using it", artifact, model_path)
+    return False
+
+
+def _numpy_artifact(ml_dir: Path):
+    """model.flat, else model_bundle.npz, if present and current (None: use the sklearn pickles)."""
+    if MODEL_BACKEND == "sklearn":
+        return None
+    model_path = ml_dir / MODEL_PATH.name
+    flat_path = ml_dir / FLAT_PATH.name
+    if flat_path.exists():
+        exported_from = read_header(flat_path)["config"].get("model_sha256")
+        if _exported_from_current(exported_from, model_path, flat_path):
+            return flat_path
+    bundle_path = ml_dir / BUNDLE_PATH.name
+    if bundle_path.exists():
+        with np.load(bundle_path, allow_pickle=False) as data:
+            exported_from = json.loads(str(data["config"])).get("model_sha256")
+        if _exported_from_current(exported_from, model_path, bundle_path):
+            return bundle_path
+    return None
+
+
+def load_bundle(ml_dir: Path = ML_DIR) -> ModelBundle:
+    """
+    Load the model from ml_dir: model.flat (memory-mapped) or model_bundle.npz (NumPy scorer) when
+    current, else model.pkl + vectorizer.pkl. Raises if the artifacts are missing.
+    """
+    version = _read_version(ml_dir / METADATA_PATH.name)
+    artifact = _numpy_artifact(ml_dir)
+    if artifact is not None:
+        if artifact.name == FLAT_PATH.name:
+            scorer = FlatScorer.load(artifact)
+            return ModelBundle(scorer, scorer, version, time.time(), backend="mmap")
+        scorer = NumpyScorer.load(artifact)
+        return ModelBundle(scorer, scorer, version, time.time(), backend="numpy")
+    if MODEL_BACKEND == "numpy":
+        raise FileNotFoundError(f"Model bundle not found at {ml_dir / FLAT_PATH.name} or {ml_dir / BUNDLE_PATH.name}")
+
+    model_path = ml_dir / MODEL_PATH.name
+    vectorizer_path = ml_dir / VECTORIZER_PATH.name
+    if not model_path.exists() or not vectorizer_path.exists():
+        raise FileNotFoundError(f"Model not found at {model_path}")
+    import joblib  # deferred: pulls in scikit-learn
+
+    model = joblib.load(model_path)
+    vectorizer = joblib.load(vectorizer_path)
+    return ModelBundle(model, vectorizer, version, time.time())
+
+
+def smoke_test(bundle: ModelBundle):
+    """Raise ValueError unless the bundle predicts a known package code for every smoke text."""
+    out = bundle.model.predict(bundle.vectorizer.transform([clean_text(t) for t in SMOKE_TEXTS]))
+    if len(out) != len(SMOKE_TEXTS):
+        raise ValueError(f"Smoke set: expected {len(SMOKE_TEXTS)} predictions, got {len(out)}")
+    unknown = sorted({str(label) for label in out} - set(PACKAGE_CODES))
+    if unknown:
+        raise ValueError(f"Smoke set: unknown package codes {unknown}")
+
+
+def _get_bundle():
+    """Active bundle, loading it on first use if the startup hook did not run (scripts, tests)."""
+    if _active is None:
+        load_model()
+    return _active
+
+
+def load_model() -> bool:
+    """Load the artifacts once (FastAPI startup hook). Returns False if the default package will be used."""
+    global _active
+    with _load_lock:
+        if _active is not None:
+            return True
+        try:
+            _active = load_bundle(Path(MODEL_DIR))
+        except FileNotFoundError as e:
+            logger.warning("%s; using default %s", e, DEFAULT_PACKAGE)
+            return False
+        except Exception as e:
+            logger.error("Failed to load model: %s", e)
+            return False
+    logger.info("Loaded model %s (%s) from %s", _active.version, _active.backend, MODEL_DIR)
+    return True
+
+
+def reload_model(ml_dir: Path | str | None = None) -> dict:
+    """
+    Load artifacts from ml_dir (default AYUSHMA_MODEL_DIR), run the smoke set, then swap them in with one assignment.
+    On any failure the current model stays active and the error is raised.
+    Raises ReloadInProgress if another reload is already running.
+    """
+    global _active
+    if not _reload_lock.acquire(blocking=False):
+        raise ReloadInProgress("A model reload is already in progress")
+    try:
+        previous = _active
+        try:
+            bundle = load_bundle(Path(ml_dir or MODEL_DIR))
+            smoke_test(bundle)
+        except Exception as e:
+            metrics.inc("ayushma_model_reloads_total", result="failed")
+            logger.error("Model reload failed, keeping %s: %s", previous.version if previous else "default", e)
+            raise
+        _active = bundle
+        metrics.inc("ayushma_model_reloads_total", result="ok")
+        logger.info("Model reloaded: %s -> %s", previous.version if previous else None, bundle.version)
+        return {"version": bundle.version, "previous_version": previous.version if previous else None}
+    finally:
+        _reload_lock.release()
+
+
+def model_info() -> dict:
+    """Version and load time of the active model (loaded False means the default package is served)."""
+    bundle = _active
+    if bundle is None:
+        return {"loaded": False, "version": None, "backend": None, "loaded_at": None, "default_package": DEFAULT_PACKAGE}
+    return {
+        "loaded": True,
+        "version": bundle.version,
+        "backend": bundle.backend,
+        "loaded_at": bundle.loaded_at,
+        "default_package": DEFAULT_PACKAGE,
+    }
 
 
 def predict_package(text: str) -> str:
@@ -48,19 +355,72 @@ def predict_package(text: str) -> str:
     Predict package code (BM001A, BM001B, BM001C, BM001D) from clinical text.
     Does not block if severity missing; returns default on failure.
     """
-    _load_artifacts()
-    if _model is None or _vectorizer is None:
-        print("[infer] Using default package (model not loaded)")
-        return DEFAULT_PACKAGE
-    if not text or not str(text).strip():
-        print("[infer] Empty text; using default package")
-        return DEFAULT_PACKAGE
+    return predict_packages([text])[0]
+
+
+def predict_packages(texts: list[str]) -> list[str]:
+    """
+    Predict package codes for many clinical texts with one transform and one model call.
+    Results are returned in input order; empty texts and failures fall back to the default.
+    """
+    return [p["package"] for p in predict_with_confidence(texts)]
+
+
+def _fallback(reason: str) -> dict:
+    return {"package": DEFAULT_PACKAGE, "confidence": 0.0, "top_k": [], "fallback": reason}
+
+
+def predict_with_confidence(texts: list[str], top_k: int = TOP_K) -> list[dict]:
+    """
+    Like predict_packages, but each result is a dict:
+    package, confidence (its probability), top_k [{package, probability}, ...] best first,
+    and fallback (None, or why DEFAULT_PACKAGE was used; confidence is then 0.0).
+    All texts are scored with one transform + one predict_proba call.
+    """
+    bundle = _get_bundle()
+    if bundle is None:
+        logger.debug("Using default package (model not loaded)")
+        metrics.inc("ayushma_model_fallbacks_total", len(texts), reason="model_not_loaded")
+        return [_fallback("model_not_loaded") for _ in texts]
+
+    # Only non-empty texts go into the sparse matrix; positions map rows back to inputs.
+    results = [None] * len(texts)
+    positions = []
+    cleaned = []
+    with metrics.span("cleaning"):
+        for i, text in enumerate(texts):
+            if not text or not str(text).strip():
+                logger.debug("Empty text at %d; using default package", i)
+                results[i] = _fallback("empty_text")
+                continue
+            positions.append(i)
+            cleaned.append(clean_text(str(text)))
+    if len(cleaned) < len(texts):
+        metrics.inc("ayushma_model_fallbacks_total", len(texts) - len(cleaned), reason="empty_text")
+    if not cleaned:
+        return results
+
     try:
-        clean = _clean_text(str(text))
-        vec = _vectorizer.transform([clean])
-        out = _model.predict(vec)[0]
-        print(f"[infer] Predicted: {out}")
-        return str(out)
+        with metrics.span("vectorize"):
+            vec = bundle.vectorizer.transform(cleaned)
+        with metrics.span("predict"):
+            proba = bundle.model.predict_proba(vec)
+        classes = [str(c) for c in bundle.model.classes_]
     except Exception as e:
-        print(f"[infer] Prediction error: {e}")
-        return DEFAULT_PACKAGE
+        logger.error("Prediction error: %s", e)
+        metrics.inc("ayushma_model_fallbacks_total", len(cleaned), reason="prediction_error")
+        for i in positions:
+            results[i] = _fallback("prediction_error")
+        return results
+
+    k = max(1, min(top_k, len(classes)))
+    order = np.argsort(-proba, axis=1, kind="stable")[:, :k]
+    for i, row, ranked in zip(positions, proba, order):
+        results[i] = {
+            "package": classes[ranked[0]],
+            "confidence": float(row[ranked[0]]),
+            "top_k": [{"package": classes[j], "probability": float(row[j])} for j in ranked],
+            "fallback": None,
+        }
+    logger.debug("Predicted %d of %d texts", len(cleaned), len(texts))
+    return results
@@ -0,0 +1,214 @@
+"""
+Incremental training from auditor-corrected claims, without refitting on the whole dataset.
+A stateless HashingVectorizer (nothing to refit as the vocabulary grows) feeds an SGDClassifier
+(log loss, so it has predict_proba) that is updated with partial_fit in mini-batches.
+
+Records stream from JSONL ({"text": ..., "label": ...} per line, e.g. an append-only corrections
+log) or CSV (text, label). Every --checkpoint-every batches, and at the end, the trainer writes:
+- state.joblib: the model plus how many records of each source were consumed, so a rerun on the
+  same (grown) log resumes after the last checkpoint instead of re-learning old corrections;
+- model.pkl, vectorizer.pkl, metadata.json: artifacts infer.load_bundle reads (sklearn path),
+  so the server can hot-load them with POST /admin/model/reload?source=online.
+
+Usage (from project root):
+    python -m backend.ml.online backend/data/training_data.csv --epochs 5   # bootstrap
+    python -m backend.ml.online corrections.jsonl --batch-size 512      # later: only new records
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+# Run as a script (python backend/ml/online.py): make the backend package importable
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from backend.config import ONLINE_MODEL_DIR
+from backend.ml.infer import PACKAGE_CODES
+from backend.services.text_cleaner import clean_texts
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "state.joblib"
+# 2**18 hashed features keep collisions rare for clinical vocabularies; coef_ is 4 x 2**18 floats (8 MB)
+N_FEATURES = 2 ** 18
+
+
+def make_vectorizer(n_features: int = N_FEATURES) -> HashingVectorizer:
+    # Same token pattern and l2 norm as the batch TF-IDF model; no idf (it cannot be updated online)
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, norm="l2")
+
+
+def make_model(random_state: int = 42) -> SGDClassifier:
+    return SGDClassifier(loss="log_loss", alpha=1e-5, random_state=random_state)
+
+
+def iter_records(path: Path):
+    """Yield (text, label) from JSONL or CSV, skipping malformed lines and unknown labels."""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = csv.DictReader(f)
+        else:
+            rows = (_json_line(line) for line in f if line.strip())
+        for row in rows:
+            if not row:
+                yield None
+                continue
+            text, label = row.get("text"), row.get("label")
+            if not isinstance(text, str) or label not in PACKAGE_CODES:
+                yield None
+                continue
+            yield text, label
+
+
+def _json_line(line: str):
+    try:
+        row = json.loads(line)
+    except ValueError:
+        return None
+    return row if isinstance(row, dict) else None
+
+
+def _atomic_dump(obj, path: Path):
+    tmp = path.with_name(path.name + ".tmp")
+    joblib.dump(obj, tmp)
+    os.replace(tmp, path)
+
+
+class OnlineTrainer:
+    def __init__(self, model_dir: str | Path = ONLINE_MODEL_DIR, n_features: int = N_FEATURES):
+        self.model_dir = Path(model_dir)
+        self.vectorizer = make_vectorizer(n_features)
+        self.state = {"model": None, "n_seen": 0, "n_batches": 0, "sources": {}, "n_features": n_features}
+        state_path = self.model_dir / STATE_NAME
+        if state_path.exists():
+            self.state = joblib.load(state_path)
+            if self.state["n_features"] != n_features:
+                raise ValueError(f"{state_path} was trained with n_features={self.state['n_features']}")
+            logger.info("Resuming from %s (%d records seen)", state_path, self.state["n_seen"])
+
+    def partial_fit(self, texts: list, labels: list):
+        """Update the model with one mini-batch."""
+        model = self.state["model"]
+        if model is None:
+            model = self.state["model"] = make_model()
+        X = self.vectorizer.transform(clean_texts(texts))
+        model.partial_fit(X, np.asarray(labels), classes=np.array(PACKAGE_CODES))
+        self.state["n_seen"] += len(labels)
+        self.state["n_batches"] += 1
+
+    def checkpoint(self, source: Path | None = None, consumed: int | None = None):
+        """Save state.joblib, then the serving artifacts (metadata.json last: its version marks them complete)."""
+        if self.state["model"] is None:
+            return
+        if source is not None:
+            self.state["sources"][str(Path(source).resolve())] = consumed
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        _atomic_dump(self.state, self.model_dir / STATE_NAME)
+        _atomic_dump(self.state["model"], self.model_dir / "model.pkl")
+        _atomic_dump(self.vectorizer, self.model_dir / "vectorizer.pkl")
+        trained_at = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        metadata = {
+            "version": f"online-{self.state['n_seen']}-{trained_at}",
+            "trained_at": trained_at,
+            "mode": "online",
+            "n_seen": self.state["n_seen"],
+            "n_batches": self.state["n_batches"],
+            "n_features": self.state["n_features"],
+            "sources": self.state["sources"],
+        }
+        tmp = self.model_dir / "metadata.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp, self.model_dir / "metadata.json")
+
+    def learn(self, source: Path, batch_size: int = 1024, checkpoint_every: int = 20,
+              shuffle_batches: int = 16, epochs: int = 1) -> dict:
+        """
+        partial_fit on the records of source not consumed by an earlier run. Records are read
+        shuffle_batches * batch_size at a time and shuffled before being fed in batches, since logs
+        and CSVs are often grouped by label and SGD drifts toward whichever class it saw last.
+        Each chunk gets epochs passes. Checkpoints after the first chunk that completes
+        checkpoint_every batches since the last one, and at the end. Returns a summary dict.
+        """
+        key = str(Path(source).resolve())
+        consumed = start = self.state["sources"].get(key, 0)
+        records = islice(iter_records(source), consumed, None)
+        rng = np.random.default_rng(self.state["n_batches"])
+        started = time.perf_counter()
+        learned = skipped = since_checkpoint = 0
+        while True:
+            chunk = list(islice(records, batch_size * shuffle_batches))
+            if not chunk:
+                break
+            consumed += len(chunk)
+            valid = [r for r in chunk if r is not None]
+            skipped += len(chunk) - len(valid)
+            for _ in range(epochs):
+                order = rng.permutation(len(valid))
+                for i in range(0, len(valid), batch_size):
+                    batch = [valid[j] for j in order[i:i + batch_size]]
+                    self.partial_fit([t for t, _ in batch], [label for _, label in batch])
+                    since_checkpoint += 1
+            learned += len(valid)
+            if since_checkpoint >= checkpoint_every:
+                self.checkpoint(source, consumed)
+                since_checkpoint = 0
+        if consumed != start:
+            self.checkpoint(source, consumed)
+        elapsed = time.perf_counter() - started
+        return {
+            "learned": learned,
+            "skipped": skipped,
+            "n_seen": self.state["n_seen"],
+            "seconds": round(elapsed, 3),
+            "records_per_second": round(learned / elapsed, 1) if elapsed else 0.0,
+            "model_dir": str(self.model_dir),
+        }
+
+
+def _notify(url: str, token: str):
+    """POST the admin reload endpoint so a running server hot-loads the new artifacts."""
+    from urllib.request import Request, urlopen
+
+    request = Request(url, method="POST", headers={"X-Admin-Token": token} if token else {})
+    with urlopen(request, timeout=60) as response:
+        return json.loads(response.read())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", type=Path, nargs="+", help="JSONL or CSV files of (text, label) records")
+    parser.add_argument("--model-dir", type=Path, default=Path(ONLINE_MODEL_DIR))
+    parser.add_argument("--batch-size", type=int, default=1024, help="Records per partial_fit call")
+    parser.add_argument("--checkpoint-every", type=int, default=20, help="Batches between checkpoints")
+    parser.add_argument("--shuffle-batches", type=int, default=16, help="Batches read and shuffled together")
+    parser.add_argument("--epochs", type=int, default=1, help="Passes over each shuffled chunk (e.g. 5 to bootstrap)")
+    parser.add_argument("--reload-url", default=None,
+                        help="e.g. http://127.0.0.1:8000/admin/model/reload?source=online (uses AYUSHMA_ADMIN_TOKEN)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, force=True)
+    trainer = OnlineTrainer(args.model_dir)
+    for source in args.sources:
+        print(json.dumps({"source": str(source), **trainer.learn(
+            source, args.batch_size, args.checkpoint_every, args.shuffle_batches, args.epochs
+        )}))
+    if args.reload_url:
+        print(json.dumps(_notify(args.reload_url, os.environ.get("AYUSHMA_ADMIN_TOKEN", ""))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,50 +1,257 @@
 """
-ML training for package (BM001A–D) classification from clinical text.
-TF-IDF + Logistic Regression; saves model, vectorizer, and metadata.
+ML training for package (BM001A–D) classification from clinical text (the one trainer;
+backend/ml/train.py is an alias). TF-IDF + Logistic Regression; saves model, vectorizer, metadata
+and the NumPy-only exports infer serves from: model.flat (sorted vocabulary and float32 arrays,
+memory-mapped by every server worker) and model_bundle.npz.
+
+- Notes are cleaned in bulk (text_cleaner.clean_texts).
+- C and class_weight are chosen by cross-validated grid search on all cores, over a
+  TF-IDF + classifier Pipeline: each fold's vectorizer is fitted on that fold's training part only.
+- The cleaned train/test split is cached, keyed by the data file, cleaner and split settings, and
+  next to it the fitted TF-IDF of every fold (the pipeline's joblib memory, one directory per
+  vectorizer setting). Later runs skip reading, cleaning and vectorizing; a new search grid only
+  refits the classifier. Only the TRAINING_CACHE_KEEP most recently used entries are kept.
+- Stage timings and peak memory are recorded in metadata.json.
+
+Usage (from project root):
+    python -m backend.ml.train_model
+    python -m backend.ml.train_model --max-features 5000 --cv 5 --n-jobs 8 --no-cache
+Re-export both from existing pickles: python -m backend.ml.train_model --export
 """
+import argparse
+import contextlib
+import hashlib
 import json
 import os
+import shutil
 import sys
-from datetime import datetime
+import tempfile
+import time
+from datetime import datetime, timezone
 from pathlib import Path
 
 import joblib
+import numpy as np
 import pandas as pd
+import sklearn
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, classification_report
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+
+# Run as a script (python backend/ml/train_model.py): make the backend package importable
+if not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from backend import config
+from backend.ml.flat_model import write_flat
+from backend.services import text_cleaner
+from backend.services.text_cleaner import clean_texts
+
+BUNDLE_NAME = "model_bundle.npz"
+FLAT_NAME = "model.flat"
+
+# TfidfVectorizer settings the NumPy scorer reproduces; anything else is refused at export
+_SUPPORTED_VECTORIZER = {
+    "analyzer": "word",
+    "ngram_range": (1, 1),
+    "preprocessor": None,
+    "tokenizer": None,
+    "stop_words": None,
+    "strip_accents": None,
+    "binary": False,
+    "use_idf": True,
+}
+
+
+def export_bundle(vectorizer, clf, out_path: str | Path, model_path: str | Path | None = None) -> Path:
+    """
+    Write vocabulary, IDF weights, coefficients, intercepts and classes to a compressed .npz
+    that infer can score with NumPy alone (no sklearn, no pickle), and the same model as
+    model.flat next to it (flat_model).
+    model_path: the saved model.pkl; its sha256 is recorded so infer can detect a stale bundle.
+    """
+    params = vectorizer.get_params()
+    unsupported = {k: params[k] for k, v in _SUPPORTED_VECTORIZER.items() if params[k] != v}
+    if unsupported:
+        raise ValueError(f"Vectorizer settings not supported by the NumPy scorer: {unsupported}")
+    if params["norm"] not in ("l2", None):
+        raise ValueError(f"Unsupported norm: {params['norm']}")
+
+    # vocab[i] is the term for feature column i
+    vocab = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    config = {
+        "token_pattern": params["token_pattern"],
+        "lowercase": params["lowercase"],
+        "norm": params["norm"],
+        "sublinear_tf": params["sublinear_tf"],
+        "model_sha256": hashlib.sha256(Path(model_path).read_bytes()).hexdigest() if model_path else None,
+    }
+    out_path = Path(out_path)
+    np.savez_compressed(
+        out_path,
+        vocab=np.array(vocab, dtype=str),
+        idf=vectorizer.idf_.astype(np.float64),
+        coef=clf.coef_.astype(np.float64),
+        intercept=clf.intercept_.astype(np.float64),
+        classes=np.array([str(c) for c in clf.classes_], dtype=str),
+        config=np.array(json.dumps(config)),
+    )
+    write_flat(
+        out_path.with_name(FLAT_NAME), vectorizer.vocabulary_, vectorizer.idf_, clf.coef_, clf.intercept_,
+        list(clf.classes_), config,
+    )
+    return out_path
+
+
+def export_from_pickles(model_dir: str | Path | None = None) -> Path:
+    """Export model_bundle.npz and model.flat next to existing model.pkl / vectorizer.pkl."""
+    model_dir = Path(model_dir) if model_dir else Path(__file__).resolve().parent
+    clf = joblib.load(model_dir / "model.pkl")
+    vectorizer = joblib.load(model_dir / "vectorizer.pkl")
+    return export_bundle(vectorizer, clf, model_dir / BUNDLE_NAME, model_dir / "model.pkl")
+
+
+# Searched by cross-validation over the classifier step (keys may also be given as "clf__<name>")
+PARAM_GRID = {
+    "C": [0.1, 1.0, 10.0, 100.0],
+    "class_weight": [None, "balanced"],
+}
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB (None where the resource module is missing)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_key(data_path: Path, settings: dict) -> str:
+    """Changes whenever the data, the cleaner, the split settings or scikit-learn change."""
+    key = {
+        "data": _file_sha256(data_path),
+        "cleaner": _file_sha256(Path(text_cleaner.__file__)),
+        "sklearn": sklearn.__version__,
+        **settings,
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:20]
+
+
+def _touch(path: Path):
+    """Mark a cache entry as used (pruning keeps the most recently used ones)."""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _prune(directory: Path, keep: int, current: Path):
+    """Delete all but the keep most recently used entries of directory (never current)."""
+    try:
+        entries = [p for p in directory.iterdir() if p.is_dir() and not p.name.startswith(".") and p != current]
+    except OSError:
+        return
+    entries.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in entries[max(0, keep - 1):]:
+        shutil.rmtree(stale, ignore_errors=True)
+
 
-# Import clean_text: from backend when run as package, else from parent path
-_parent = Path(__file__).resolve().parent.parent
-if _parent not in sys.path:
-    sys.path.insert(0, str(_parent))
-try:
-    from backend.services.text_cleaner import clean_text
-except ImportError:
-    from services.text_cleaner import clean_text
+def _load_cached(directory: Path):
+    if not (directory / "labels.npz").exists():
+        return None
+    labels = np.load(directory / "labels.npz", allow_pickle=False)
+    texts = joblib.load(directory / "texts.pkl")
+    return {
+        "X_train": texts["X_train"],
+        "X_test": texts["X_test"],
+        "y_train": labels["y_train"],
+        "y_test": labels["y_test"],
+        "n_samples": int(labels["n_samples"]),
+    }
+
+
+def _save_cached(directory: Path, data: dict):
+    """Write into a temp directory, then rename, so an interrupted run never leaves a partial cache."""
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=directory.parent))
+    try:
+        joblib.dump({"X_train": data["X_train"], "X_test": data["X_test"]}, tmp / "texts.pkl")
+        np.savez(tmp / "labels.npz", y_train=data["y_train"], y_test=data["y_test"], n_samples=data["n_samples"])
+        os.replace(tmp, directory)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not directory.exists():
+            raise
+
+
+def _prepare(data_path: Path, test_size: float, random_state: int, timings: dict) -> dict:
+    """Read, clean and split the CSV into cleaned texts. Raises ValueError on a malformed file."""
+    start = time.perf_counter()
+    df = pd.read_csv(data_path)
+    if "text" not in df.columns or "label" not in df.columns:
+        raise ValueError("CSV must have columns 'text' and 'label'")
+    df = df.dropna(subset=["text", "label"])
+    texts = df["text"].tolist()
+    labels = df["label"].astype(str).to_numpy(dtype=str)
+    del df
+    timings["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    texts = clean_texts(texts)
+    timings["clean"] = time.perf_counter() - start
+
+    X_train, X_test, y_train, y_test = train_test_split(texts, labels, test_size=test_size, random_state=random_state)
+    return {"X_train": X_train, "X_test": X_test, "y_train": y_train, "y_test": y_test, "n_samples": len(labels)}
+
+
+def _fit_cache(cache_path: Path, max_features) -> Path:
+    """Pipeline memory for one vectorizer setting, inside the split's cache entry."""
+    settings = {"tfidf": TfidfVectorizer(max_features=max_features).get_params()}
+    key = hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()[:20]
+    return cache_path / "tfidf" / key
+
+
+def _pipeline_grid(param_grid: dict) -> dict:
+    """PARAM_GRID-style keys (C, class_weight) as parameters of the pipeline's "clf" step."""
+    return {key if "__" in key else f"clf__{key}": values for key, values in param_grid.items()}
 
 
 def train(
     data_path: str | Path | None = None,
     model_dir: str | Path | None = None,
-    test_size: float = 0.2,
-    random_state: int = 42,
-    max_features: int = 1000,
+    test_size: float = config.DEFAULT_TEST_SIZE,
+    random_state: int = config.DEFAULT_RANDOM_STATE,
+    max_features: int | None = config.DEFAULT_MAX_FEATURES,
+    param_grid: dict | None = None,
+    cv: int = 5,
+    n_jobs: int = config.TRAINING_N_JOBS,
+    cache_dir: str | Path | None = config.TRAINING_CACHE_DIR,
+    cache_keep: int = config.TRAINING_CACHE_KEEP,
 ) -> dict:
     """
-    Load CSV (text, label), clean, vectorize, train, evaluate, save artifacts.
-    Returns metrics dict: accuracy, report, n_samples, model_path, error (if any).
+    Load CSV (text, label) and clean it (or load the cached split), grid-search TF-IDF + classifier
+    with cv-fold cross-validation on n_jobs processes, evaluate on the held-out split and save
+    artifacts. cache_dir=None disables the cache; cache_keep entries (splits, and vectorizer
+    settings per split) are kept.
+    The vectorizer is part of the searched pipeline, so IDF weights never see a validation fold.
+    Returns metrics dict: accuracy, report, best_params, timings, n_samples, model_path, error (if any).
     """
-    try:
-        from backend import config as _cfg
-        _config = _cfg
-    except ImportError:
-        _config = None
-    base_dir = Path(__file__).resolve().parent
-    data_path = Path(data_path) if data_path else (getattr(_config, "TRAINING_CSV", None) if _config else None) or (base_dir.parent / "data" / "training_data.csv")
-    data_path = data_path.resolve()
-    model_dir = Path(model_dir) if model_dir else (getattr(_config, "ML_DIR", None) if _config else None) or base_dir
+    started = time.perf_counter()
+    timings = {}
+    data_path = Path(data_path or config.TRAINING_CSV).resolve()
+    model_dir = Path(model_dir or config.ML_DIR)
     model_path = model_dir / "model.pkl"
     vec_path = model_dir / "vectorizer.pkl"
     metadata_path = model_dir / "metadata.json"
@@ -52,40 +259,93 @@ def train(
     if not data_path.exists():
         return {"ok": False, "error": f"Training data not found: {data_path}"}
 
-    df = pd.read_csv(data_path)
-    if "text" not in df.columns or "label" not in df.columns:
-        return {"ok": False, "error": "CSV must have columns 'text' and 'label'"}
-
-    df = df.dropna(subset=["text", "label"])
-    n_samples = len(df)
-    df["clean_text"] = df["text"].apply(clean_text)
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        df["clean_text"], df["label"], test_size=test_size, random_state=random_state
-    )
-
-    vectorizer = TfidfVectorizer(max_features=max_features)
-    X_train_vec = vectorizer.fit_transform(X_train)
-    X_test_vec = vectorizer.transform(X_test)
+    # 1-2. Read + clean + split, or reuse the cleaned split of an identical earlier run
+    settings = {"contents": "cleaned_texts", "test_size": test_size, "random_state": random_state}
+    cache_path = Path(cache_dir) / _cache_key(data_path, settings) if cache_dir else None
+    start = time.perf_counter()
+    data = _load_cached(cache_path) if cache_path else None
+    if data is not None:
+        timings["cache_load"] = time.perf_counter() - start
+    else:
+        try:
+            data = _prepare(data_path, test_size, random_state, timings)
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+        if cache_path:
+            start = time.perf_counter()
+            _save_cached(cache_path, data)
+            timings["cache_save"] = time.perf_counter() - start
+    if cache_path:
+        _touch(cache_path)
+        _prune(Path(cache_dir), cache_keep, cache_path)
 
-    clf = LogisticRegression(random_state=random_state)
-    clf.fit(X_train_vec, y_train)
+    # 3. Cross-validated search over vectorizer + classifier, folds and candidates spread across
+    # cores. The pipeline's memory caches each fold's fitted vectorizer and TF-IDF matrix, so
+    # TF-IDF is fitted once per fold (and once for the refit), and not at all on a repeat run.
+    start = time.perf_counter()
+    folds = min(cv, int(np.unique(data["y_train"], return_counts=True)[1].min()))
+    with contextlib.ExitStack() as stack:
+        if cache_path:
+            fit_cache = _fit_cache(cache_path, max_features)
+            fit_cache.mkdir(parents=True, exist_ok=True)
+            _touch(fit_cache)
+            _prune(fit_cache.parent, cache_keep, fit_cache)
+        else:
+            fit_cache = stack.enter_context(tempfile.TemporaryDirectory(prefix="ayushma-tfidf-"))
+        pipeline = Pipeline(
+            [
+                ("tfidf", TfidfVectorizer(max_features=max_features)),
+                ("clf", LogisticRegression(random_state=random_state, max_iter=1000)),
+            ],
+            memory=str(fit_cache),
+        )
+        search = GridSearchCV(
+            pipeline,
+            _pipeline_grid(param_grid or PARAM_GRID),
+            cv=StratifiedKFold(n_splits=max(2, folds), shuffle=True, random_state=random_state),
+            scoring="f1_macro",
+            n_jobs=n_jobs,
+        )
+        search.fit(data["X_train"], data["y_train"])
+    vectorizer = search.best_estimator_.named_steps["tfidf"]
+    clf = search.best_estimator_.named_steps["clf"]
+    best_params = {key.removeprefix("clf__"): value for key, value in search.best_params_.items()}
+    timings["search"] = time.perf_counter() - start
 
-    predictions = clf.predict(X_test_vec)
-    accuracy = float(accuracy_score(y_test, predictions))
-    report = classification_report(y_test, predictions, output_dict=True)
+    # 4. Held-out evaluation
+    start = time.perf_counter()
+    predictions = search.best_estimator_.predict(data["X_test"])
+    accuracy = float(accuracy_score(data["y_test"], predictions))
+    report = classification_report(data["y_test"], predictions, output_dict=True)
+    timings["evaluate"] = time.perf_counter() - start
 
+    start = time.perf_counter()
     model_dir.mkdir(parents=True, exist_ok=True)
     joblib.dump(clf, model_path)
     joblib.dump(vectorizer, vec_path)
+    bundle_path = export_bundle(vectorizer, clf, model_dir / BUNDLE_NAME, model_path)
+    timings["save"] = time.perf_counter() - start
+    timings = {stage: round(seconds, 3) for stage, seconds in timings.items()}
+    training_seconds = round(time.perf_counter() - started, 3)
 
     metadata = {
         "accuracy": accuracy,
-        "n_samples": n_samples,
-        "n_train": len(X_train),
-        "n_test": len(X_test),
-        "trained_at": datetime.utcnow().isoformat() + "Z",
+        "n_samples": data["n_samples"],
+        "n_train": len(data["X_train"]),
+        "n_test": len(data["X_test"]),
+        "n_features": len(vectorizer.vocabulary_),
+        "trained_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
         "model_path": str(model_path),
+        "bundle_path": str(bundle_path),
+        "flat_path": str(bundle_path.with_name(FLAT_NAME)),
+        "best_params": best_params,
+        "cv_folds": search.n_splits_,
+        "cv_f1_macro": float(search.best_score_),
+        "n_candidates": len(search.cv_results_["params"]),
+        "cache_hit": "cache_load" in timings,
+        "training_seconds": training_seconds,
+        "timings": timings,
+        "peak_rss_mb": _peak_rss_mb(),
         "report": report,
     }
     with open(metadata_path, "w") as f:
@@ -94,18 +354,49 @@ def train(
     return {
         "ok": True,
         "accuracy": accuracy,
-        "n_samples": n_samples,
+        "n_samples": data["n_samples"],
         "report": report,
+        "best_params": best_params,
+        "timings": timings,
+        "training_seconds": training_seconds,
+        "peak_rss_mb": metadata["peak_rss_mb"],
         "model_path": str(model_path),
         "metadata_path": str(metadata_path),
     }
 
 
-if __name__ == "__main__":
-    result = train()
-    if result.get("ok"):
-        print(f"Accuracy: {result['accuracy']:.4f}")
-        print(f"Saved to {result['model_path']}")
-    else:
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", type=Path, default=None, help="Training CSV (text, label)")
+    parser.add_argument("--model-dir", type=Path, default=None, help="Where model.pkl etc. are written")
+    parser.add_argument("--max-features", type=int, default=config.DEFAULT_MAX_FEATURES, help="TF-IDF vocabulary size (0 = unlimited)")
+    parser.add_argument("--cv", type=int, default=5, help="Cross-validation folds")
+    parser.add_argument("--n-jobs", type=int, default=config.TRAINING_N_JOBS, help="Search processes (-1 = all cores)")
+    parser.add_argument("--cache-dir", type=Path, default=Path(config.TRAINING_CACHE_DIR), help="Cleaned-text cache")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the cleaned-text cache")
+    parser.add_argument("--export", action="store_true", help="Only re-export model_bundle.npz from existing pickles")
+    args = parser.parse_args(argv)
+
+    if args.export:
+        bundle_path = export_from_pickles(args.model_dir)
+        print(f"Exported {bundle_path} and {bundle_path.with_name(FLAT_NAME)}")
+        return 0
+    result = train(
+        args.data,
+        args.model_dir,
+        max_features=args.max_features or None,
+        cv=args.cv,
+        n_jobs=args.n_jobs,
+        cache_dir=None if args.no_cache else args.cache_dir,
+    )
+    if not result.get("ok"):
         print("Error:", result.get("error"))
-        sys.exit(1)
+        return 1
+    print(f"Accuracy: {result['accuracy']:.4f} (best {result['best_params']})")
+    print(f"Trained in {result['training_seconds']:.2f}s {result['timings']}, peak RSS {result['peak_rss_mb']} MB")
+    print(f"Saved to {result['model_path']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Production launcher for backend.app:app (no --reload).
+
+The parent imports the app, loads the model and compiles the policy catalogue once, binds the
+listening socket, then forks the workers. Each worker runs its own uvicorn server on the shared
+socket and inherits the loaded model as copy-on-write pages instead of loading a private copy
+(model.flat is memory-mapped, so its pages are shared through the page cache in any case).
+gc.freeze() moves the preloaded objects out of the collector's reach, so collections in the
+workers do not write to (and so copy) those pages.
+
+Heavy optional dependencies are imported on first use, not at startup: EasyOCR/torch on the first
+image, pdfplumber on the first PDF, scikit-learn only when there is no NumPy model bundle.
+Threads and pools (OCR, PDF, audit workers, job queue) start in the workers, after the fork.
+
+The parent supervises: a worker that dies is restarted (the launcher exits if they keep dying at
+startup). SIGTERM or SIGINT drains: each worker stops accepting connections, gives in-flight
+requests --graceful-timeout seconds, then requeues its running audit jobs and exits; stragglers
+are killed. A second signal kills the workers at once. GET /healthz answers 200 once a worker is
+ready to serve.
+
+Preforking needs os.fork (POSIX). Where it is missing (Windows), the workers are started by
+uvicorn's own multiprocess manager instead (spawned, each importing and loading the app itself),
+or the app is served in this process when one worker is asked for.
+
+Usage (from project root):
+    python -m backend.server                # one worker per CPU
+    python -m backend.server --workers 4
+    AYUSHMA_PORT=9000 AYUSHMA_SERVER_WORKERS=2 python -m backend.server
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import sys
+import time
+
+import uvicorn
+
+from .config import LOG_LEVEL, SERVER_GRACEFUL_TIMEOUT, SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+
+logger = logging.getLogger(__name__)
+
+SUPERVISE_INTERVAL = 0.2
+# A worker that dies within MIN_UPTIME seconds of starting counts as a startup failure; after
+# MAX_FAST_FAILURES in a row the launcher gives up instead of restarting it forever.
+MIN_UPTIME = 5.0
+MAX_FAST_FAILURES = 5
+# os.fork, os.waitpid(-1, WNOHANG) and SIGKILL are POSIX-only
+PREFORK = hasattr(os, "fork")
+
+
+def preload():
+    """Import the app and load everything the workers can share. Returns the app."""
+    started = time.perf_counter()
+    from .app import app
+    from .ml.infer import load_model
+    from .services.rule_engine import rule_engine
+
+    imported = time.perf_counter()
+    load_model()
+    rule_engine.catalogue()
+    logger.info(
+        "Preloaded app in %.3fs (imports %.3fs, model and catalogue %.3fs)",
+        time.perf_counter() - started, imported - started, time.perf_counter() - imported,
+    )
+    return app
+
+
+def _serve(config: uvicorn.Config, sock):
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _fork_worker(config: uvicorn.Config, sock) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+    # Worker: uvicorn installs its own SIGINT/SIGTERM handlers (finish requests, run shutdown hooks)
+    # and re-raises the signal under the previous handler once it has stopped; ignoring it then
+    # lets the worker exit with status 0 instead of being killed by it.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    code = 0
+    try:
+        _serve(config, sock)
+    except BaseException:
+        logger.exception("Worker %d crashed", os.getpid())
+        code = 1
+    finally:
+        os._exit(code)
+
+
+def run(host: str = SERVER_HOST, port: int = SERVER_PORT, workers: int = SERVER_WORKERS, log_level: str = LOG_LEVEL,
+        graceful_timeout: float = SERVER_GRACEFUL_TIMEOUT):
+    """Serve until SIGTERM/SIGINT. Returns the exit code (1 if workers kept crashing)."""
+    if not PREFORK and workers > 1:
+        logger.info("os.fork is not available; starting %d workers with uvicorn's process manager", workers)
+        uvicorn.run(
+            "backend.app:app", host=host, port=port, workers=workers, log_level=log_level.lower(),
+            access_log=False, timeout_graceful_shutdown=graceful_timeout,
+        )
+        return 0
+    app = preload()
+    config = uvicorn.Config(
+        app, host=host, port=port, log_level=log_level.lower(), access_log=False,
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+    sock = config.bind_socket()
+    if workers <= 0 or not PREFORK:  # serve in this process, unsupervised (debugging, or one worker without fork)
+        _serve(config, sock)
+        return 0
+
+    gc.collect()
+    gc.freeze()
+    children = {}  # pid -> monotonic start time
+    stopping = None  # monotonic deadline for the workers to drain, once stopping
+
+    def spawn():
+        children[_fork_worker(config, sock)] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        if stopping is not None:
+            logger.warning("Second signal: killing workers")
+            _signal_all(children, signal.SIGKILL)
+            return
+        logger.info("Draining %d workers (up to %gs)", len(children), graceful_timeout)
+        stopping = time.monotonic() + graceful_timeout + 5
+        sock.close()  # with the workers' copies closed too, new connections are refused, not queued
+        _signal_all(children, signal.SIGTERM)
+
+    for _ in range(workers):
+        spawn()
+    logger.info("Started %d workers on %s:%d: %s", workers, host, port, sorted(children))
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    code = 0
+    fast_failures = 0
+    while children:
+        pid, status = os.waitpid(-1, os.WNOHANG)
+        if pid == 0:
+            if stopping is not None and time.monotonic() > stopping:
+                logger.error("Workers %s did not drain in time; killing them", sorted(children))
+                _signal_all(children, signal.SIGKILL)
+                stopping = float("inf")
+            time.sleep(SUPERVISE_INTERVAL)
+            continue
+        uptime = time.monotonic() - children.pop(pid)
+        if stopping is not None:
+            continue
+        logger.error("Worker %d exited with %d after %.1fs; restarting it", pid, os.waitstatus_to_exitcode(status), uptime)
+        fast_failures = fast_failures + 1 if uptime < MIN_UPTIME else 0
+        if fast_failures >= MAX_FAST_FAILURES:
+            logger.error("Workers keep failing at startup; shutting down")
+            code = 1
+            stop(None, None)
+            continue
+        spawn()
+    sock.close()
+    return code
+
+
+def _signal_all(children: dict, signum: int):
+    for pid in children:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="Forked worker processes (default: CPU count; 0 serves in this process)")
+    parser.add_argument("--graceful-timeout", type=float, default=SERVER_GRACEFUL_TIMEOUT,
+                        help="Seconds in-flight requests get to finish on SIGTERM")
+    parser.add_argument("--log-level", default=LOG_LEVEL)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(process)d %(levelname)s %(name)s: %(message)s")
+    return run(args.host, args.port, args.workers, args.log_level, args.graceful_timeout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
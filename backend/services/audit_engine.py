@@ -1,7 +1,78 @@
+"""
+Audit orchestration shared by the API (/audit, /audit/batch) and the bulk CLI (backend.cli):
+predict packages for a batch of notes in one call, validate all claims in one vectorized pass,
+and route low-confidence predictions to REVIEW_REQUIRED.
+"""
+from ..config import CONFIDENCE_THRESHOLD
+from ..ml.infer import predict_with_confidence
+from . import metrics
 from .ocr_service import ocr_engine
 from .text_cleaner import clean_text, extract_amount, extract_severity
+from .policy_rules import validate_batch
 from .policy_validator import PolicyValidator
 from ..ml.predict import predict_package
+from .rule_engine import rule_engine
+
+metrics.describe("ayushma_audits_total", "Completed audits, by status.")
+
+# Documents of one claim, as POST /audit and /audit/jobs accept them and backend.cli reads them
+# from a claim directory. Each is a single file; PHOTOGRAPHS may repeat.
+CLAIM_DOCUMENTS = ("clinical_notes", "discharge_summary", "hospital_bill")
+REQUIRED_DOCUMENTS = ("clinical_notes", "hospital_bill")
+PHOTOGRAPHS = "photographs"
+
+
+def evidence_text(texts: dict) -> str:
+    """
+    Text the package is predicted from: clinical notes, discharge summary, then photograph OCR
+    text, skipping blank ones. texts maps document -> text (PHOTOGRAPHS -> list of texts).
+    """
+    evidence = [texts.get("clinical_notes", ""), texts.get("discharge_summary", ""), *texts.get(PHOTOGRAPHS, [])]
+    return "\n".join(t for t in evidence if t.strip())
+
+
+def provided_documents(texts: dict) -> list:
+    """Documents in texts that yielded any text."""
+    return [
+        name for name, text in texts.items()
+        if (any(t.strip() for t in text) if isinstance(text, list) else text.strip())
+    ]
+
+
+def missing_documents(documents: list, package: str) -> list:
+    """Documents the package requires that are not among documents."""
+    required = (rule_engine.package(package) or {}).get("required_documents", [])
+    return [name for name in required if name not in documents]
+
+
+def audit_result(prediction: dict, result: dict) -> dict:
+    """
+    Combine a prediction with its policy result. status is the policy outcome (CLEAN |
+    PARTIAL_APPROVAL) unless the prediction's confidence is below CONFIDENCE_THRESHOLD, in which
+    case it is REVIEW_REQUIRED; policy_status always carries the policy outcome.
+    """
+    status = result["status"]
+    if prediction["confidence"] < CONFIDENCE_THRESHOLD:
+        status = "REVIEW_REQUIRED"
+    metrics.inc("ayushma_audits_total", status=status)
+    return {
+        "predicted_package": prediction["package"],
+        "confidence": prediction["confidence"],
+        "top_k": prediction["top_k"],
+        "status": status,
+        "policy_status": result["status"],
+        "approved_amount": result["approved_amount"],
+        "flagged_amount": result["flagged_amount"],
+    }
+
+
+def audit_batch(notes_texts: list, billed_amounts: list) -> list:
+    """Audit claims (notes_texts[i], billed_amounts[i]): one predict call, one validation pass."""
+    predictions = predict_with_confidence(notes_texts)
+    with metrics.span("policy_validation"):
+        policies = validate_batch([p["package"] for p in predictions], billed_amounts)
+    return [audit_result(p, r) for p, r in zip(predictions, policies)]
+
 
 class AuditEngine:
     def __init__(self):
@@ -0,0 +1,177 @@
+"""
+Content-addressed cache for extracted document text.
+Key = sha256 of the uploaded bytes + extractor name/version, so a resubmitted document skips
+pdfplumber/EasyOCR. Tiers: in-memory LRU bounded by text size, optional SQLite file on disk
+bounded by age and total size. The memory tier has its own lock, so a hit never waits behind a
+disk write.
+"""
+import hashlib
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from ..config import EXTRACTION_CACHE_DB, EXTRACTION_CACHE_DISK_MAX_BYTES, EXTRACTION_CACHE_MAX_AGE, EXTRACTION_CACHE_MAX_BYTES
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# The disk tier is purged (age, then size) on connect and after this many writes
+_PURGE_EVERY = 100
+
+
+class ExtractionCache:
+    def __init__(self, max_bytes: int, db_path: str = "", disk_max_bytes: int = 0, max_age: float = 0):
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self.disk_max_bytes = disk_max_bytes
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()  # memory tier and counters
+        self._db_lock = threading.Lock()  # the SQLite connection
+        self._db = None
+        self._writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(content: bytes | None, extractor: str, digest: str | None = None) -> str:
+        """Cache key; pass digest (sha256 hex) when the bytes were already hashed while streaming."""
+        return f"{extractor}:{digest or hashlib.sha256(content).hexdigest()}"
+
+    def _connect(self):
+        """The SQLite connection, created on first use. Caller holds the db lock."""
+        if self._db is None:
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS extractions"
+                " (key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL, size INTEGER NOT NULL DEFAULT 0)"
+            )
+            if "size" not in [row[1] for row in db.execute("PRAGMA table_info(extractions)")]:
+                # Files written before the disk tier was bounded
+                db.execute("ALTER TABLE extractions ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+                db.execute("UPDATE extractions SET size = length(CAST(text AS BLOB))")
+            db.execute("CREATE INDEX IF NOT EXISTS extractions_created_at ON extractions (created_at)")
+            db.commit()
+            self._db = db
+            self._purge(db)
+        return self._db
+
+    def _purge(self, db):
+        """Drop disk entries older than max_age, then the oldest ones until under disk_max_bytes. Caller holds the db lock."""
+        removed = 0
+        if self.max_age > 0:
+            removed += db.execute("DELETE FROM extractions WHERE created_at < ?", (time.time() - self.max_age,)).rowcount
+        if self.disk_max_bytes > 0:
+            # Newest entries are kept while their running total fits the budget
+            row = db.execute(
+                "SELECT created_at FROM (SELECT created_at, SUM(size) OVER (ORDER BY created_at DESC, key) AS kept"
+                " FROM extractions) WHERE kept > ? ORDER BY created_at DESC LIMIT 1",
+                (self.disk_max_bytes,),
+            ).fetchone()
+            if row is not None:
+                removed += db.execute("DELETE FROM extractions WHERE created_at <= ?", (row[0],)).rowcount
+        db.commit()
+        if removed:
+            logger.info("Purged %d entries from the on-disk extraction cache", removed)
+
+    def _remember(self, key: str, text: str):
+        """Insert into the memory tier and evict least-recently-used entries over budget. Caller holds the lock."""
+        size = sys.getsizeof(text)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= sys.getsizeof(old)
+        self._entries[key] = text
+        self._size += size
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= sys.getsizeof(evicted)
+
+    def get(self, key: str):
+        """Return cached text or None. Disk hits are promoted into memory."""
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return text
+        row = None
+        if self.db_path:
+            try:
+                with self._db_lock:
+                    row = self._connect().execute("SELECT text FROM extractions WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Disk lookup failed: %s", e)
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self._remember(key, row[0])
+            self.hits += 1
+            self.disk_hits += 1
+            return row[0]
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            self._remember(key, text)
+        if not self.db_path:
+            return
+        try:
+            with self._db_lock:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO extractions (key, text, created_at, size) VALUES (?, ?, ?, ?)",
+                    (key, text, time.time(), len(text.encode("utf-8"))),
+                )
+                db.commit()
+                self._writes += 1
+                if self._writes % _PURGE_EVERY == 0:
+                    self._purge(db)
+        except sqlite3.Error as e:
+            logger.warning("Disk write failed: %s", e)
+
+    def get_or_extract(self, content: bytes | None, extractor: str, extract, digest: str | None = None) -> str:
+        """Return cached text for content, or call extract() and cache its result. Exceptions are not cached."""
+        key = self.key(content, extractor, digest)
+        text = self.get(key)
+        if text is None:
+            text = extract()
+            self.put(key, text)
+        return text
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "disk": bool(self.db_path),
+            }
+
+
+extraction_cache = ExtractionCache(
+    EXTRACTION_CACHE_MAX_BYTES, EXTRACTION_CACHE_DB, EXTRACTION_CACHE_DISK_MAX_BYTES, EXTRACTION_CACHE_MAX_AGE
+)
+metrics.collect("ayushma_extraction_cache_hits_total", "Extraction cache hits (memory and disk).",
+                lambda: extraction_cache.hits, kind="counter")
+metrics.collect("ayushma_extraction_cache_disk_hits_total", "Extraction cache hits served from the SQLite tier.",
+                lambda: extraction_cache.disk_hits, kind="counter")
+metrics.collect("ayushma_extraction_cache_misses_total", "Extraction cache misses (text was extracted).",
+                lambda: extraction_cache.misses, kind="counter")
+metrics.collect("ayushma_extraction_cache_bytes", "Approximate size of the in-memory extraction cache.",
+                lambda: extraction_cache._size)
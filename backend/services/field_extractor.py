@@ -0,0 +1,160 @@
+"""
+Field extraction for claim documents (bills, clinical notes, discharge summaries).
+Every field has one precompiled regex, and extract_fields runs only those the caller asks for,
+each as a single C-level findall (finditer when offsets are wanted), so no Python code runs per
+number on a bill. This is one scan per requested field, not a single pass: a combined
+alternation over all fields was measured slower, because every match then returns to Python to
+be dispatched. The bill total, the only field /audit needs, is extract_total: the same
+findall the amount call sites always used.
+"""
+import re
+from collections import Counter
+
+# Clinical terms counted in "keywords" (matched on word boundaries, case-insensitive)
+KEYWORDS = (
+    "burn",
+    "burns",
+    "scald",
+    "thermal",
+    "tbsa",
+    "partial thickness",
+    "full thickness",
+    "debridement",
+    "dressing",
+    "skin graft",
+    "escharotomy",
+    "icu",
+    "sepsis",
+)
+
+FIELDS = ("amounts", "labelled_amounts", "tbsa", "package_codes", "keywords")
+
+_NUMBER = r"\d+(?:,\d{3})*(?:\.\d{2})?"
+# Every number: commas allowed, optional 2-digit decimals (the bill-total scan)
+_AMOUNT = re.compile(_NUMBER)
+_CODE = re.compile(r"BM001[A-D]")
+
+
+def _lowercase_pair(pattern: str) -> tuple:
+    """(pattern for lowercased text, IGNORECASE twin for text whose length changes when lowercased)."""
+    return re.compile(pattern), re.compile(pattern, re.IGNORECASE)
+
+
+# The first 3-6 digits after Total/Amount/Bill/Charges and e.g. ": Rs. "
+_LABELLED = _lowercase_pair(r"(?:total|amount|bill|charges)\s?[:\-]?\s?(?:rs\.?)?\s?(\d{3,6})")
+_KEYWORD = _lowercase_pair(
+    r"\b(" + "|".join(k.replace(" ", r"\s+") for k in sorted(KEYWORDS, key=len, reverse=True)) + r")\b"
+)
+# TBSA is found from its word, which is rare, rather than from every number: "30% tbsa", "30 tbsa",
+# "30% burns". The number must end right before the word, within _TBSA_WINDOW characters.
+_TBSA_WORD = _lowercase_pair(r"tbsa|burns")
+_TBSA_NUMBER = {
+    "tbsa": re.compile(r"(?<!\d)(?<!\d,)(" + _NUMBER + r")\s*%?\s*$"),
+    "burns": re.compile(r"(?<!\d)(?<!\d,)(" + _NUMBER + r")\s?%\s?$"),
+}
+_TBSA_WINDOW = 64
+_SPACES = re.compile(r"\s+")
+
+
+def _amount(raw: str) -> float:
+    return float(raw.replace(",", "")) if "," in raw else float(raw)
+
+
+def find_amounts(text: str) -> list:
+    """Every number in text as a float, in document order (one precompiled findall)."""
+    if not text:
+        return []
+    return [_amount(raw) for raw in _AMOUNT.findall(text)]
+
+
+def extract_total(text: str) -> float:
+    """Largest number in text, 0.0 if none (the bill total heuristic)."""
+    return max(find_amounts(text), default=0.0)
+
+
+def _tbsa(low: str, words) -> list:
+    """[(percent, offset)] for each TBSA word preceded by a number of at most 100."""
+    found = []
+    for m in words.finditer(low):
+        start = m.start()
+        number = _TBSA_NUMBER[m[0].lower()].search(low, max(0, start - _TBSA_WINDOW), start)
+        if number is not None:
+            value = _amount(number[1])
+            if value <= 100:
+                found.append((int(value), number.start()))
+    return found
+
+
+def _keywords(low: str, pattern) -> dict:
+    counts = Counter(pattern.findall(low))
+    keywords = {}
+    for word, count in counts.items():
+        word = word.lower()
+        if not word.isalpha():
+            word = _SPACES.sub(" ", word)
+        keywords[word] = keywords.get(word, 0) + count
+    return keywords
+
+
+def extract_fields(text: str, fields=FIELDS, positions: bool = False) -> dict:
+    """
+    Return a dict with the requested fields (default: all); nothing else is computed:
+    - amounts: every number (commas allowed, optional 2-digit decimals)
+    - labelled_amounts: the 3-6 digits right after Total/Amount/Bill/Charges (int)
+    - tbsa: percent for "30% TBSA", "30 tbsa", "30% burns" (0-100 only, int)
+    - package_codes: BM001A-D (case-sensitive)
+    - keywords: {keyword: count} for KEYWORDS
+    Lists are in document order. With positions=True each list item is (value, offset), the
+    offset being a character position in text.
+    """
+    wanted = frozenset(fields)
+    result = {name: ({} if name == "keywords" else []) for name in FIELDS if name in wanted}
+    if not text:
+        return result
+
+    if "amounts" in wanted:
+        if positions:
+            result["amounts"] = [(_amount(m[0]), m.start()) for m in _AMOUNT.finditer(text)]
+        else:
+            result["amounts"] = find_amounts(text)
+    if "package_codes" in wanted:
+        if positions:
+            result["package_codes"] = [(m[0], m.start()) for m in _CODE.finditer(text)]
+        else:
+            result["package_codes"] = _CODE.findall(text)
+    if not wanted & {"labelled_amounts", "tbsa", "keywords"}:
+        return result
+
+    # The remaining patterns are matched against lowercased text (re.IGNORECASE is much slower)
+    low = text.lower()
+    which = 0
+    if len(low) != len(text):
+        low, which = text, 1
+    if "labelled_amounts" in wanted:
+        pattern = _LABELLED[which]
+        if positions:
+            result["labelled_amounts"] = [(int(m[1]), m.start(1)) for m in pattern.finditer(low)]
+        else:
+            result["labelled_amounts"] = [int(digits) for digits in pattern.findall(low)]
+    if "tbsa" in wanted:
+        found = _tbsa(low, _TBSA_WORD[which])
+        result["tbsa"] = found if positions else [value for value, _ in found]
+    if "keywords" in wanted:
+        result["keywords"] = _keywords(low, _KEYWORD[which])
+    return result
+
+
+def max_amount(fields: dict) -> float:
+    """Largest amount in an extract_fields result, 0.0 if none."""
+    values = fields["amounts"]
+    if values and isinstance(values[0], tuple):
+        values = [value for value, _ in values]
+    return max(values, default=0.0)
+
+
+def first(fields: dict, name: str):
+    """First value of a list field (tbsa, package_codes, labelled_amounts, amounts), or None."""
+    values = fields[name]
+    if not values:
+        return None
+    return values[0][0] if isinstance(values[0], tuple) else values[0]
@@ -1,66 +1,112 @@
 """
 Safely read uploaded TXT and PDF files. Always return readable text (str).
 Ignore image content for MVP.
+read_file takes bytes; read_document takes a streamed SpooledDocument without copying it;
+read_path reads a file on disk (bulk CLI).
 """
-import io
+import codecs
+import logging
 from pathlib import Path
 
-# PDF text extraction (no images)
-try:
-    import pdfplumber
-    HAS_PDF = True
-except ImportError:
-    HAS_PDF = False
-    pdfplumber = None
+from ..config import PDF_MAX_PAGES
+from .extraction_cache import extraction_cache
+# PDF text extraction (no images); serial or page-parallel, see pdf_extract
+from .pdf_extract import HAS_PDF, PDFPLUMBER_VERSION, extract_pages
+
+logger = logging.getLogger(__name__)
+
+# Part of the extraction cache key; bump when PDF text output changes
+EXTRACTOR_VERSION = f"file_reader-pdf:1:{PDFPLUMBER_VERSION}:{PDF_MAX_PAGES}"
 
 
 def read_file(content: bytes, filename: str) -> str:
     """
     Read file content and return text as string.
     - TXT: decode as UTF-8 (fallback replace errors).
-    - PDF: extract text via pdfplumber; ignore images.
+    - PDF: extract text via pdfplumber; ignore images. Cached by content hash.
     - Always returns str; never returns bytes. No silent failures.
     """
     if not content:
-        print(f"[file_reader] Empty content for {filename}")
+        logger.debug("Empty content for %s", filename)
         return ""
 
     name_lower = (filename or "").lower()
     is_pdf = name_lower.endswith(".pdf")
 
     if is_pdf:
-        return _read_pdf(content, filename)
+        return extraction_cache.get_or_extract(content, EXTRACTOR_VERSION, lambda: _read_pdf(content, filename))
     return _read_txt(content, filename)
 
 
+def read_document(doc) -> str:
+    """
+    Same contract as read_file, for a SpooledDocument (see upload_stream).
+    - TXT: decoded chunk by chunk with an incremental decoder.
+    - PDF: pdfplumber opens the spool file (or in-memory bytes) directly; cache keyed by the streamed hash.
+    """
+    if not doc.size:
+        logger.debug("Empty content for %s", doc.filename)
+        return ""
+
+    if (doc.filename or "").lower().endswith(".pdf"):
+        return extraction_cache.get_or_extract(
+            None, EXTRACTOR_VERSION, lambda: _read_pdf(doc.source, doc.filename), digest=doc.sha256
+        )
+    return _read_txt_stream(doc)
+
+
+def read_path(path, pdf_workers: int | None = None) -> str:
+    """
+    Same contract as read_file, for a file on disk (not cached: bulk runs rarely repeat documents).
+    pdf_workers is passed to extract_pages; use 1 when already running inside a worker process.
+    """
+    path = Path(path)
+    if not path.stat().st_size:
+        logger.debug("Empty content for %s", path.name)
+        return ""
+    if path.suffix.lower() == ".pdf":
+        return _read_pdf(str(path), path.name, pdf_workers)
+    return _read_txt(path.read_bytes(), path.name)
+
+
+def _read_txt_stream(doc) -> str:
+    """Incremental UTF-8 decode; restart as latin-1 if the document is not valid UTF-8."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        parts = [decoder.decode(chunk) for chunk in doc.iter_chunks()]
+        parts.append(decoder.decode(b"", final=True))
+    except UnicodeDecodeError as e:
+        logger.warning("UTF-8 decode failed for %s: %s; trying latin-1", doc.filename, e)
+        return "".join(chunk.decode("latin-1", errors="replace") for chunk in doc.iter_chunks())
+    text = "".join(parts)
+    logger.debug("Read TXT %s (utf-8), len=%d", doc.filename, len(text))
+    return text
+
+
 def _read_txt(content: bytes, filename: str) -> str:
     """Decode bytes to string. Prefer UTF-8; replace bad chars to avoid bytes issues."""
     try:
         text = content.decode("utf-8")
-        print(f"[file_reader] Read TXT {filename} (utf-8), len={len(text)}")
+        logger.debug("Read TXT %s (utf-8), len=%d", filename, len(text))
         return text
     except UnicodeDecodeError as e:
-        print(f"[file_reader] UTF-8 decode failed for {filename}: {e}; trying latin-1")
+        logger.warning("UTF-8 decode failed for %s: %s; trying latin-1", filename, e)
         text = content.decode("latin-1", errors="replace")
         return text
 
 
-def _read_pdf(content: bytes, filename: str) -> str:
-    """Extract text from PDF pages. No image/OCR for MVP."""
+def _read_pdf(source, filename: str, workers: int | None = None) -> str:
+    """Extract text from PDF pages (source: bytes or path). No image/OCR for MVP."""
     if not HAS_PDF:
-        print("[file_reader] pdfplumber not installed; cannot read PDF")
+        logger.error("pdfplumber not installed; cannot read PDF")
         return ""
 
     try:
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            parts = []
-            for i, page in enumerate(pdf.pages):
-                t = page.extract_text()
-                if t:
-                    parts.append(t)
-            text = "\n".join(parts) if parts else ""
-            print(f"[file_reader] Read PDF {filename}, pages={len(pdf.pages)}, text_len={len(text)}")
-            return text
+        pages = extract_pages(source, workers=workers)
+        parts = [t for t in pages if t]
+        text = "\n".join(parts) if parts else ""
+        logger.debug("Read PDF %s, pages=%d, text_len=%d", filename, len(pages), len(text))
+        return text
     except Exception as e:
-        print(f"[file_reader] PDF read failed for {filename}: {e}")
+        logger.error("PDF read failed for %s: %s", filename, e)
         raise
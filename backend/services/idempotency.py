@@ -0,0 +1,201 @@
+"""
+Idempotency layer for POST /audit: gateway retries and double submissions get the stored result
+instead of re-running read -> predict -> validate.
+
+A request's key is its Idempotency-Key header when it sends one, else a hash of its documents
+(field, extension and sha256 of each, in order) plus the model version and the policy catalogue
+version, so retraining or editing the catalogue never replays a stale result.
+- Completed results: in-memory LRU of IDEMPOTENCY_MAX_ENTRIES entries, each kept IDEMPOTENCY_TTL
+  seconds, plus an optional SQLite tier (IDEMPOTENCY_DB) shared by all server workers.
+- In flight: a duplicate that arrives while the first request is still running waits for that
+  computation (one asyncio future per key, per process) instead of starting another.
+Reusing an Idempotency-Key with different documents raises IdempotencyConflict. Failures are not
+stored: waiters get the same exception, and the next retry computes again. If the first request is
+cancelled (its client went away), its waiters are not: one of them computes instead.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from ..config import IDEMPOTENCY_DB, IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_TTL
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+COMPUTED = "computed"
+CACHED = "cached"
+JOINED = "joined"
+
+# Expired rows are purged from the SQLite tier after this many writes
+_PURGE_EVERY = 100
+
+metrics.describe("ayushma_idempotency_total", "POST /audit requests by idempotency outcome (computed, cached, joined, conflict).")
+
+
+class IdempotencyConflict(Exception):
+    """An Idempotency-Key was reused with different documents."""
+
+
+class _Abandoned(Exception):
+    """Set on an in-flight future whose computation was cancelled; its waiters compute instead."""
+
+
+def documents_digest(documents: list) -> str:
+    """sha256 over (field, extension, sha256) of each SpooledDocument in documents [(field, doc), ...]."""
+    h = hashlib.sha256()
+    for field, doc in documents:
+        h.update(f"{field}\0{Path(doc.filename or '').suffix.lower()}\0{doc.sha256}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def request_key(idempotency_key: str | None, digest: str, model_version, policy_version) -> str:
+    """Cache key: the client's key, else the documents digest bound to the model and policy versions."""
+    if idempotency_key:
+        return f"key:{idempotency_key}"
+    return "sha:" + hashlib.sha256(f"{digest}\0{model_version}\0{policy_version}".encode("utf-8")).hexdigest()
+
+
+class IdempotencyCache:
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, max_entries: int = IDEMPOTENCY_MAX_ENTRIES, db_path: str = IDEMPOTENCY_DB):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()  # key -> (expires_at, digest, result)
+        self._inflight = {}  # key -> (digest, asyncio.Future); touched only on the event loop
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+
+    def _connect(self):
+        if self._db is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency"
+                " (key TEXT PRIMARY KEY, digest TEXT NOT NULL, result TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key: str, entry: tuple):
+        """Insert into the memory tier, evicting least-recently-used entries. Caller holds the lock."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str):
+        """(digest, result) of an unexpired entry, or None. Disk hits are promoted into memory."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry[1], entry[2]
+                del self._entries[key]
+            if not self.db_path:
+                return None
+            try:
+                row = self._connect().execute(
+                    "SELECT digest, result, expires_at FROM idempotency WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning("Idempotency lookup failed: %s", e)
+                return None
+            if row is None:
+                return None
+            result = json.loads(row[1])
+            self._remember(key, (row[2], row[0], result))
+            return row[0], result
+
+    def put(self, key: str, digest: str, result):
+        now = time.time()
+        with self._lock:
+            self._remember(key, (now + self.ttl, digest, result))
+            if not self.db_path:
+                return
+            try:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO idempotency (key, digest, result, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, digest, json.dumps(result), now + self.ttl),
+                )
+                self._writes += 1
+                if self._writes % _PURGE_EVERY == 0:
+                    db.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,))
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning("Idempotency write failed: %s", e)
+
+    async def _lookup(self, key: str):
+        # The SQLite tier does blocking I/O; the memory tier alone is answered on the loop
+        return await asyncio.to_thread(self.get, key) if self.db_path else self.get(key)
+
+    @staticmethod
+    def _check(key: str, stored: str, digest: str):
+        if stored != digest:
+            metrics.inc("ayushma_idempotency_total", outcome="conflict")
+            raise IdempotencyConflict(f"Idempotency-Key {key[4:]!r} was already used with different documents")
+
+    async def run(self, key: str, digest: str, compute) -> tuple:
+        """
+        (result, outcome): the stored result (CACHED), the result of the identical request already
+        in flight (JOINED), or await compute() and store it (COMPUTED).
+        """
+        if self.ttl <= 0:
+            return await compute(), COMPUTED
+        if key not in self._inflight:
+            entry = await self._lookup(key)
+            if entry is not None:
+                self._check(key, entry[0], digest)
+                metrics.inc("ayushma_idempotency_total", outcome=CACHED)
+                return entry[1], CACHED
+        while key in self._inflight:
+            inflight = self._inflight[key]
+            self._check(key, inflight[0], digest)
+            try:
+                # shield: a waiter that goes away must not cancel the computation the others wait for
+                result = await asyncio.shield(inflight[1])
+            except _Abandoned:
+                continue  # the first request was cancelled: join the next one, or compute below
+            metrics.inc("ayushma_idempotency_total", outcome=JOINED)
+            return result, JOINED
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (digest, future)
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            # Only this request is cancelled; its waiters are woken to compute it themselves
+            future.set_exception(_Abandoned())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here, so an exception nobody waited for is not logged again
+            raise
+        else:
+            future.set_result(result)
+            if self.db_path:
+                await asyncio.to_thread(self.put, key, digest, result)
+            else:
+                self.put(key, digest, result)
+        finally:
+            self._inflight.pop(key, None)
+        metrics.inc("ayushma_idempotency_total", outcome=COMPUTED)
+        return result, COMPUTED
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+idempotency_cache = IdempotencyCache()
@@ -0,0 +1,346 @@
+"""
+Persistent audit job queue behind POST /audit/jobs and GET /audit/jobs/{id}.
+Jobs are rows in a SQLite file and their documents are copied to JOB_DIR/<job id>/, so queued and
+interrupted work survives a restart. JOB_WORKERS asyncio workers claim jobs by priority (higher
+first, then oldest) and run them through the handler the app registers; a failed job is retried
+with exponential backoff until it has run JOB_MAX_ATTEMPTS times.
+A claim is a lease that is renewed while the job runs. If the process dies, the lease lapses and
+the job is queued again. Submissions and claims use BEGIN IMMEDIATE, so several processes can
+share one queue. Finished (done or failed) jobs are deleted JOB_RETENTION seconds after they finish.
+"""
+import asyncio
+import json
+import logging
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from ..config import JOB_DB, JOB_DIR, JOB_LEASE, JOB_MAX_ATTEMPTS, JOB_MAX_QUEUED, JOB_RETENTION, JOB_WORKERS
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Idle workers look for new work at least this often (jobs submitted by other processes, retries)
+POLL_INTERVAL = 1.0
+# Finished jobs past JOB_RETENTION are purged this often (and when the workers start)
+PURGE_INTERVAL = 3600.0
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        documents TEXT NOT NULL,
+        result TEXT,
+        error TEXT,
+        owner TEXT,
+        created_at REAL NOT NULL,
+        run_after REAL NOT NULL,
+        lease_until REAL,
+        started_at REAL,
+        finished_at REAL
+    )""",
+    "CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, created_at)",
+    "CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at)",
+)
+
+metrics.describe("ayushma_jobs_total", "Audit job events (submitted, done, retried, failed, lost).")
+
+
+class QueueFull(Exception):
+    """Raised when JOB_MAX_QUEUED jobs are already waiting."""
+
+
+class JobQueue:
+    def __init__(self, db_path: str = JOB_DB, job_dir: str = JOB_DIR, workers: int = JOB_WORKERS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS, lease: float = JOB_LEASE, max_queued: int = JOB_MAX_QUEUED,
+                 retention: float = JOB_RETENTION):
+        self.db_path = db_path
+        self.job_dir = Path(job_dir)
+        self.workers = workers
+        self.max_attempts = max(1, max_attempts)
+        self.lease = lease
+        self.max_queued = max_queued
+        self.retention = retention
+        self.owner = uuid.uuid4().hex
+        self._db = None
+        self._lock = threading.Lock()
+        self._tasks = []
+        self._running = set()
+        self._wake = None
+
+    def _connect(self):
+        """Shared connection in autocommit mode; callers hold self._lock."""
+        if self._db is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30, isolation_level=None)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+        return self._db
+
+    def _remove_documents(self, job_id: str):
+        shutil.rmtree(self.job_dir / job_id, ignore_errors=True)
+
+    def submit(self, documents: list, priority: int = 0) -> str:
+        """
+        Persist a job and return its id. documents: (field, SpooledDocument) pairs; their bytes are
+        copied under JOB_DIR, so the caller may close them afterwards. Raises QueueFull.
+        The JOB_MAX_QUEUED check and the insert are one transaction, so concurrent submissions
+        (from any process) cannot overshoot the limit.
+        """
+        job_id = uuid.uuid4().hex
+        directory = self.job_dir / job_id
+        directory.mkdir(parents=True)
+        try:
+            entries = []
+            for i, (field, doc) in enumerate(documents):
+                path = directory / f"{i:02d}-{field}{Path(doc.filename or '').suffix.lower()}"
+                with doc.open() as src, open(path, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                entries.append({"field": field, "filename": doc.filename, "path": str(path),
+                                "size": doc.size, "sha256": doc.sha256})
+            now = time.time()
+            with self._lock:
+                db = self._connect()
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    queued = db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+                    if queued >= self.max_queued:
+                        raise QueueFull(f"{self.max_queued} audit jobs already queued")
+                    db.execute(
+                        "INSERT INTO jobs (id, status, priority, documents, created_at, run_after) VALUES (?, ?, ?, ?, ?, ?)",
+                        (job_id, QUEUED, priority, json.dumps(entries), now, now),
+                    )
+                    db.execute("COMMIT")
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+        except BaseException:
+            self._remove_documents(job_id)
+            raise
+        metrics.inc("ayushma_jobs_total", event="submitted")
+        logger.debug("Queued job %s (priority %d, %d documents)", job_id, priority, len(entries))
+        return job_id
+
+    async def enqueue(self, documents: list, priority: int = 0) -> str:
+        """submit() off the event loop, then wake an idle worker."""
+        job_id = await asyncio.to_thread(self.submit, documents, priority)
+        if self._wake is not None:
+            self._wake.set()
+        return job_id
+
+    def get(self, job_id: str):
+        """Public view of a job (status, attempts, timestamps, result or last error), or None."""
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "priority": row["priority"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if row["status"] == DONE:
+            job["result"] = json.loads(row["result"])
+        elif row["error"]:
+            job["error"] = row["error"]
+        return job
+
+    def queued(self) -> int:
+        """Jobs waiting to run (including those backing off before a retry)."""
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+
+    def _claim(self):
+        """Lease the next runnable job to this process; returns the row, or None if there is none."""
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose process died: back to the queue, unless they have used up their attempts
+                abandoned = []
+                lost = db.execute(
+                    "SELECT id, attempts FROM jobs WHERE status = ? AND lease_until < ?", (RUNNING, now)
+                ).fetchall()
+                for job_id, attempts in lost:
+                    if attempts >= self.max_attempts:
+                        logger.error("Job %s lost its worker after %d attempts; failing it", job_id, attempts)
+                        db.execute(
+                            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL WHERE id = ?",
+                            (FAILED, "worker lost", now, job_id),
+                        )
+                        abandoned.append(job_id)
+                    else:
+                        logger.warning("Job %s lost its worker; requeued", job_id)
+                        db.execute("UPDATE jobs SET status = ?, lease_until = NULL WHERE id = ?", (QUEUED, job_id))
+                    metrics.inc("ayushma_jobs_total", event="lost")
+                row = db.execute(
+                    "SELECT * FROM jobs WHERE status = ? AND run_after <= ? ORDER BY priority DESC, created_at LIMIT 1",
+                    (QUEUED, now),
+                ).fetchone()
+                if row is not None:
+                    db.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, owner = ?, lease_until = ?, started_at = ? WHERE id = ?",
+                        (RUNNING, self.owner, now + self.lease, now, row["id"]),
+                    )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        for job_id in abandoned:
+            self._remove_documents(job_id)
+        return row
+
+    def _finish(self, job_id: str, status: str, result=None, error=None):
+        with self._lock:
+            cursor = self._connect().execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL"
+                " WHERE id = ? AND owner = ? AND status = ?",
+                (status, result, error, time.time(), job_id, self.owner, RUNNING),
+            )
+        if cursor.rowcount == 0:
+            # The lease lapsed and the job was requeued (or claimed by another worker), which now
+            # owns its documents; this result is dropped
+            logger.warning("Job %s lost its lease before finishing; result discarded", job_id)
+            return
+        self._remove_documents(job_id)
+        metrics.inc("ayushma_jobs_total", event=status)
+
+    def _retry(self, job_id: str, attempts: int, error: str):
+        """Requeue after a failure with exponential backoff, or fail the job for good."""
+        if attempts >= self.max_attempts:
+            logger.error("Job %s failed after %d attempts: %s", job_id, attempts, error)
+            self._finish(job_id, FAILED, error=error)
+            return
+        delay = 2 ** (attempts - 1)
+        logger.warning("Job %s attempt %d failed (%s); retrying in %ds", job_id, attempts, error, delay)
+        with self._lock:
+            cursor = self._connect().execute(
+                "UPDATE jobs SET status = ?, error = ?, run_after = ?, lease_until = NULL WHERE id = ? AND owner = ? AND status = ?",
+                (QUEUED, error, time.time() + delay, job_id, self.owner, RUNNING),
+            )
+        if cursor.rowcount == 0:
+            logger.warning("Job %s lost its lease before its retry was recorded", job_id)
+            return
+        metrics.inc("ayushma_jobs_total", event="retried")
+
+    def purge(self) -> int:
+        """Delete done and failed jobs that finished more than JOB_RETENTION seconds ago; returns how many."""
+        if self.retention <= 0:
+            return 0
+        with self._lock:
+            cursor = self._connect().execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (DONE, FAILED, time.time() - self.retention)
+            )
+        if cursor.rowcount:
+            logger.info("Purged %d finished audit jobs", cursor.rowcount)
+        return cursor.rowcount
+
+    def _renew(self, job_ids: list):
+        now = time.time()
+        with self._lock:
+            self._connect().executemany(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND owner = ? AND status = ?",
+                [(now + self.lease, job_id, self.owner, RUNNING) for job_id in job_ids],
+            )
+
+    def _release(self, job_ids: list):
+        """Give unfinished jobs back to the queue (shutdown); the interrupted attempt is not counted."""
+        with self._lock:
+            self._connect().executemany(
+                "UPDATE jobs SET status = ?, attempts = attempts - 1, lease_until = NULL WHERE id = ? AND owner = ? AND status = ?",
+                [(QUEUED, job_id, self.owner, RUNNING) for job_id in job_ids],
+            )
+
+    async def _worker(self, handler):
+        while True:
+            self._wake.clear()
+            try:
+                row = await asyncio.to_thread(self._claim)
+            except sqlite3.Error as e:
+                # e.g. "database is locked" under contention; the worker must outlive it
+                logger.error("Claiming a job failed: %s", e)
+                row = None
+            if row is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            job_id = row["id"]
+            attempts = row["attempts"] + 1
+            metrics.observe("job_wait", time.time() - row["created_at"])
+            self._running.add(job_id)
+            try:
+                with metrics.span("job_run"):
+                    result = await handler(json.loads(row["documents"]))
+            except asyncio.CancelledError:
+                raise  # still in self._running, so stop() requeues it
+            except Exception as e:
+                await self._record(self._retry, job_id, attempts, str(e) or type(e).__name__)
+            else:
+                await self._record(self._finish, job_id, DONE, json.dumps(result))
+            self._running.discard(job_id)
+
+    async def _record(self, method, job_id: str, *args):
+        """Run _finish or _retry off the loop. If the database refuses it, the job is no longer renewed
+        (the caller drops it from _running), so its lease lapses and it is run again."""
+        try:
+            await asyncio.to_thread(method, job_id, *args)
+        except sqlite3.Error as e:
+            logger.error("Recording the outcome of job %s failed: %s; it runs again once its lease lapses", job_id, e)
+
+    async def _heartbeat(self):
+        purged_at = None
+        while True:
+            try:
+                if self._running:
+                    await asyncio.to_thread(self._renew, list(self._running))
+                if purged_at is None or time.monotonic() - purged_at >= PURGE_INTERVAL:
+                    purged_at = time.monotonic()
+                    await asyncio.to_thread(self.purge)
+            except sqlite3.Error as e:
+                logger.error("Job queue maintenance failed: %s", e)
+            await asyncio.sleep(self.lease / 3)
+
+    def start(self, handler):
+        """
+        Start the workers on the running event loop. handler(documents) is an async callable that
+        returns the job result (JSON-serializable); documents are the dicts stored by submit().
+        """
+        if self._tasks or self.workers <= 0:
+            return
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(handler)) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+        logger.info("Started %d audit job workers (%s)", self.workers, self.db_path)
+
+    async def stop(self):
+        """Cancel the workers and requeue the jobs they were running."""
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._running:
+            await asyncio.to_thread(self._release, list(self._running))
+            self._running.clear()
+
+
+job_queue = JobQueue()
+metrics.collect("ayushma_jobs_queued", "Audit jobs waiting to run.", job_queue.queued)
@@ -0,0 +1,102 @@
+"""
+In-process metrics: per-stage timing histograms, counters and gauges,
+rendered in Prometheus text exposition format for GET /metrics.
+Each server worker (backend.server forks several) keeps its own registry, so every sample carries
+a worker="<pid>" label: consecutive scrapes reach different workers, and each worker's series
+stays monotonic. Aggregate with e.g. sum without (worker) (rate(...)).
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_help = {}
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # stage -> [bucket counts..., count, sum]
+_collected = {}   # name -> (type, callable returning a number)
+
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def describe(name: str, help_text: str):
+    """Set the # HELP line for a counter or gauge."""
+    _help[name] = help_text
+
+
+def inc(name: str, amount: float = 1, **labels):
+    """Add amount to a counter (created on first use)."""
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def collect(name: str, help_text: str, read, kind: str = "gauge"):
+    """Register a metric whose value is read() at scrape time (kind: gauge or counter)."""
+    _help[name] = help_text
+    _collected[name] = (kind, read)
+
+
+def observe(stage: str, seconds: float):
+    """Record one duration for an audit stage."""
+    with _lock:
+        hist = _histograms.get(stage)
+        if hist is None:
+            hist = _histograms[stage] = [0] * (len(STAGE_BUCKETS) + 2)
+        for i, bound in enumerate(STAGE_BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[-2] += 1
+        hist[-1] += seconds
+
+
+@contextmanager
+def span(stage: str):
+    """Time the enclosed block as one observation of stage (recorded even if it raises)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def _format_labels(labels, worker: str) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in (*labels, ("worker", worker))) + "}"
+
+
+def render() -> str:
+    """All metrics of this worker process in Prometheus text format."""
+    worker = str(os.getpid())
+    lines = [
+        "# HELP ayushma_stage_seconds Time spent in each audit stage.",
+        "# TYPE ayushma_stage_seconds histogram",
+    ]
+    with _lock:
+        histograms = {stage: list(hist) for stage, hist in _histograms.items()}
+        counters = dict(_counters)
+    for stage, hist in sorted(histograms.items()):
+        for bound, count in zip(STAGE_BUCKETS, hist):
+            lines.append(f'ayushma_stage_seconds_bucket{_format_labels((("stage", stage), ("le", bound)), worker)} {count}')
+        lines.append(f'ayushma_stage_seconds_bucket{_format_labels((("stage", stage), ("le", "+Inf")), worker)} {hist[-2]}')
+        lines.append(f'ayushma_stage_seconds_count{_format_labels((("stage", stage),), worker)} {hist[-2]}')
+        lines.append(f'ayushma_stage_seconds_sum{_format_labels((("stage", stage),), worker)} {hist[-1]:.6f}')
+
+    seen = set()
+    for (name, labels), value in sorted(counters.items()):
+        if name not in seen:
+            seen.add(name)
+            if name in _help:
+                lines.append(f"# HELP {name} {_help[name]}")
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_format_labels(labels, worker)} {value}")
+
+    for name, (kind, read) in sorted(_collected.items()):
+        lines.append(f"# HELP {name} {_help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name}{_format_labels((), worker)} {read()}")
+    return "\n".join(lines) + "\n"
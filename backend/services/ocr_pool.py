@@ -0,0 +1,166 @@
+"""
+Persistent EasyOCR worker pool.
+Each worker thread owns a warm easyocr.Reader and pulls batches of images from a bounded queue,
+so the model is loaded once (at warm-up) rather than on the first photograph of a request.
+Within a batch, images of the same size go through readtext_batched together, so text detection
+runs on them as one tensor batch.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from ..config import OCR_BATCH_SIZE, OCR_JOB_TIMEOUT, OCR_QUEUE_SIZE, OCR_RECOGNIZER_BATCH, OCR_WORKERS
+
+logger = logging.getLogger(__name__)
+
+
+class OCRQueueFull(Exception):
+    """Raised when OCR_QUEUE_SIZE jobs are already waiting."""
+
+
+def _read_images(reader, images: list) -> list:
+    """
+    Text per image (bytes). readtext_batched needs images of one size, and resizing them to a common
+    size would distort the others, so images are grouped by decoded size: each group of two or more
+    is one readtext_batched call, and an image with a size of its own goes through readtext.
+    """
+    from easyocr.utils import reformat_input
+
+    decoded = [reformat_input(image)[0] for image in images]
+    groups = {}
+    for i, img in enumerate(decoded):
+        groups.setdefault(img.shape, []).append(i)
+    texts = [None] * len(images)
+    for indices in groups.values():
+        if len(indices) == 1:
+            i = indices[0]
+            texts[i] = " ".join(reader.readtext(images[i], detail=0, batch_size=OCR_RECOGNIZER_BATCH))
+            continue
+        results = reader.readtext_batched([decoded[i] for i in indices], detail=0, batch_size=OCR_RECOGNIZER_BATCH)
+        for i, words in zip(indices, results):
+            texts[i] = " ".join(words)
+    return texts
+
+
+class OCRWorkerPool:
+    def __init__(
+        self,
+        languages: list,
+        workers: int = OCR_WORKERS,
+        queue_size: int = OCR_QUEUE_SIZE,
+        batch_size: int = OCR_BATCH_SIZE,
+        job_timeout: float = OCR_JOB_TIMEOUT,
+    ):
+        self.languages = languages
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.job_timeout = job_timeout
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._ready = threading.Semaphore(0)
+        self._lock = threading.Lock()
+        self._init_error = None  # why a worker's reader failed to load, if one did
+
+    def start(self):
+        """Spawn worker threads (idempotent). Each loads its reader before taking jobs."""
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"ocr-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def warm_up(self, timeout: float | None = None) -> bool:
+        """
+        Start workers and block until every reader is loaded. Returns False on timeout.
+        Raises RuntimeError if a reader failed to load.
+        """
+        self.start()
+        acquired = 0
+        while acquired < self.workers and self._ready.acquire(timeout=timeout):
+            acquired += 1
+        # Put the permits back: later warm_up calls return immediately, or wait only for the workers
+        # still loading
+        for _ in range(acquired):
+            self._ready.release()
+        if acquired < self.workers:
+            return False
+        if self._init_error is not None:
+            raise RuntimeError(f"EasyOCR reader failed to load: {self._init_error}") from self._init_error
+        return True
+
+    def _run(self):
+        logger.info("Initializing EasyOCR reader in %s...", threading.current_thread().name)
+        reader = None
+        init_error = None
+        try:
+            import easyocr  # torch is heavy; only workers pay for it
+
+            reader = easyocr.Reader(self.languages, gpu=False)
+        except Exception as e:
+            logger.error("EasyOCR reader failed to load: %s", e)
+            init_error = e
+            self._init_error = e
+        self._ready.release()
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            images, future = job
+            if not future.set_running_or_notify_cancel():
+                continue  # timed out while queued
+            if reader is None:
+                future.set_exception(init_error)
+                continue
+            try:
+                future.set_result(_read_images(reader, images))
+            except Exception as e:
+                future.set_exception(e)
+
+    def submit(self, images: list) -> Future:
+        """Queue one batch of image bytes; the future resolves to one text per image."""
+        self.start()
+        future = Future()
+        try:
+            self._jobs.put_nowait((images, future))
+        except queue.Full:
+            raise OCRQueueFull(f"OCR queue full ({self._jobs.maxsize} jobs waiting)")
+        return future
+
+    def recognize(self, images: list, timeout: float | None = None) -> list:
+        """
+        OCR many images, split into jobs of at most batch_size images, and return texts in order.
+        Raises TimeoutError unless every job finishes within timeout (default job_timeout) seconds
+        of the call; the jobs share that one deadline. On OCRQueueFull the jobs already queued are
+        cancelled.
+        """
+        timeout = self.job_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        futures = []
+        try:
+            for i in range(0, len(images), self.batch_size):
+                futures.append(self.submit(images[i:i + self.batch_size]))
+        except OCRQueueFull:
+            for f in futures:
+                f.cancel()
+            raise
+        texts = []
+        for future in futures:
+            try:
+                texts.extend(future.result(timeout=max(0, deadline - time.monotonic())))
+            except FutureTimeout:
+                for f in futures:
+                    f.cancel()
+                raise TimeoutError(f"OCR jobs did not finish within {timeout}s")
+        return texts
+
+    def shutdown(self):
+        with self._lock:
+            for _ in self._threads:
+                self._jobs.put(None)
+            for t in self._threads:
+                t.join()
+            self._threads = []
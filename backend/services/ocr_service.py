@@ -1,33 +1,59 @@
-import easyocr
-import pdfplumber
-import io
 import logging
+from importlib import metadata
+
+from ..config import OCR_LANGUAGES, PDF_MAX_PAGES
+from .extraction_cache import extraction_cache
+from .ocr_pool import OCRWorkerPool
+from .pdf_extract import PDFPLUMBER_VERSION, extract_pages
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def _easyocr_version() -> str:
+    try:
+        return metadata.version("easyocr")
+    except metadata.PackageNotFoundError:
+        return "none"
+
+
+# Parts of the extraction cache key; bump when extracted text changes
+PDF_EXTRACTOR_VERSION = f"ocr-pdf:1:{PDFPLUMBER_VERSION}:{PDF_MAX_PAGES}"
+IMAGE_EXTRACTOR_VERSION = f"ocr-image:1:{_easyocr_version()}"
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
 class OCRService:
+    """Facade over the PDF extractor and a warm EasyOCR worker pool."""
+
     def __init__(self, languages: list = ['en']):
-        self.reader = None # Lazy load
         self.languages = languages
+        self.pool = OCRWorkerPool(languages)
+
+    def warm_up(self, timeout: float | None = None) -> bool:
+        """Load EasyOCR readers now so the first image request does not pay for it. Raises RuntimeError if one fails to load."""
+        logger.info("Warming up EasyOCR workers...")
+        return self.pool.warm_up(timeout)
 
-    def _get_reader(self):
-        if self.reader is None:
-            logger.info("Initializing EasyOCR...")
-            self.reader = easyocr.Reader(self.languages)
-        return self.reader
+    def _image_cache_key(self) -> str:
+        return f"{IMAGE_EXTRACTOR_VERSION}:{'+'.join(self.languages)}"
 
     def extract_text(self, file_bytes: bytes, filename: str) -> str:
         """
         Extracts text from PDF or Image based on extension.
+        PDF and image results are cached by content hash, so resubmissions skip extraction.
         """
         filename = filename.lower()
         
         try:
             if filename.endswith(".pdf"):
-                return self._extract_from_pdf(file_bytes)
-            elif filename.endswith((".jpg", ".jpeg", ".png")):
-                return self._extract_from_image(file_bytes)
+                return extraction_cache.get_or_extract(
+                    file_bytes, PDF_EXTRACTOR_VERSION, lambda: self._extract_from_pdf(file_bytes)
+                )
+            elif filename.endswith(IMAGE_EXTENSIONS):
+                return extraction_cache.get_or_extract(
+                    file_bytes, self._image_cache_key(), lambda: self._extract_from_image(file_bytes)
+                )
             elif filename.endswith(".txt"):
                 return file_bytes.decode("utf-8", errors="ignore")
             else:
@@ -37,18 +63,31 @@ class OCRService:
             logger.error(f"Error processing {filename}: {e}")
             return ""
 
+    def extract_images(self, images: list) -> list:
+        """
+        OCR a batch of images (bytes) in one trip through the worker pool.
+        Cached images are skipped; returns one text per image, "" for images that failed.
+        """
+        key = self._image_cache_key()
+        texts = [extraction_cache.get(extraction_cache.key(image, key)) for image in images]
+        todo = [i for i, text in enumerate(texts) if text is None]
+        if todo:
+            try:
+                recognized = self.pool.recognize([images[i] for i in todo])
+            except Exception as e:
+                logger.error(f"Error processing image batch: {e}")
+                recognized = [None] * len(todo)
+            for i, text in zip(todo, recognized):
+                if text is not None:
+                    extraction_cache.put(extraction_cache.key(images[i], key), text)
+                texts[i] = text or ""
+        return texts
+
     def _extract_from_pdf(self, file_bytes: bytes) -> str:
-        text = ""
-        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text
+        # Page-parallel for long PDFs; same text as extracting pages one by one
+        return "".join(page_text + "\n" for page_text in extract_pages(file_bytes) if page_text)
 
     def _extract_from_image(self, file_bytes: bytes) -> str:
-        reader = self._get_reader()
-        result = reader.readtext(file_bytes, detail=0)
-        return " ".join(result)
+        return self.pool.recognize([file_bytes])[0]
 
-ocr_engine = OCRService()
+ocr_engine = OCRService(OCR_LANGUAGES)
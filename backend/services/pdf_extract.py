@@ -0,0 +1,89 @@
+"""
+Page-level PDF text extraction shared by file_reader and OCRService.
+Long PDFs are split into contiguous page ranges that are extracted on a process pool and
+reassembled in page order, so the text is identical to the serial path.
+pdfplumber (with pdfminer) is imported on the first PDF, not when the server starts.
+"""
+import io
+import logging
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata, util
+
+from ..config import PDF_MAX_PAGES, PDF_PARALLEL_MIN_PAGES, PDF_WORKERS
+
+HAS_PDF = util.find_spec("pdfplumber") is not None
+try:
+    # Part of the extraction cache keys; read from the installed metadata so nothing is imported
+    PDFPLUMBER_VERSION = metadata.version("pdfplumber") if HAS_PDF else "none"
+except metadata.PackageNotFoundError:
+    PDFPLUMBER_VERSION = "none"
+
+logger = logging.getLogger(__name__)
+
+# One pool per worker count, created on first parallel extraction. The pool is created lazily in a
+# process that already runs threads (audit pool, OCR, job queue); forking it could copy a lock held
+# by one of them, so pool processes come from a forkserver instead, or are spawned where there is
+# no forkserver (Windows, and macOS builds without it).
+_pools = {}
+
+
+def _start_method() -> str:
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _open_pdf(source):
+    """source is the PDF bytes or a filesystem path."""
+    import pdfplumber
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return pdfplumber.open(io.BytesIO(source))
+    return pdfplumber.open(source)
+
+
+def _extract_range(source, start: int, stop: int) -> list:
+    """Worker: extract pages [start, stop) from a freshly opened PDF."""
+    with _open_pdf(source) as pdf:
+        return [pdf.pages[i].extract_text() for i in range(start, stop)]
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    pool = _pools.get(workers)
+    if pool is None:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(_start_method()))
+        _pools[workers] = pool
+    return pool
+
+
+def extract_pages(source, workers: int | None = None, max_pages: int | None = None) -> list:
+    """
+    Extract text of each page, in page order (None where a page has no text).
+    - workers: process count for parallel mode (default PDF_WORKERS; <= 1 means serial).
+    - max_pages: page cap (default PDF_MAX_PAGES; 0 means no cap).
+    Raises if the PDF cannot be opened; callers decide how to report it.
+    """
+    if not HAS_PDF:
+        raise RuntimeError("pdfplumber not installed; cannot read PDF")
+    workers = PDF_WORKERS if workers is None else workers
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+
+    with _open_pdf(source) as pdf:
+        n_pages = len(pdf.pages)
+        if max_pages and n_pages > max_pages:
+            logger.warning("%d pages exceeds cap of %d; extracting first %d", n_pages, max_pages, max_pages)
+            n_pages = max_pages
+        if workers <= 1 or n_pages < PDF_PARALLEL_MIN_PAGES:
+            return [pdf.pages[i].extract_text() for i in range(n_pages)]
+
+    # One contiguous range per worker keeps the PDF transfer to a single copy per process
+    workers = min(workers, n_pages)
+    size = math.ceil(n_pages / workers)
+    ranges = [(start, min(start + size, n_pages)) for start in range(0, n_pages, size)]
+    pool = _get_pool(workers)
+    futures = [pool.submit(_extract_range, source, start, stop) for start, stop in ranges]
+    pages = []
+    for future in futures:
+        pages.extend(future.result())
+    logger.debug("Extracted %d pages across %d workers", n_pages, len(ranges))
+    return pages
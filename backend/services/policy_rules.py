@@ -1,34 +1,28 @@
 """
-Policy validation: package_code + max_amount from pmjay_rules.json.
+Policy validation: package_code + max_amount from the PM-JAY catalogue (pmjay_subset.json),
+via the compiled rule engine.
 """
-import json
-from pathlib import Path
+import logging
 
-# Path to rules file (backend/data/pmjay_rules.json)
-_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
-_RULES_PATH = _DATA_DIR / "pmjay_rules.json"
+from .rule_engine import rule_engine
 
-_rules_cache = None
+logger = logging.getLogger(__name__)
 
 
-def _load_rules():
-    global _rules_cache
-    if _rules_cache is not None:
-        return _rules_cache
-    if not _RULES_PATH.exists():
-        print(f"[policy_rules] WARNING: Rules file not found at {_RULES_PATH}")
-        _rules_cache = {}
-        return _rules_cache
-    try:
-        with open(_RULES_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        _rules_cache = {r["package_code"]: r for r in data if "package_code" in r and "max_amount" in r}
-        print(f"[policy_rules] Loaded {len(_rules_cache)} rules from {_RULES_PATH}")
-        return _rules_cache
-    except Exception as e:
-        print(f"[policy_rules] Failed to load rules: {e}")
-        _rules_cache = {}
-        return _rules_cache
+def _result(package_code: str, billed_amount: float, r: dict) -> dict:
+    if r["max_amount"] is None:
+        if not package_code:
+            logger.warning("No package_code provided")
+        else:
+            logger.warning("Unknown package_code: %s", package_code)
+    elif r["status"] == "CLEAN":
+        logger.debug("CLEAN: %s billed=%s <= max=%s", package_code, billed_amount, r["max_amount"])
+    else:
+        logger.debug(
+            "PARTIAL_APPROVAL: %s billed=%s > max=%s, flagged=%s",
+            package_code, billed_amount, r["max_amount"], r["flagged_amount"],
+        )
+    return {"status": r["status"], "approved_amount": r["approved_amount"], "flagged_amount": r["flagged_amount"]}
 
 
 def validate(package_code: str, billed_amount: float) -> dict:
@@ -36,31 +30,10 @@ def validate(package_code: str, billed_amount: float) -> dict:
     Validate claim: package_code vs billed_amount.
     Returns: status (CLEAN | PARTIAL_APPROVAL), approved_amount, flagged_amount.
     """
-    rules = _load_rules()
-    approved_amount = 0.0
-    flagged_amount = 0.0
-    status = "PARTIAL_APPROVAL"
-
-    if not package_code:
-        print("[policy_rules] No package_code provided")
-        return {"status": "PARTIAL_APPROVAL", "approved_amount": 0.0, "flagged_amount": billed_amount}
-
-    r = rules.get(package_code)
-    if not r:
-        print(f"[policy_rules] Unknown package_code: {package_code}")
-        return {"status": "PARTIAL_APPROVAL", "approved_amount": 0.0, "flagged_amount": billed_amount}
+    return _result(package_code, billed_amount, rule_engine.validate(package_code, float(billed_amount)))
 
-    max_amount = float(r.get("max_amount", 0))
-    billed_amount = float(billed_amount)
-
-    if billed_amount <= max_amount:
-        status = "CLEAN"
-        approved_amount = billed_amount
-        flagged_amount = 0.0
-        print(f"[policy_rules] CLEAN: {package_code} billed={billed_amount} <= max={max_amount}")
-    else:
-        approved_amount = max_amount
-        flagged_amount = billed_amount - max_amount
-        print(f"[policy_rules] PARTIAL_APPROVAL: {package_code} billed={billed_amount} > max={max_amount}, flagged={flagged_amount}")
 
-    return {"status": status, "approved_amount": approved_amount, "flagged_amount": flagged_amount}
+def validate_batch(package_codes: list, billed_amounts: list) -> list:
+    """validate() for many claims in one vectorized pass; results in input order."""
+    results = rule_engine.validate_batch(package_codes, [float(b) for b in billed_amounts])
+    return [_result(c, b, r) for c, b, r in zip(package_codes, billed_amounts, results)]
@@ -1,23 +1,14 @@
-import json
-from pathlib import Path
+from .rule_engine import rule_engine
 
 class PolicyValidator:
-    def __init__(self):
-        self.policy_path = Path(__file__).parent.parent / "data" / "pmjay_subset.json"
-        self.policies = self._load_policies()
-
-    def _load_policies(self):
-        try:
-            if not self.policy_path.exists():
-                print(f"Warning: Policy file not found at {self.policy_path}")
-                return {}
-            with open(self.policy_path, "r") as f:
-                data = json.load(f)
-                # Ensure we handle list of packages
-                return {pkg["package_code"]: pkg for pkg in data}
-        except Exception as e:
-            print(f"Error loading policies: {e}")
-            return {}
+    """Claim validation with a human-readable reason, backed by the shared rule engine."""
+
+    def __init__(self, engine=rule_engine):
+        self.engine = engine
+
+    @property
+    def policies(self):
+        return self.engine.catalogue().packages
 
     def validate_claim(self, package_code: str, billed_amount: float) -> dict:
         result = {
@@ -31,21 +22,17 @@ class PolicyValidator:
             result["reason"] = "No package predicted"
             return result
 
-        policy = self.policies.get(package_code)
-        if not policy:
+        if self.engine.package(package_code) is None:
             result["reason"] = f"Unknown package code: {package_code}"
             return result
 
-        max_amount = policy.get("max_amount", 0)
-
-        if billed_amount <= max_amount:
-            result["status"] = "CLEAN"
-            result["approved_amount"] = float(billed_amount)
+        r = self.engine.validate(package_code, billed_amount)
+        result["status"] = r["status"]
+        result["approved_amount"] = r["approved_amount"]
+        result["flagged_amount"] = r["flagged_amount"]
+        if r["status"] == "CLEAN":
             result["reason"] = "Claim is within policy limits"
         else:
-            result["status"] = "PARTIAL_APPROVAL"
-            result["approved_amount"] = float(max_amount)
-            result["flagged_amount"] = billed_amount - max_amount
-            result["reason"] = f"Claim exceeds max limit of {max_amount}"
+            result["reason"] = f"Claim exceeds max limit of {r['max_amount']:g}"
 
         return result
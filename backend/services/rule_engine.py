@@ -0,0 +1,191 @@
+"""
+Policy rule engine over the PM-JAY package catalogue (backend/data/pmjay_subset.json).
+The catalogue is compiled once into a code -> row hash index, NumPy arrays of limits and a
+sorted TBSA interval index, so a batch of claims is validated in one vectorized pass.
+The file is re-read when its mtime changes; a catalogue that fails to compile is rejected
+and the previous one stays active.
+"""
+import bisect
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ..config import POLICY_CATALOGUE, POLICY_RELOAD_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+CLEAN = "CLEAN"
+PARTIAL_APPROVAL = "PARTIAL_APPROVAL"
+
+
+class Catalogue:
+    """Immutable compiled snapshot of the package catalogue."""
+
+    def __init__(self, packages: list, source: str = "", mtime: float = 0.0):
+        codes = [p["package_code"] for p in packages]
+        if len(set(codes)) != len(codes):
+            raise ValueError("Duplicate package_code in catalogue")
+        self.source = source
+        self.mtime = mtime
+        # Content hash: identifies the rules results were computed with (idempotency keys)
+        self.version = hashlib.sha256(json.dumps(packages, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        self.packages = {p["package_code"]: p for p in packages}
+        self.codes = np.array(codes, dtype=object)
+        self.index = {code: i for i, code in enumerate(codes)}
+        self.max_amount = np.array([float(p["max_amount"]) for p in packages], dtype=np.float64)
+
+        # TBSA interval index: packages with a range, sorted by lower bound. A value v belongs to
+        # the package with min_tbsa < v <= max_tbsa; the lowest range also includes its min_tbsa.
+        ranged = sorted(
+            (float(p["min_tbsa"]), float(p["max_tbsa"]), i)
+            for i, p in enumerate(packages)
+            if p.get("min_tbsa") is not None and p.get("max_tbsa") is not None
+        )
+        for (lo, hi, i), (next_lo, _, j) in zip(ranged, ranged[1:]):
+            if next_lo < hi:
+                raise ValueError(f"TBSA ranges of {codes[i]} and {codes[j]} overlap")
+        self.tbsa_min = np.array([r[0] for r in ranged], dtype=np.float64)
+        self.tbsa_max = np.array([r[1] for r in ranged], dtype=np.float64)
+        self.tbsa_rows = np.array([r[2] for r in ranged], dtype=np.intp)
+        # Plain-list copies for bisect: faster than NumPy for one value at a time
+        self._tbsa_min = self.tbsa_min.tolist()
+        self._tbsa_max = self.tbsa_max.tolist()
+        self._tbsa_rows = self.tbsa_rows.tolist()
+
+    def row_for_tbsa(self, value: float) -> int:
+        """rows_for_tbsa for a single value, using bisect."""
+        k = bisect.bisect_left(self._tbsa_max, value)
+        if k == len(self._tbsa_rows):
+            return -1
+        if value > self._tbsa_min[k] or (k == 0 and value == self._tbsa_min[0]):
+            return self._tbsa_rows[k]
+        return -1
+
+    def rows_for_tbsa(self, values) -> np.ndarray:
+        """Catalogue row per TBSA value, or -1 where no range contains it."""
+        values = np.asarray(values, dtype=np.float64)
+        if not self.tbsa_rows.size:
+            return np.full(values.shape, -1, dtype=np.intp)
+        # Range k is (tbsa_min[k], tbsa_max[k]]: the first range with tbsa_max >= v is the candidate
+        pos = np.searchsorted(self.tbsa_max, values, side="left")
+        hit = pos < self.tbsa_rows.size
+        pos = np.where(hit, pos, 0)
+        lower_ok = (values > self.tbsa_min[pos]) | ((pos == 0) & (values == self.tbsa_min[0]))
+        return np.where(hit & lower_ok, self.tbsa_rows[pos], -1)
+
+
+def compile_catalogue(path) -> Catalogue:
+    """Read and compile a catalogue file. Raises on unreadable or inconsistent data."""
+    path = Path(path)
+    mtime = path.stat().st_mtime
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    packages = [p for p in data if "package_code" in p and "max_amount" in p]
+    return Catalogue(packages, str(path), mtime)
+
+
+class RuleEngine:
+    def __init__(self, path=POLICY_CATALOGUE, reload_interval: float = POLICY_RELOAD_INTERVAL):
+        self.path = Path(path)
+        self.reload_interval = reload_interval
+        self._catalogue = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def catalogue(self) -> Catalogue:
+        """Active catalogue; re-stats the file at most every reload_interval seconds."""
+        current = self._catalogue
+        now = time.monotonic()
+        if current is not None and now - self._checked_at < self.reload_interval:
+            return current
+        with self._lock:
+            if self._catalogue is not current:
+                return self._catalogue
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError as e:
+                if current is None:
+                    logger.warning("Policy catalogue not found at %s: %s", self.path, e)
+                    self._catalogue = Catalogue([], str(self.path))
+                return self._catalogue
+            if current is None or mtime != current.mtime:
+                self._load()
+            return self._catalogue
+
+    def _load(self):
+        try:
+            compiled = compile_catalogue(self.path)
+        except Exception as e:
+            logger.error("Failed to load policy catalogue %s: %s", self.path, e)
+            if self._catalogue is None:
+                self._catalogue = Catalogue([], str(self.path))
+            return False
+        previous = self._catalogue
+        self._catalogue = compiled
+        if previous is None:
+            logger.info("Loaded %d packages from %s", len(compiled.packages), self.path)
+        else:
+            logger.info("Reloaded %d packages from %s", len(compiled.packages), self.path)
+        return True
+
+    def reload(self) -> bool:
+        """Recompile the catalogue now. Returns False (keeping the old one) if it is invalid."""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            return self._load()
+
+    def package(self, code: str):
+        """Catalogue entry for a package code, or None."""
+        return self.catalogue().packages.get(code)
+
+    def package_for_tbsa(self, tbsa: float):
+        """Catalogue entry whose TBSA range contains tbsa, or None."""
+        catalogue = self.catalogue()
+        row = catalogue.row_for_tbsa(tbsa)
+        return catalogue.packages[catalogue.codes[row]] if row >= 0 else None
+
+    def packages_for_tbsa(self, values) -> list:
+        """package_for_tbsa for many values with one searchsorted call."""
+        catalogue = self.catalogue()
+        rows = catalogue.rows_for_tbsa(values)
+        return [catalogue.packages[catalogue.codes[r]] if r >= 0 else None for r in rows.tolist()]
+
+    def validate(self, package_code: str, billed_amount: float) -> dict:
+        return self.validate_batch([package_code], [billed_amount])[0]
+
+    def validate_batch(self, package_codes: list, billed_amounts: list) -> list:
+        """
+        Validate claims (package_code[i], billed_amount[i]) in one vectorized pass.
+        Each result: status (CLEAN | PARTIAL_APPROVAL), approved_amount, flagged_amount, max_amount.
+        Missing or unknown codes get PARTIAL_APPROVAL with nothing approved and max_amount None.
+        """
+        catalogue = self.catalogue()
+        rows = np.fromiter((catalogue.index.get(c, -1) for c in package_codes), dtype=np.intp, count=len(package_codes))
+        billed = np.asarray(billed_amounts, dtype=np.float64).reshape(len(package_codes))
+        known = rows >= 0
+        if catalogue.max_amount.size:
+            limit = np.where(known, catalogue.max_amount[np.where(known, rows, 0)], 0.0)
+        else:
+            limit = np.zeros(len(rows))
+        clean = known & (billed <= limit)
+        approved = np.where(known, np.minimum(billed, limit), 0.0)
+        flagged = np.where(clean, 0.0, billed - approved)
+        return [
+            {
+                "status": CLEAN if ok else PARTIAL_APPROVAL,
+                "approved_amount": a,
+                "flagged_amount": f,
+                "max_amount": m if k else None,
+            }
+            for ok, a, f, m, k in zip(clean.tolist(), approved.tolist(), flagged.tolist(), limit.tolist(), known.tolist())
+        ]
+
+
+rule_engine = RuleEngine()
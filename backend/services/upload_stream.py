@@ -0,0 +1,279 @@
+"""
+Streaming ingest for uploaded documents.
+The multipart request body is parsed as it arrives (python-multipart), counted against a
+per-request byte budget chunk by chunk, and each file part is written straight to its spool while
+its SHA-256 is computed. Small files stay in memory; larger ones go to a temp file that extractors
+open by path, so a 50 MB scanned PDF is never held as one bytes object or copied twice.
+Spool file writes run in a thread, off the event loop.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import tempfile
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from ..config import UPLOAD_CHUNK_SIZE, UPLOAD_SPOOL_DIR, UPLOAD_SPOOL_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+
+# Plain (non-file) form fields are small values such as priority
+MAX_FIELD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(Exception):
+    """Raised as soon as a request's uploads exceed their byte budget."""
+
+
+class MalformedUpload(ValueError):
+    """The request body is not a well-formed multipart/form-data body."""
+
+
+class ByteBudget:
+    """Running total of bytes read for one request."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+
+    def consume(self, n: int):
+        self.used += n
+        if self.used > self.limit:
+            raise UploadTooLarge(f"Uploads exceed {self.limit} bytes")
+
+
+class SpooledDocument:
+    """An uploaded document held either in memory (content) or in a temp file (path)."""
+
+    def __init__(self, filename: str, size: int, sha256: str, content: bytes | None = None, path: str | None = None):
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+        self.content = content
+        self.path = path
+
+    @property
+    def source(self):
+        """Bytes or filesystem path, as accepted by pdf_extract."""
+        return self.content if self.path is None else self.path
+
+    def open(self):
+        """Binary file handle positioned at the start."""
+        if self.path is None:
+            return io.BytesIO(self.content or b"")
+        return open(self.path, "rb")
+
+    def iter_chunks(self, chunk_size: int = UPLOAD_CHUNK_SIZE):
+        with self.open() as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def read_bytes(self) -> bytes:
+        """Whole document as bytes; for consumers (e.g. OCR) that need it in memory."""
+        if self.path is None:
+            return self.content or b""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def close(self):
+        """Remove the spool file, if any."""
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+        self.content = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _PartWriter:
+    """One file part being received: in memory up to UPLOAD_SPOOL_THRESHOLD, then in a temp file."""
+
+    def __init__(self, filename: str, anonymous: bool = False):
+        self.filename = filename
+        self.anonymous = anonymous  # sent without a filename
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.buffer = bytearray()
+        self.spool = None
+
+    def spools(self, n: int) -> bool:
+        """Whether writing n more bytes touches the disk."""
+        return self.spool is not None or len(self.buffer) + n > UPLOAD_SPOOL_THRESHOLD
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        self.digest.update(data)
+        if self.spool is None and len(self.buffer) + len(data) > UPLOAD_SPOOL_THRESHOLD:
+            suffix = os.path.splitext(self.filename)[1]
+            self.spool = tempfile.NamedTemporaryFile(prefix="ayushma-", suffix=suffix, dir=UPLOAD_SPOOL_DIR, delete=False)
+            self.spool.write(self.buffer)
+            self.buffer = None
+        if self.spool is None:
+            self.buffer += data
+        else:
+            self.spool.write(data)
+
+    def finish(self) -> SpooledDocument:
+        if self.spool is None:
+            return SpooledDocument(self.filename, self.size, self.digest.hexdigest(), content=bytes(self.buffer))
+        self.spool.close()
+        logger.debug("Spooled %s (%d bytes) to %s", self.filename, self.size, self.spool.name)
+        return SpooledDocument(self.filename, self.size, self.digest.hexdigest(), path=self.spool.name)
+
+    def abort(self):
+        if self.spool is not None:
+            self.spool.close()
+            try:
+                os.unlink(self.spool.name)
+            except FileNotFoundError:
+                pass
+            self.spool = None
+
+
+def _write_parts(pieces: list):
+    for writer, data in pieces:
+        writer.write(data)
+
+
+class UploadForm:
+    """A parsed multipart body: files maps field -> [SpooledDocument] in upload order, fields maps field -> str."""
+
+    def __init__(self):
+        self.files = {}
+        self.fields = {}
+
+    def documents(self) -> list:
+        return [doc for docs in self.files.values() for doc in docs]
+
+    def close(self):
+        for doc in self.documents():
+            doc.close()
+
+
+class _FormParser:
+    """python-multipart callbacks; file data is queued by the callbacks and written by read_multipart."""
+
+    def __init__(self, form: UploadForm):
+        self.form = form
+        self.pending = []  # (writer, data) received in the current chunk
+        self.finished = []  # (field, writer) whose part ended in the current chunk
+        self.open = []  # writers not finished yet, for cleanup on error
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._field = None
+        self._writer = None
+        self._data = None
+
+    def on_part_begin(self):
+        self._disposition = b""
+        self._field = None
+        self._writer = None
+        self._data = None
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise MalformedUpload('Part without a Content-Disposition "name"')
+        self._field = options[b"name"].decode("utf-8", "replace")
+        if b"filename" in options:
+            filename = options[b"filename"].decode("utf-8", "replace")
+            self._writer = _PartWriter(filename or f"{self._field}.txt", anonymous=not filename)
+            self.open.append(self._writer)
+        else:
+            self._data = bytearray()
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._writer is not None:
+            self.pending.append((self._writer, data[start:end]))
+            return
+        if len(self._data) + end - start > MAX_FIELD_BYTES:
+            raise MalformedUpload(f"Form field {self._field!r} exceeds {MAX_FIELD_BYTES} bytes")
+        self._data += data[start:end]
+
+    def on_part_end(self):
+        if self._writer is not None:
+            self.finished.append((self._field, self._writer))
+        else:
+            self.form.fields[self._field] = self._data.decode("utf-8", "replace")
+
+
+async def read_multipart(request, budget: ByteBudget) -> UploadForm:
+    """
+    Parse a multipart/form-data request from request.stream(), enforcing the budget on every chunk
+    received, so an oversized upload is refused once the limit is crossed rather than after the
+    whole body has arrived. A file part without a filename is named <field>.txt, or dropped if it
+    is also empty (an unused file input). On any error the spool files are removed before re-raising.
+    """
+    _, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise MalformedUpload("Expected a multipart/form-data body with a boundary")
+
+    form = UploadForm()
+    handler = _FormParser(form)
+    callbacks = {name: getattr(handler, name) for name in (
+        "on_part_begin", "on_header_field", "on_header_value", "on_header_end",
+        "on_headers_finished", "on_part_data", "on_part_end",
+    )}
+    parser = MultipartParser(boundary, callbacks)
+    try:
+        async for chunk in request.stream():
+            budget.consume(len(chunk))
+            try:
+                parser.write(chunk)
+            except MalformedUpload:
+                raise
+            except Exception as e:
+                raise MalformedUpload(f"Invalid multipart body: {e}") from e
+            pieces, handler.pending = handler.pending, []
+            # Decide on each writer's total for this chunk before anything is buffered: a part split
+            # into several pieces can cross the threshold even if no single piece does
+            totals = {}
+            for writer, data in pieces:
+                totals[writer] = totals.get(writer, 0) + len(data)
+            if any(writer.spools(n) for writer, n in totals.items()):
+                await asyncio.to_thread(_write_parts, pieces)
+            else:
+                _write_parts(pieces)
+            for field, writer in handler.finished:
+                handler.open.remove(writer)
+                if writer.size or not writer.anonymous:
+                    # Closing a spool flushes it to disk
+                    doc = writer.finish() if writer.spool is None else await asyncio.to_thread(writer.finish)
+                    form.files.setdefault(field, []).append(doc)
+            handler.finished = []
+        parser.finalize()
+        if handler.open:
+            raise MalformedUpload("Multipart body ended inside a part")
+    except BaseException:
+        for writer in handler.open:
+            writer.abort()
+        form.close()
+        raise
+    return form
@@ -0,0 +1,49 @@
+"""
+Bounded worker pool for blocking audit stages (file parsing, inference, validation).
+Keeps the asyncio event loop free; admission control sheds load once too many audits are pending.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+
+from ..config import AUDIT_MAX_PENDING, AUDIT_WORKERS
+from . import metrics
+
+_executor = ThreadPoolExecutor(max_workers=AUDIT_WORKERS, thread_name_prefix="audit")
+_lock = threading.Lock()
+_pending = 0
+
+
+class Overloaded(Exception):
+    """Raised when AUDIT_MAX_PENDING audits are already admitted (running or queued)."""
+
+
+@contextmanager
+def admit():
+    """Hold one audit slot for the duration of the block; raise Overloaded if none is free."""
+    global _pending
+    with _lock:
+        if _pending >= AUDIT_MAX_PENDING:
+            raise Overloaded(f"{_pending} audits pending (limit {AUDIT_MAX_PENDING})")
+        _pending += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _pending -= 1
+
+
+def pending() -> int:
+    """Number of audits currently admitted."""
+    return _pending
+
+
+metrics.collect("ayushma_audits_pending", "Audits currently admitted (running or queued).", pending)
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking callable on the audit pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(fn, *args, **kwargs))
@@ -0,0 +1,222 @@
+"""
+Load-test and latency benchmark for POST /audit.
+
+Replays the claims in sample_claims/ and test_documents/ plus synthetic large TXT and PDF bills
+at a configurable concurrency, then reports requests/s, end-to-end p50/p95/p99 latency, per-stage
+latency and peak RSS. Results are written as JSON so runs can be compared across commits.
+
+By default the FastAPI app runs in-process (httpx ASGI transport), which also lets the harness
+time each audit stage. With --url it drives a running server instead (no per-stage numbers).
+Every request carries a fresh Idempotency-Key (and the in-process idempotency cache is off), so
+repeated claims are audited again rather than replayed.
+
+Usage (from project root; needs httpx):
+    python -m benchmarks.bench_audit --requests 200 --concurrency 8 --out bench_audit.json
+    python -m benchmarks.bench_audit --url http://127.0.0.1:8000 --requests 500 --concurrency 32
+"""
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import logging
+import platform
+import resource
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.synthetic import NOTES, pdf_bill, text_bill
+
+CLAIM_DIRS = ["sample_claims/clean", "sample_claims/mismatch", "sample_claims/generated_clean", "test_documents"]
+# Stages timed in-process: (module attribute in backend.app, stage name)
+STAGES = [
+    ("read_multipart", "upload_read"),
+    ("read_document", "text_extraction"),
+    ("predict_with_confidence", "predict"),
+    ("_extract_amount", "amount_extraction"),
+    ("validate", "policy_validation"),
+]
+
+
+def _find(directory: Path, word: str):
+    for path in sorted(directory.iterdir()):
+        if word in path.name.lower().replace(" ", "_") and path.suffix.lower() in (".txt", ".pdf"):
+            return path
+    return None
+
+
+def load_claims(large_txt_mb: float, pdf_pages: int) -> list:
+    """[(kind, files)] where files maps form field -> (filename, bytes)."""
+    claims = []
+    for rel in CLAIM_DIRS:
+        directory = ROOT / rel
+        notes, bill = _find(directory, "clinical"), _find(directory, "bill")
+        if notes and bill:
+            claims.append((rel, {
+                "clinical_notes": (notes.name, notes.read_bytes()),
+                "hospital_bill": (bill.name, bill.read_bytes()),
+            }))
+    notes = ("clinical_notes.txt", NOTES.encode())
+    if large_txt_mb > 0:
+        claims.append((f"synthetic-txt-{large_txt_mb:g}mb", {
+            "clinical_notes": notes,
+            "hospital_bill": ("hospital_bill.txt", text_bill(int(large_txt_mb * 1024 * 1024))),
+        }))
+    if pdf_pages > 0:
+        claims.append((f"synthetic-pdf-{pdf_pages}p", {
+            "clinical_notes": notes,
+            "hospital_bill": ("hospital_bill.pdf", pdf_bill(pdf_pages)),
+        }))
+    return claims
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {"count": len(ordered), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": round(ordered[-1] * 1000, 3)}
+
+
+def instrument_stages(app_module, timings: dict):
+    """Wrap the stage functions backend.app calls so each call records its duration."""
+    for attr, stage in STAGES:
+        fn = getattr(app_module, attr)
+        samples = timings.setdefault(stage, [])
+        if asyncio.iscoroutinefunction(fn):
+            async def timed(*args, _fn=fn, _samples=samples, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await _fn(*args, **kwargs)
+                finally:
+                    _samples.append(time.perf_counter() - start)
+        else:
+            def timed(*args, _fn=fn, _samples=samples, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return _fn(*args, **kwargs)
+                finally:
+                    _samples.append(time.perf_counter() - start)
+        setattr(app_module, attr, functools.wraps(fn)(timed))
+
+
+async def run_load(client, claims: list, total: int, concurrency: int) -> dict:
+    latencies = {kind: [] for kind, _ in claims}
+    statuses = {}
+    schedule = itertools.islice(itertools.cycle(claims), total)
+    lock = asyncio.Lock()
+
+    async def worker():
+        while True:
+            async with lock:
+                item = next(schedule, None)
+            if item is None:
+                return
+            kind, files = item
+            start = time.perf_counter()
+            # A fresh Idempotency-Key per request, so a running server never replays a stored result
+            response = await client.post("/audit", files=files, headers={"Idempotency-Key": uuid.uuid4().hex})
+            latencies[kind].append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {"elapsed_s": elapsed, "latencies": latencies, "statuses": statuses}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+async def main_async(args) -> dict:
+    try:
+        import httpx
+    except ImportError:
+        sys.exit("bench_audit needs httpx: pip install httpx")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    claims = load_claims(args.large_txt_mb, args.pdf_pages)
+    stage_timings = {}
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        from backend import app as app_module
+        from backend.services.extraction_cache import extraction_cache
+        from backend.services.idempotency import idempotency_cache
+        idempotency_cache.ttl = 0  # every request runs the full audit instead of replaying
+        if not args.extraction_cache:
+            extraction_cache.max_bytes = 0  # every repeat upload is extracted again
+        instrument_stages(app_module, stage_timings)
+        transport = httpx.ASGITransport(app=app_module.app)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout)
+
+    async with client:
+        if args.warmup:
+            await run_load(client, claims, len(claims), 1)
+            for samples in stage_timings.values():
+                samples.clear()
+        run = await run_load(client, claims, args.requests, args.concurrency)
+
+    all_latencies = [x for samples in run["latencies"].values() for x in samples]
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "mode": "url" if args.url else "in-process",
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "large_txt_mb": args.large_txt_mb,
+            "pdf_pages": args.pdf_pages,
+            "extraction_cache": args.extraction_cache,
+        },
+        "requests_per_s": round(args.requests / run["elapsed_s"], 2),
+        "elapsed_s": round(run["elapsed_s"], 3),
+        "status_codes": run["statuses"],
+        "latency": percentiles(all_latencies),
+        "latency_by_claim": {kind: percentiles(samples) for kind, samples in run["latencies"].items()},
+        "stages": {stage: percentiles(samples) for stage, samples in stage_timings.items()},
+        # ru_maxrss is KiB on Linux; in --url mode this is the harness only
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=100, help="Total /audit requests")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    parser.add_argument("--large-txt-mb", type=float, default=2.0, help="Size of the synthetic TXT bill (0 = skip)")
+    parser.add_argument("--pdf-pages", type=int, default=20, help="Pages in the synthetic PDF bill (0 = skip)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout in seconds")
+    parser.add_argument(
+        "--no-extraction-cache", dest="extraction_cache", action="store_false",
+        help="In-process only: disable the extraction cache so repeated bills are parsed every time",
+    )
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", help="Skip one untimed pass over the claims")
+    parser.add_argument("--out", help="Write the JSON report here (printed either way)")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
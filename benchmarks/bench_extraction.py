@@ -0,0 +1,105 @@
+"""
+Micro-benchmark: field_extractor's precompiled per-field patterns (one scan per requested field,
+only the fields asked for) vs the previous per-field regex scans.
+Builds synthetic itemised hospital bills and reports throughput in MB/s.
+
+- "typical": TBSA, package code and total appear near the top (legacy searches stop early).
+- "no-fields": none of them appear, so every legacy search scans the whole bill.
+
+Workloads: "amount only" is the /audit bill total (extract_total); "all fields" is what the
+legacy scans found (total, TBSA, code, labelled amount); "+ keywords" also counts KEYWORDS,
+which the legacy code never did.
+
+Usage (from project root):
+    python -m benchmarks.bench_extraction --mb 8 --repeat 5
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.field_extractor import FIELDS, extract_fields, extract_total, first, max_amount
+
+HEADER_LINES = [
+    "Package Code: BM001B",
+    "Examination shows burns covering approximately 30% TBSA.",
+    "Total Amount: Rs. 38500",
+]
+ITEM_LINES = [
+    "Room charges (general ward) x 6 days ............ Rs. 1,800.00",
+    "Dressing (silver sulfadiazine) ................. 450",
+    "Debridement under GA ........................... 12,500.00",
+    "IV fluids, Ringer lactate 10 bottles ............ 1,150.00",
+    "ICU monitoring charges ......................... 3,000",
+]
+
+
+def _legacy_amount(text: str) -> float:
+    """What app._extract_amount / text_cleaner.extract_amount used to run."""
+    return max((float(m.replace(",", "")) for m in re.findall(r"(\d+(?:,\d{3})*(?:\.\d{2})?)", text)), default=0.0)
+
+
+def _legacy_all(text: str) -> tuple:
+    """All scans the three call sites used to run separately (app, text_cleaner, processor)."""
+    amount = _legacy_amount(text)
+    severity = re.search(r"(\d{1,2})\s*%?\s*tbsa", text.lower())
+    tbsa = re.search(r"(\d+)\s?%\s?(?:TBSA|burns)", text, re.IGNORECASE)
+    code = re.search(r"(BM001[A-D])", text)
+    billed = re.search(r"(?:Total|Amount|Bill|Charges)\s?[:\-]?\s?(?:Rs\.?)?\s?(\d{3,6})", text, re.IGNORECASE)
+    return amount, severity, tbsa, code, billed
+
+
+def _engine_amount(text: str) -> float:
+    return extract_total(text)
+
+
+def _engine_all(text: str) -> tuple:
+    """The fields _legacy_all finds (keywords have no legacy counterpart; see "+ keywords")."""
+    fields = extract_fields(text, ("amounts", "tbsa", "package_codes", "labelled_amounts"))
+    return max_amount(fields), first(fields, "tbsa"), first(fields, "package_codes"), first(fields, "labelled_amounts")
+
+
+def _engine_all_keywords(text: str) -> tuple:
+    fields = extract_fields(text, FIELDS)
+    return max_amount(fields), first(fields, "tbsa"), first(fields, "package_codes"), fields["keywords"]
+
+
+def _throughput(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text.encode("utf-8")) / best / 1e6
+
+
+def _bill(mb: float, with_fields: bool) -> str:
+    block = "\n".join(ITEM_LINES) + "\n"
+    body = block * max(1, int(mb * 1e6 / len(block)))
+    return ("\n".join(HEADER_LINES) + "\n" + body) if with_fields else body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=8.0, help="Size of each synthetic bill in MB")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'bill':<10} {'workload':<22} {'legacy MB/s':>12} {'patterns MB/s':>14} {'speedup':>8}")
+    for name, with_fields in (("typical", True), ("no-fields", False)):
+        text = _bill(args.mb, with_fields)
+        for workload, legacy_fn, engine_fn in (
+            ("amount only", _legacy_amount, _engine_amount),
+            ("all fields", _legacy_all, _engine_all),
+            ("all fields + keywords", _legacy_all, _engine_all_keywords),
+        ):
+            legacy = _throughput(legacy_fn, text, args.repeat)
+            engine = _throughput(engine_fn, text, args.repeat)
+            print(f"{name:<10} {workload:<22} {legacy:12.1f} {engine:14.1f} {engine / legacy:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: loading the model in several worker processes, per artifact format, with a large
+vocabulary (the committed model has a few hundred terms; real catalogues push max_features far
+past 1000).
+
+A TF-IDF + LogisticRegression model is fitted on synthetic notes with --vocab random extra terms,
+then exported once. Each format gets its own directory, so infer.load_bundle picks it:
+- sklearn: model.pkl + vectorizer.pkl (joblib; the vocabulary becomes a Python dict per process)
+- npz: model_bundle.npz (arrays decompressed into each process; the vocabulary dict is rebuilt)
+- mmap: model.flat (memory-mapped; sorted vocabulary and float32 arrays, nothing built)
+
+--workers fresh processes load the same directory at the same time and score a batch. Each
+process is then measured from /proc/<pid>/smaps_rollup (Linux) while all of them are alive:
+- private MB: memory only this process holds, minus what it held before loading. This is the cost
+  of each extra worker.
+- PSS MB: proportional share, so shared pages are split between the workers that map them.
+
+Usage (from project root):
+    python -m benchmarks.bench_model_load --vocab 200000 --workers 4
+"""
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+ROOT = Path(__file__).resolve().parent.parent
+FORMATS = {
+    "sklearn": ("model.pkl", "vectorizer.pkl"),
+    "npz": ("model_bundle.npz",),
+    "mmap": ("model.flat",),
+}
+
+# Runs in each worker process: load, score, report, then wait until the parent has measured it
+_WORKER = """
+import json, sys, time
+from pathlib import Path
+from backend.ml.infer import load_bundle
+
+def private_kb():
+    with open("/proc/self/smaps_rollup") as f:
+        fields = dict(line.split(":", 1) for line in f if ":" in line)
+    return sum(int(fields[k].split()[0]) for k in ("Private_Clean", "Private_Dirty"))
+
+before = private_kb()
+start = time.perf_counter()
+bundle = load_bundle(Path(sys.argv[1]))
+loaded = time.perf_counter() - start
+texts = json.loads(sys.argv[2])
+start = time.perf_counter()
+bundle.model.predict_proba(bundle.vectorizer.transform(texts))
+scored = time.perf_counter() - start
+print(json.dumps({"private_before_kb": before, "load_s": loaded, "score_s": scored, "backend": bundle.backend}), flush=True)
+sys.stdin.read()
+"""
+
+
+def _smaps(pid: int) -> dict:
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        fields = dict(line.split(":", 1) for line in f if ":" in line)
+    kb = {k: int(v.split()[0]) for k, v in fields.items() if v.strip().endswith("kB")}
+    return {"private_kb": kb["Private_Clean"] + kb["Private_Dirty"], "pss_kb": kb["Pss"], "rss_kb": kb["Rss"]}
+
+
+def build_model(out_dir: Path, vocab: int, docs: int, seed: int = 0):
+    """Fit on synthetic notes padded with random terms from a vocab-sized pool; export every format."""
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    from backend.ml.train_model import export_bundle
+    from backend.services.text_cleaner import clean_texts
+    from benchmarks.synthetic import labelled_notes
+
+    rng = random.Random(seed)
+    pool = [f"term{i:06d}x" for i in range(vocab)]
+    records = labelled_notes(docs, seed)
+    # Every pool term appears at least once, so the fitted vocabulary has about vocab terms
+    extra = [pool[i::docs] for i in range(docs)]
+    texts = clean_texts([f"{text} {' '.join(words + rng.sample(pool, 10))}" for (text, _), words in zip(records, extra)])
+    vectorizer = TfidfVectorizer(max_features=vocab + 1000)
+    X = vectorizer.fit_transform(texts)
+    clf = LogisticRegression(max_iter=200).fit(X, [label for _, label in records])
+    joblib.dump(clf, out_dir / "model.pkl")
+    joblib.dump(vectorizer, out_dir / "vectorizer.pkl")
+    export_bundle(vectorizer, clf, out_dir / "model_bundle.npz", out_dir / "model.pkl")
+    return len(vectorizer.vocabulary_)
+
+
+def measure(model_dir: Path, workers: int, texts: list) -> list:
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", _WORKER, str(model_dir), json.dumps(texts)],
+            cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        )
+        for _ in range(workers)
+    ]
+    results = []
+    try:
+        reports = [json.loads(p.stdout.readline()) for p in procs]
+        for proc, report in zip(procs, reports):
+            results.append({**report, **_smaps(proc.pid)})
+    finally:
+        for proc in procs:
+            proc.stdin.close()
+            proc.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vocab", type=int, default=200000, help="Random terms added to the vocabulary")
+    parser.add_argument("--docs", type=int, default=20000, help="Training notes")
+    parser.add_argument("--workers", type=int, default=4, help="Processes loading the model at once")
+    args = parser.parse_args()
+
+    from benchmarks.synthetic import labelled_notes
+
+    texts = [text for text, _ in labelled_notes(200, seed=7)]
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        n_terms = build_model(tmp, args.vocab, args.docs)
+        (tmp / "metadata.json").write_text(json.dumps({"version": "bench"}))
+        sizes = {name: sum((tmp / f).stat().st_size for f in files) for name, files in FORMATS.items()}
+        print(f"Vocabulary {n_terms} terms; {args.workers} workers; 200 texts scored per worker")
+        print(f"{'format':<8} {'file MB':>8} {'load ms':>8} {'score ms':>9} {'private MB/worker':>18} {'PSS MB/worker':>14}")
+        for name, files in FORMATS.items():
+            model_dir = tmp / name
+            model_dir.mkdir()
+            for f in files + ("metadata.json",):
+                (model_dir / f).symlink_to(tmp / f)
+            results = measure(model_dir, args.workers, texts)
+            assert all(r["backend"] == ("numpy" if name == "npz" else name) for r in results), results
+            load_ms = statistics.median(r["load_s"] for r in results) * 1000
+            score_ms = statistics.median(r["score_s"] for r in results) * 1000
+            private = statistics.median(r["private_kb"] - r["private_before_kb"] for r in results) / 1024
+            pss = statistics.median(r["pss_kb"] for r in results) / 1024
+            print(f"{name:<8} {sizes[name] / 1e6:>8.1f} {load_ms:>8.1f} {score_ms:>9.1f} {private:>18.1f} {pss:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
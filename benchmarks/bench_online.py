@@ -0,0 +1,77 @@
+"""
+Benchmark: applying a batch of auditor corrections incrementally (backend.ml.online, hashing
+vectorizer + SGD partial_fit) vs a full retrain (TF-IDF + LogisticRegression refitted on
+everything), as the dataset grows. A full retrain's cost grows with the dataset; an incremental
+update only depends on the size of the update.
+
+The retrain is a single fit; train_model's grid search multiplies it by candidates x folds.
+The update includes writing the checkpoint and serving artifacts. Accuracy is on a fixed held-out set.
+
+Usage (from project root):
+    python -m benchmarks.bench_online --sizes 10000 50000 100000 --update 1000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from backend.ml.online import OnlineTrainer
+from backend.services.text_cleaner import clean_texts
+from benchmarks.synthetic import labelled_notes
+
+
+def _full_retrain(records: list):
+    start = time.perf_counter()
+    texts = clean_texts([t for t, _ in records])
+    vectorizer = TfidfVectorizer(max_features=1000)
+    clf = LogisticRegression(max_iter=1000).fit(vectorizer.fit_transform(texts), [label for _, label in records])
+    return time.perf_counter() - start, lambda X: clf.predict(vectorizer.transform(clean_texts(X)))
+
+
+def _accuracy(predict, held_out: list) -> float:
+    return float(np.mean(predict([t for t, _ in held_out]) == np.array([label for _, label in held_out])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000], help="Dataset sizes")
+    parser.add_argument("--update", type=int, default=1000, help="Corrections per incremental update")
+    parser.add_argument("--batch-size", type=int, default=1024)
+    args = parser.parse_args()
+
+    held_out = labelled_notes(5000, seed=99)
+    print(f"{'records':>9} {'retrain s':>10} {'update s':>9} {'speedup':>9} {'retrain acc':>12} {'online acc':>11}")
+    for size in args.sizes:
+        base = labelled_notes(size, seed=size)
+        corrections = labelled_notes(args.update, seed=size + 1)
+        retrain_seconds, retrained = _full_retrain(base + corrections)
+
+        with tempfile.TemporaryDirectory() as model_dir:
+            trainer = OnlineTrainer(model_dir)
+            for i in range(0, size, args.batch_size):
+                chunk = base[i:i + args.batch_size]
+                trainer.partial_fit([t for t, _ in chunk], [label for _, label in chunk])
+            start = time.perf_counter()
+            for i in range(0, args.update, args.batch_size):
+                chunk = corrections[i:i + args.batch_size]
+                trainer.partial_fit([t for t, _ in chunk], [label for _, label in chunk])
+            trainer.checkpoint()
+            update_seconds = time.perf_counter() - start
+            model, vectorizer = trainer.state["model"], trainer.vectorizer
+            online_acc = _accuracy(lambda X: model.predict(vectorizer.transform(clean_texts(X))), held_out)
+
+        print(
+            f"{size:>9} {retrain_seconds:>10.3f} {update_seconds:>9.3f} {retrain_seconds / update_seconds:>8.1f}x "
+            f"{_accuracy(retrained, held_out):>12.3f} {online_acc:>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
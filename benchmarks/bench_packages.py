@@ -0,0 +1,89 @@
+"""
+Micro-benchmark: TBSA -> package lookup. The previous linear scan over PACKAGES vs the rule
+engine's sorted interval index (bisect per value, and NumPy searchsorted for a whole batch).
+
+- "burns": the four BM001 packages from pmjay_subset.json.
+- "catalogue": a synthetic catalogue of --packages ranged packages, the size of a full
+  specialty catalogue, to show how each approach scales with the number of ranges.
+
+Usage (from project root):
+    python -m benchmarks.bench_packages --values 100000 --packages 1900
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.services.rule_engine import Catalogue, rule_engine
+
+
+def _legacy_lookup(packages: dict, tbsa_percentage: float):
+    """What src/data/packages.get_recommended_package used to run."""
+    for code, pkg in packages.items():
+        if pkg["min_tbsa"] < tbsa_percentage <= pkg["max_tbsa"]:
+            return pkg
+    if tbsa_percentage <= 10:
+        return next(iter(packages.values()))
+    return None
+
+
+def _synthetic(n: int) -> list:
+    """n contiguous ranges covering 0-100 (plus a max_amount) in shuffled file order."""
+    width = 100.0 / n
+    packages = [
+        {"package_code": f"SX{i:05d}", "min_tbsa": i * width, "max_tbsa": (i + 1) * width, "max_amount": 1000.0 * (i + 1)}
+        for i in range(n)
+    ]
+    random.Random(1).shuffle(packages)
+    return packages
+
+
+def _best(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _run(name: str, catalogue: Catalogue, values: list, repeat: int):
+    legacy = {p["package_code"]: p for p in sorted(catalogue.packages.values(), key=lambda p: p["min_tbsa"])}
+
+    expected = [(_legacy_lookup(legacy, v) or {}).get("package_code") for v in values]
+    scalar = [catalogue.codes[r] if r >= 0 else None for r in map(catalogue.row_for_tbsa, values)]
+    batch = [catalogue.codes[r] if r >= 0 else None for r in catalogue.rows_for_tbsa(values).tolist()]
+    # The legacy fallback maps anything <= 10 (including out-of-range negatives) to the first package
+    mismatches = sum(1 for e, s, b in zip(expected, scalar, batch) if not (e == s == b))
+
+    t_legacy = _best(lambda: [_legacy_lookup(legacy, v) for v in values], repeat)
+    t_bisect = _best(lambda: [catalogue.row_for_tbsa(v) for v in values], repeat)
+    t_numpy = _best(lambda: catalogue.rows_for_tbsa(values), repeat)
+    n = len(values)
+    print(
+        f"{name:<10} {len(catalogue.packages):>8} {n / t_legacy / 1e6:>11.3f} {n / t_bisect / 1e6:>11.3f} "
+        f"{n / t_numpy / 1e6:>11.3f} {t_legacy / t_numpy:>9.1f}x {mismatches:>10}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--values", type=int, default=100000, help="TBSA values looked up per run")
+    parser.add_argument("--packages", type=int, default=1900, help="Ranged packages in the synthetic catalogue")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    # Extracted TBSA values are whole or one-decimal percentages in 0-100
+    values = [round(rng.uniform(0, 100), rng.choice((0, 1))) for _ in range(args.values)]
+
+    print(f"{'catalogue':<10} {'packages':>8} {'loop M/s':>11} {'bisect M/s':>11} {'numpy M/s':>11} {'speedup':>10} {'mismatches':>10}")
+    _run("burns", rule_engine.catalogue(), values, args.repeat)
+    _run("catalogue", Catalogue(_synthetic(args.packages)), values, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
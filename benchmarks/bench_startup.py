@@ -0,0 +1,114 @@
+"""
+Benchmark: backend process startup. Each run is a fresh interpreter.
+
+- Phases: importing backend.app, loading the model and compiling the policy catalogue (what
+  backend.server does before forking), then the first TXT and first PDF read. The first PDF pays
+  for the deferred pdfplumber import.
+- Heavy optional modules loaded once the app is ready (should be none of them).
+- Import-time breakdown of `import backend.app` from `python -X importtime`: self time summed
+  per top-level package (these add up to the total), and the slowest backend modules
+  (cumulative, including what they import).
+
+Usage (from project root):
+    python -m benchmarks.bench_startup --runs 5 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY_MODULES = ("torch", "easyocr", "sklearn", "scipy", "pandas", "joblib", "pdfplumber", "pdfminer")
+
+# Runs in the child interpreter; prints one JSON line
+_PHASES = """
+import json, sys, time
+t0 = time.perf_counter()
+import backend.app
+t1 = time.perf_counter()
+from backend.ml.infer import load_model
+from backend.services.rule_engine import rule_engine
+load_model()
+rule_engine.catalogue()
+t2 = time.perf_counter()
+heavy = [m for m in {heavy!r} if m in sys.modules]
+from backend.services.file_reader import read_file
+from benchmarks.synthetic import pdf_bill, text_bill
+read_file(text_bill(64 * 1024), "bill.txt")
+t3 = time.perf_counter()
+read_file(pdf_bill(1), "bill.pdf")
+t4 = time.perf_counter()
+print(json.dumps({{"import_app": t1 - t0, "model_and_catalogue": t2 - t1, "first_txt": t3 - t2,
+                  "first_pdf": t4 - t3, "heavy_loaded_at_ready": heavy}}))
+"""
+
+PHASES = ("import_app", "model_and_catalogue", "first_txt", "first_pdf")
+
+
+def _child(args: list) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    # Keep the extraction cache in memory so every run extracts the PDF
+    env.pop("AYUSHMA_EXTRACTION_CACHE_DB", None)
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def measure_phases() -> dict:
+    out = _child(["-c", _PHASES.format(heavy=HEAVY_MODULES)]).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def import_times() -> list:
+    """(module, self_us, cumulative_us) for `import backend.app`, from -X importtime."""
+    stderr = _child(["-X", "importtime", "-c", "import backend.app"]).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=12, help="Rows in the import-time tables")
+    args = parser.parse_args()
+
+    runs = [measure_phases() for _ in range(args.runs)]
+    print(f"Startup phases (median of {args.runs} runs)")
+    for phase in PHASES:
+        print(f"  {phase:<22} {statistics.median(r[phase] for r in runs) * 1000:>8.1f} ms")
+    print(f"  heavy modules loaded when ready: {', '.join(runs[-1]['heavy_loaded_at_ready']) or 'none'}")
+
+    samples = [import_times() for _ in range(args.runs)]
+    by_package = defaultdict(list)
+    for rows in samples:
+        totals = defaultdict(int)
+        for name, self_us, _ in rows:
+            totals[name.split(".")[0]] += self_us
+        for package, us in totals.items():
+            by_package[package].append(us)
+    medians = {package: statistics.median(values) for package, values in by_package.items()}
+    total = sum(medians.values())
+    print(f"\nimport backend.app: {total / 1000:.1f} ms of import time, self time by top-level package")
+    for package, us in sorted(medians.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<28} {us / 1000:>8.1f} ms {us / total:>6.1%}")
+
+    cumulative = defaultdict(list)
+    for rows in samples:
+        for name, _, cumulative_us in rows:
+            if name.startswith("backend."):
+                cumulative[name].append(cumulative_us)
+    print("\nSlowest backend modules (cumulative)")
+    for name, values in sorted(cumulative.items(), key=lambda item: -statistics.median(item[1]))[:args.top]:
+        print(f"  {name:<40} {statistics.median(values) / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
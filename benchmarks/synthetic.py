@@ -0,0 +1,86 @@
+"""
+Synthetic claim documents for benchmarks: large itemised TXT bills, multi-page PDF bills and
+labelled clinical notes.
+The PDF writer is deliberately minimal (Helvetica text only) so no PDF library is needed.
+"""
+
+BILL_ITEMS = [
+    "Room charges (general ward) ............ Rs. 1,800.00",
+    "Dressing (silver sulfadiazine) ......... 450",
+    "Debridement under GA ................... 12,500.00",
+    "IV fluids, Ringer lactate .............. 1,150.00",
+    "ICU monitoring charges ................. 3,000",
+]
+NOTES = "Patient admitted with thermal burns. Examination shows burns covering approximately 30% TBSA."
+
+NOTE_PHRASES = [
+    "dressing changed", "fluid resuscitation started", "admitted to burns ICU", "escharotomy performed",
+    "ventilator support", "skin grafting planned", "pain managed with analgesics", "vitals stable",
+    "scald injury", "flame burn", "electrical burn", "debridement under GA", "observation advised",
+]
+
+
+def labelled_notes(n: int, seed: int = 0) -> list:
+    """n (note, package code) pairs; the label follows the TBSA as in pmjay_subset.json."""
+    import random
+
+    rng = random.Random(seed)
+    records = []
+    for _ in range(n):
+        tbsa = rng.randint(1, 90)
+        label = "BM001A" if tbsa <= 10 else "BM001B" if tbsa <= 40 else "BM001C" if tbsa <= 60 else "BM001D"
+        phrases = ", ".join(rng.sample(NOTE_PHRASES, rng.randint(1, 4)))
+        records.append((f"Patient has {tbsa}% TBSA burn; {phrases}.", label))
+    return records
+
+
+def bill_lines(n_lines: int) -> list:
+    lines = ["HOSPITAL BILL", "Package Code: BM001B"]
+    lines += [f"{i:05d} {BILL_ITEMS[i % len(BILL_ITEMS)]}" for i in range(n_lines)]
+    lines.append("Total Amount: Rs. 38500")
+    return lines
+
+
+def text_bill(size_bytes: int) -> bytes:
+    """A TXT bill of roughly size_bytes."""
+    per_line = len(BILL_ITEMS[0]) + 7
+    return "\n".join(bill_lines(max(1, size_bytes // per_line))).encode("utf-8")
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def pdf_from_pages(pages: list) -> bytes:
+    """Build a PDF with one page per list of text lines."""
+    n = len(pages)
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(n))}] /Count {n} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(pages):
+        content = ("BT /F1 9 Tf 36 806 Td 11 TL " + " ".join(f"({_escape(l)}) Tj T*" for l in lines) + " ET").encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def pdf_bill(n_pages: int, lines_per_page: int = 70) -> bytes:
+    """A multi-page itemised PDF bill."""
+    lines = bill_lines(n_pages * lines_per_page - 3)
+    return pdf_from_pages([lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)])
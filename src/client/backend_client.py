@@ -0,0 +1,160 @@
+"""
+HTTP client for the Ayushma backend, used by the Streamlit UI (app.py).
+One pooled requests.Session per Streamlit server process (st.cache_resource), with connect/read
+timeouts and retries on connection errors and 502/503/504 (honouring the backend's Retry-After).
+Audits are submitted to the backend job queue (POST /audit/jobs); the UI polls job.done(), which
+checks GET /audit/jobs/{id}, instead of holding a request open for a long OCR run.
+"""
+import functools
+import os
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import streamlit as st
+except ImportError:  # usable outside Streamlit (scripts, tests)
+    st = None
+
+BACKEND_URL = os.environ.get("AYUSHMA_BACKEND_URL", "http://127.0.0.1:8000").rstrip("/")
+CONNECT_TIMEOUT = float(os.environ.get("AYUSHMA_CLIENT_CONNECT_TIMEOUT", "3.05"))
+# Generous: a synchronous audit() of scanned PDFs or photographs waits for OCR
+READ_TIMEOUT = float(os.environ.get("AYUSHMA_CLIENT_READ_TIMEOUT", "180"))
+RETRIES = int(os.environ.get("AYUSHMA_CLIENT_RETRIES", "3"))
+POOL_SIZE = int(os.environ.get("AYUSHMA_CLIENT_POOL_SIZE", "8"))
+POLL_INTERVAL = float(os.environ.get("AYUSHMA_CLIENT_POLL_INTERVAL", "0.5"))
+
+
+class BackendError(Exception):
+    """The backend refused or failed an audit; message is its detail when it sent one."""
+
+    def __init__(self, message: str, status_code: int | None = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def make_session(retries: int = RETRIES, pool_size: int = POOL_SIZE) -> requests.Session:
+    """Session with a keep-alive connection pool and retry/backoff for transient failures."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        # Audits have no side effects, so POST is safe to retry: a 503 (queue full) queued nothing,
+        # and a duplicate job after a gateway 502/504 only costs one redundant audit
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class AuditJob:
+    """A queued backend audit. Poll done(); result() returns the audit dict or raises BackendError."""
+
+    def __init__(self, client, job_id: str):
+        self.client = client
+        self.job_id = job_id
+        self.started = time.monotonic()
+        self.finished = None
+        self.status = "queued"
+        self._job = {}
+
+    def refresh(self) -> dict:
+        """Fetch the job's current state from the backend."""
+        self._job = self.client.job(self.job_id)
+        self.status = self._job["status"]
+        if self.status in ("done", "failed") and self.finished is None:
+            self.finished = time.monotonic()
+        return self._job
+
+    def done(self) -> bool:
+        if self.finished is None:
+            self.refresh()
+        return self.finished is not None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since submission, or the job's total time once it is done."""
+        return (self.finished or time.monotonic()) - self.started
+
+    def result(self, timeout: float | None = None) -> dict:
+        """Wait (polling) up to timeout seconds for the job and return its audit result."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done():
+            if deadline is not None and time.monotonic() >= deadline:
+                raise BackendError(f"Job {self.job_id} still {self.status} after {timeout:g}s")
+            time.sleep(POLL_INTERVAL)
+        if self.status == "failed":
+            raise BackendError(f"Audit failed after {self._job.get('attempts')} attempts: {self._job.get('error')}")
+        return self._job["result"]
+
+
+class BackendClient:
+    def __init__(self, base_url: str = BACKEND_URL, session: requests.Session | None = None):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or make_session()
+        self.timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+    def health(self) -> bool:
+        """True if the backend answers GET /."""
+        try:
+            return self.session.get(f"{self.base_url}/", timeout=(CONNECT_TIMEOUT, 5)).ok
+        except requests.RequestException:
+            return False
+
+    def _request(self, method: str, path: str, timeout=None, **kwargs) -> dict:
+        """JSON body of a successful response; BackendError for transport errors and error statuses."""
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=timeout or self.timeout, **kwargs)
+        except requests.Timeout:
+            raise BackendError(f"Backend did not answer within {READ_TIMEOUT:g}s")
+        except requests.ConnectionError:
+            raise BackendError(f"Cannot reach backend at {self.base_url}")
+        if not response.ok:
+            try:
+                detail = response.json().get("detail", response.text)
+            except ValueError:
+                detail = response.text
+            raise BackendError(f"{response.status_code}: {detail}", response.status_code)
+        return response.json()
+
+    @staticmethod
+    def _multipart(files: dict) -> list:
+        """files maps field -> (filename, bytes, content_type), or a list of them for photographs."""
+        multipart = []
+        for field, value in files.items():
+            for item in value if isinstance(value, list) else [value]:
+                multipart.append((field, item))
+        return multipart
+
+    def audit(self, files: dict) -> dict:
+        """
+        Synchronous POST /audit; returns its JSON. Raises BackendError. One Idempotency-Key per call,
+        so the session's automatic retries of it are answered from the backend's stored result.
+        """
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+        return self._request("POST", "/audit", files=self._multipart(files), headers=headers)
+
+    def submit_audit(self, files: dict, priority: int = 0) -> AuditJob:
+        """POST /audit/jobs and return the queued job at once (upload only; no waiting for OCR)."""
+        job = self._request("POST", "/audit/jobs", files=self._multipart(files), data={"priority": str(priority)})
+        return AuditJob(self, job["job_id"])
+
+    def job(self, job_id: str) -> dict:
+        """GET /audit/jobs/{job_id}."""
+        return self._request("GET", f"/audit/jobs/{job_id}", timeout=(CONNECT_TIMEOUT, 10))
+
+
+def _get_client() -> BackendClient:
+    return BackendClient()
+
+
+# One client (and connection pool) per Streamlit server process, shared by all sessions
+get_client = st.cache_resource(_get_client) if st is not None else functools.lru_cache(maxsize=None)(_get_client)
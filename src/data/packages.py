@@ -1,51 +1,59 @@
-
-# Mock Data for PM-JAY Packages
+# PM-JAY Packages, read from the backend catalogue (backend/data/pmjay_subset.json)
 # Focus on Burns for this PoC as per problem statement
 
-PACKAGES = {
-    "BM001A": {
-        "code": "BM001A",
-        "name": "Superficial Burns (<= 10% TBSA)",
-        "min_tbsa": 0,
-        "max_tbsa": 10,
-        "max_amount": 5000,
-        "description": "Conservative management of superficial burns."
-    },
-    "BM001B": {
-        "code": "BM001B",
-        "name": "Moderate Burns (10% - 40% TBSA)",
-        "min_tbsa": 10,
-        "max_tbsa": 40,
-        "max_amount": 15000,
-        "description": "Management of moderate burns requiring dressings."
-    },
-    "BM001C": {
-        "code": "BM001C",
-        "name": "Severe Burns (40% - 60% TBSA)",
-        "min_tbsa": 40,
-        "max_tbsa": 60,
-        "max_amount": 40000,
-        "description": "Management of severe burns, potential debridement."
-    },
-    "BM001D": {
-        "code": "BM001D",
-        "name": "Critical Burns (> 60% TBSA)",
-        "min_tbsa": 60,
-        "max_tbsa": 100,
-        "max_amount": 100000,
-        "description": "ICU management for critical burns."
+from backend.services.rule_engine import rule_engine
+
+
+def _as_package(entry):
+    """Catalogue entry in the shape the Streamlit prototype uses."""
+    return {
+        "code": entry["package_code"],
+        "name": entry.get("name", entry["package_code"]),
+        "min_tbsa": entry.get("min_tbsa"),
+        "max_tbsa": entry.get("max_tbsa"),
+        "max_amount": entry["max_amount"],
+        "description": entry.get("description", ""),
     }
-}
+
+
+# Converted packages for the active catalogue; rebuilt when the rule engine hot-reloads it
+_converted = (None, {})
+
+
+def _packages(catalogue):
+    global _converted
+    if _converted[0] is not catalogue:
+        _converted = (catalogue, {code: _as_package(p) for code, p in catalogue.packages.items()})
+    return _converted[1]
+
+
+def get_packages():
+    """All packages {code: package} of the active catalogue (follows catalogue reloads)."""
+    return _packages(rule_engine.catalogue())
+
+
+def __getattr__(name):
+    # PACKAGES used to be a module constant; it is now read from the active catalogue on each access
+    if name == "PACKAGES":
+        return get_packages()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def get_package_by_code(code):
-    return PACKAGES.get(code)
+    return get_packages().get(code)
 
 def get_recommended_package(tbsa_percentage):
-    for code, pkg in PACKAGES.items():
-        # strict comparison for upper bound to avoid overlap confusion, handle edge cases
-        if pkg["min_tbsa"] < tbsa_percentage <= pkg["max_tbsa"]:
-            return pkg
-    # Handle 0-10 explicit case better if needed, or > max
-    if tbsa_percentage <= 10:
-         return PACKAGES["BM001A"]
-    return None
+    """
+    Package whose TBSA range contains tbsa_percentage: min_tbsa < tbsa <= max_tbsa, with the
+    lowest range also including its min_tbsa (0% is BM001A). None if no range matches.
+    Binary search over the rule engine's sorted interval index.
+    """
+    catalogue = rule_engine.catalogue()
+    row = catalogue.row_for_tbsa(tbsa_percentage)
+    return _packages(catalogue)[catalogue.codes[row]] if row >= 0 else None
+
+def get_recommended_packages(tbsa_values):
+    """get_recommended_package for many values with one NumPy searchsorted call."""
+    catalogue = rule_engine.catalogue()
+    packages = _packages(catalogue)
+    return [packages[catalogue.codes[r]] if r >= 0 else None for r in catalogue.rows_for_tbsa(tbsa_values).tolist()]
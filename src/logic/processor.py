@@ -1,6 +1,6 @@
 
-import re
-from src.data.packages import PACKAGES, get_recommended_package
+from backend.services.field_extractor import extract_fields, first
+from src.data.packages import get_package_by_code, get_recommended_package
 
 class ClaimProcessor:
     def __init__(self):
@@ -20,23 +20,19 @@ class ClaimProcessor:
 
         # Combine all text for simpler regexing in this POC
         full_text = " ".join(files_content.values())
-        
-        # 1. Extract TBSA (e.g., "30% TBSA", "Burns 45%")
-        # Look for number followed by % or TBSA
-        tbsa_match = re.search(r'(\d+)\s?%\s?(?:TBSA|burns)', full_text, re.IGNORECASE)
-        if tbsa_match:
-            extracted["tbsa"] = int(tbsa_match.group(1))
-
-        # 2. Extract Package Code (e.g., "BM001A")
-        pkg_match = re.search(r'(BM001[A-D])', full_text)
-        if pkg_match:
-            extracted["stated_package"] = pkg_match.group(1)
-
-        # 3. Extract Billed Amount (e.g., "Total: 45000", "Amount: Rs. 45000")
-        # specific keywords to avoid grabbing random numbers
-        amt_match = re.search(r'(?:Total|Amount|Bill|Charges)\s?[:\-]?\s?(?:Rs\.?)?\s?(\d{3,6})', full_text, re.IGNORECASE)
-        if amt_match:
-            extracted["billed_amount"] = int(amt_match.group(1))
+        fields = extract_fields(full_text, ("tbsa", "package_codes", "labelled_amounts", "keywords"))
+
+        # 1. TBSA (e.g., "30% TBSA", "Burns 45%")
+        extracted["tbsa"] = first(fields, "tbsa")
+
+        # 2. Package Code (e.g., "BM001A")
+        extracted["stated_package"] = first(fields, "package_codes")
+
+        # 3. Billed Amount (e.g., "Total: 45000", "Amount: Rs. 45000")
+        # only labelled amounts, to avoid grabbing random numbers
+        extracted["billed_amount"] = first(fields, "labelled_amounts")
+
+        extracted["diagnosis_keywords"] = sorted(fields["keywords"])
 
         return extracted
 
@@ -88,7 +84,7 @@ class ClaimProcessor:
             recommendations.append("Ensure Clinical Notes explicitly state burn percentage (e.g., '30% TBSA').")
 
         # 3. Financial Validation
-        active_pkg = PACKAGES.get(stated_pkg_code) if stated_pkg_code else calculated_pkg
+        active_pkg = get_package_by_code(stated_pkg_code) if stated_pkg_code else calculated_pkg
         
         if active_pkg and billed_amt:
             limit = active_pkg["max_amount"]
@@ -2,37 +2,54 @@
 """
 Startup script to run both Ayushma Backend and Frontend servers.
 Runs backend on port 8000 and frontend on port 8501.
+The backend runs under the production launcher (python -m backend.server, one worker per CPU),
+which preforks on Linux/macOS and falls back to uvicorn's worker processes on Windows; the
+frontend starts once GET /healthz reports the backend ready.
 """
 
 import subprocess
 import time
 import sys
 import os
+from urllib.error import URLError
+from urllib.request import urlopen
+
+BACKEND_URL = "http://127.0.0.1:8000"
+READY_TIMEOUT = float(os.environ.get("AYUSHMA_READY_TIMEOUT", "120"))
 
 def start_backend():
     """Start the FastAPI backend server."""
     print("🚀 Starting Ayushma Backend on port 8000...")
     cmd = [
-        sys.executable, 
-        "-m", 
-        "uvicorn", 
-        "backend.app:app",
+        sys.executable,
+        "-m",
+        "backend.server",
         "--host", "127.0.0.1",
         "--port", "8000",
-        "--reload"
     ]
     backend_process = subprocess.Popen(
         cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
         cwd=os.path.dirname(os.path.abspath(__file__))
     )
     return backend_process
 
+def wait_for_backend(process, timeout=READY_TIMEOUT):
+    """Poll GET /healthz until it answers 200; raise if the backend exits or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited with code {process.returncode}")
+        try:
+            with urlopen(f"{BACKEND_URL}/healthz", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except (URLError, OSError):
+            pass  # not listening yet, or 503 while starting
+        time.sleep(0.25)
+    raise RuntimeError(f"Backend not ready after {timeout:g}s")
+
 def start_frontend():
     """Start the Streamlit frontend server."""
-    print("\n⏳ Waiting for backend to initialize (5 seconds)...")
-    time.sleep(5)
     print("🎨 Starting Ayushma Frontend on port 8501...")
     cmd = [
         sys.executable,
@@ -49,6 +66,23 @@ def start_frontend():
     )
     return frontend_process
 
+def stop(process, timeout):
+    """SIGTERM, then kill if it has not exited within timeout seconds."""
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def stop_all():
+    # The backend drains in-flight audits first (AYUSHMA_GRACEFUL_TIMEOUT, 30s by default)
+    stop(frontend, 5)
+    stop(backend, float(os.environ.get("AYUSHMA_GRACEFUL_TIMEOUT", "30")) + 10)
+
+backend = frontend = None
+
 if __name__ == "__main__":
     print("=" * 60)
     print("  Ayushma AI Audit System - Startup Manager")
@@ -57,6 +91,8 @@ if __name__ == "__main__":
     try:
         # Start backend
         backend = start_backend()
+        print("\n⏳ Waiting for backend to become ready...")
+        wait_for_backend(backend)
         
         # Start frontend
         frontend = start_frontend()
@@ -74,16 +110,10 @@ if __name__ == "__main__":
         
     except KeyboardInterrupt:
         print("\n\n🛑 Shutting down services...")
-        try:
-            backend.terminate()
-            frontend.terminate()
-            time.sleep(1)
-            backend.kill()
-            frontend.kill()
-        except:
-            pass
+        stop_all()
         print("✅ All services stopped.")
         sys.exit(0)
     except Exception as e:
         print(f"\n❌ Error: {e}")
+        stop_all()
         sys.exit(1)
@@ -0,0 +1,123 @@
+"""
+Parity check: field_extractor must find exactly what the per-field regexes it replaced found.
+Run from project root: python -m pytest test_field_extractor.py  (or python test_field_extractor.py)
+"""
+import random
+import re
+from pathlib import Path
+
+from backend.app import _extract_amount
+from backend.services.field_extractor import FIELDS, extract_fields, extract_total, find_amounts, first, max_amount
+from backend.services.text_cleaner import extract_amount, extract_severity
+
+ROOT = Path(__file__).resolve().parent
+DOCUMENT_DIRS = ["sample_claims", "sample_claims/clean", "sample_claims/mismatch", "sample_claims/generated_clean", "test_documents"]
+
+EXTRA_TEXTS = [
+    "",
+    "Package BM001A, BM001B and bm001c; BM001E",
+    "Total: Rs. 45,000.00 Amount-Rs 1234567 Bill 99 charges:38500",
+    "1,2345 12,345.678 1.5 .50 007 3,000,000 1,00",
+    "Burns covering 30% TBSA, later 45 tbsa; 130% tbsa; 25 % burns; 1,050 tbsa",
+    "İstanbul BM001A total 5000 — 12% TBSA",
+]
+
+
+def _legacy_amount(text: str) -> float:
+    """app._extract_amount / text_cleaner.extract_amount before field_extractor."""
+    if not text:
+        return 0.0
+    matches = re.findall(r"(\d+(?:,\d{3})*(?:\.\d{2})?)", text)
+    if not matches:
+        return 0.0
+    return max(float(m.replace(",", "")) for m in matches)
+
+
+def _texts() -> list:
+    texts = [path.read_text(encoding="utf-8", errors="replace")
+             for d in DOCUMENT_DIRS for path in sorted((ROOT / d).glob("*.txt"))]
+    rng = random.Random(7)
+    alphabet = "0123456789,.% \nTtBbMm001AaDd:-Rrs"
+    texts += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 80))) for _ in range(3000)]
+    return texts + EXTRA_TEXTS
+
+
+def test_amount_parity():
+    for text in _texts():
+        expected = _legacy_amount(text)
+        assert extract_total(text) == expected, text
+        assert _extract_amount(text) == expected, text
+        assert extract_amount(text) == expected, text
+        legacy = [float(m.replace(",", "")) for m in re.findall(r"(\d+(?:,\d{3})*(?:\.\d{2})?)", text)]
+        assert find_amounts(text) == legacy, text
+        assert max_amount(extract_fields(text, FIELDS)) == expected, text
+        assert [v for v, _ in extract_fields(text, ("amounts",), positions=True)["amounts"]] == legacy, text
+
+
+def test_code_and_labelled_parity():
+    for text in _texts():
+        fields = extract_fields(text)
+        code = re.search(r"(BM001[A-D])", text)
+        assert first(fields, "package_codes") == (code.group(1) if code else None), text
+        billed = re.search(r"(?:Total|Amount|Bill|Charges)\s?[:\-]?\s?(?:Rs\.?)?\s?(\d{3,6})", text, re.IGNORECASE)
+        assert first(fields, "labelled_amounts") == (int(billed.group(1)) if billed else None), text
+
+
+def test_tbsa():
+    text = EXTRA_TEXTS[4]
+    assert extract_fields(text, ("tbsa",))["tbsa"] == [30, 45, 25]
+    assert [text[offset:offset + 2] for _, offset in extract_fields(text, ("tbsa",), positions=True)["tbsa"]] == ["30", "45", "25"]
+    assert extract_severity(text) == 30
+    assert extract_severity("no severity here") is None
+
+
+# extract_severity behaviour that differs from the old r"(\d{1,2})\s*%?\s*tbsa" search:
+# (text, severity now, what the old search returned)
+SEVERITY_CHANGES = [
+    ("25% burns", 25, None),  # "% burns" is accepted (a % sign is required before "burns")
+    ("25 % burns", 25, None),
+    ("100% TBSA", 100, 0),  # three digits up to 100; the old search took the last two digits
+    ("101% tbsa", None, 1),  # above 100 is not a TBSA
+    ("1,050 tbsa", None, 50),
+    ("30.50% TBSA", 30, 50),  # a decimal is one number, truncated
+    ("30" + " " * 70 + "tbsa", None, 30),  # the number must start within 64 characters of the word
+]
+SEVERITY_SAME = [
+    ("Burns covering 30% TBSA", 30),
+    ("30 tbsa", 30),
+    ("30%tbsa", 30),
+    ("30" + " " * 10 + "tbsa", 30),
+    ("0% TBSA", 0),
+    ("tbsa 30%", None),  # the number must come before the word
+    ("burns 30%", None),
+    ("Burns: 40%", None),
+    ("25 burns", None),  # "burns" needs the % sign
+    ("no severity here", None),
+    ("", None),
+]
+
+
+def test_severity_changes():
+    legacy = lambda text: (lambda m: int(m.group(1)) if m else None)(re.search(r"(\d{1,2})\s*%?\s*tbsa", text.lower()))
+    for text, expected, old in SEVERITY_CHANGES:
+        assert extract_severity(text) == expected, text
+        assert legacy(text) == old, text
+    for text, expected in SEVERITY_SAME:
+        assert extract_severity(text) == expected, text
+        assert legacy(text) == expected, text
+
+
+def test_positions_only_when_asked():
+    text = "Total 5000 for BM001B"
+    assert extract_fields(text, ("package_codes", "labelled_amounts")) == {"labelled_amounts": [5000], "package_codes": ["BM001B"]}
+    assert extract_fields(text, ("package_codes",), positions=True) == {"package_codes": [("BM001B", 15)]}
+    assert extract_fields(text, ("amounts",)) == {"amounts": [5000.0, 1.0]}
+
+
+if __name__ == "__main__":
+    test_amount_parity()
+    test_code_and_labelled_parity()
+    test_tbsa()
+    test_severity_changes()
+    test_positions_only_when_asked()
+    print("field_extractor matches the legacy regexes")
@@ -0,0 +1,163 @@
+"""
+Idempotency cache behind POST /audit: a repeat is replayed (CACHED), a concurrent duplicate waits for
+the first computation (JOINED), a key reused with different documents is a conflict (HTTP 409), and
+a failed computation is not stored.
+Run from project root: python -m pytest test_idempotency.py  (or python test_idempotency.py)
+"""
+import asyncio
+import os
+import tempfile
+import uuid
+
+import httpx
+
+from backend.app import app
+from backend.services.idempotency import CACHED, COMPUTED, JOINED, IdempotencyCache, IdempotencyConflict
+
+
+class Compute:
+    """Counts calls; optionally waits for release before returning (or raising)."""
+
+    def __init__(self, result=None, error=None):
+        self.result = result if result is not None else {"status": "CLEAN"}
+        self.error = error
+        self.calls = 0
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_replay_is_cached():
+    async def run():
+        cache = IdempotencyCache(ttl=60, max_entries=10, db_path="")
+        compute = Compute()
+        first = await cache.run("key:a", "digest-a", compute)
+        second = await cache.run("key:a", "digest-a", compute)
+        return compute.calls, first, second
+
+    calls, first, second = asyncio.run(run())
+    assert first == ({"status": "CLEAN"}, COMPUTED)
+    assert second == ({"status": "CLEAN"}, CACHED)
+    assert calls == 1
+
+
+def test_replay_from_sqlite_tier():
+    async def run(db_path):
+        compute = Compute()
+        await IdempotencyCache(ttl=60, max_entries=10, db_path=db_path).run("key:a", "digest-a", compute)
+        # A second worker (fresh memory tier) sharing the database
+        return compute.calls, await IdempotencyCache(ttl=60, max_entries=10, db_path=db_path).run("key:a", "digest-a", compute)
+
+    with tempfile.TemporaryDirectory() as directory:
+        calls, (result, outcome) = asyncio.run(run(os.path.join(directory, "idempotency.sqlite3")))
+    assert (result, outcome, calls) == ({"status": "CLEAN"}, CACHED, 1)
+
+
+def test_concurrent_duplicate_joins():
+    async def run():
+        cache = IdempotencyCache(ttl=60, max_entries=10, db_path="")
+        compute = Compute()
+        compute.release = asyncio.Event()
+        first = asyncio.create_task(cache.run("key:a", "digest-a", compute))
+        second = asyncio.create_task(cache.run("key:a", "digest-a", compute))
+        await asyncio.sleep(0)  # both are waiting before the computation finishes
+        compute.release.set()
+        return compute.calls, await first, await second
+
+    calls, first, second = asyncio.run(run())
+    assert calls == 1
+    assert first == ({"status": "CLEAN"}, COMPUTED)
+    assert second == ({"status": "CLEAN"}, JOINED)
+
+
+def test_key_reused_with_other_documents_conflicts():
+    async def run():
+        cache = IdempotencyCache(ttl=60, max_entries=10, db_path="")
+        await cache.run("key:a", "digest-a", Compute())
+        try:
+            await cache.run("key:a", "digest-b", Compute())
+        except IdempotencyConflict:
+            return True
+        return False
+
+    assert asyncio.run(run())
+
+
+def test_conflict_is_http_409():
+    async def run():
+        headers = {"Idempotency-Key": uuid.uuid4().hex}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/audit", headers=headers, files={
+                "clinical_notes": ("notes.txt", b"30% TBSA burns, dressing"),
+                "hospital_bill": ("bill.txt", b"Total Rs 12000"),
+            })
+            second = await client.post("/audit", headers=headers, files={
+                "clinical_notes": ("notes.txt", b"45% TBSA burns, skin graft"),
+                "hospital_bill": ("bill.txt", b"Total Rs 12000"),
+            })
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.status_code == 200, first.text
+    assert second.status_code == 409, second.text
+
+
+def test_cancelled_first_request_leaves_waiters_running():
+    async def run():
+        cache = IdempotencyCache(ttl=60, max_entries=10, db_path="")
+        compute = Compute()
+        compute.release = asyncio.Event()
+        first = asyncio.create_task(cache.run("key:a", "digest-a", compute))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.run("key:a", "digest-a", compute))
+        await asyncio.sleep(0)
+        first.cancel()  # its client disconnected
+        await asyncio.sleep(0)
+        compute.release.set()
+        try:
+            await first
+        except asyncio.CancelledError:
+            first_cancelled = True
+        else:
+            first_cancelled = False
+        return first_cancelled, await second, compute.calls, await cache.run("key:a", "digest-a", compute)
+
+    first_cancelled, second, calls, replay = asyncio.run(run())
+    assert first_cancelled
+    assert second == ({"status": "CLEAN"}, COMPUTED)  # the waiter computed it instead of being cancelled
+    assert calls == 2
+    assert replay == ({"status": "CLEAN"}, CACHED)
+
+
+def test_failure_is_not_stored():
+    async def run():
+        cache = IdempotencyCache(ttl=60, max_entries=10, db_path="")
+        failing = Compute(error=RuntimeError("OCR timed out"))
+        try:
+            await cache.run("key:a", "digest-a", failing)
+        except RuntimeError:
+            pass
+        retry = Compute()
+        return failing.calls, retry, await cache.run("key:a", "digest-a", retry)
+
+    failed_calls, retry, (result, outcome) = asyncio.run(run())
+    assert failed_calls == 1
+    assert retry.calls == 1 and outcome == COMPUTED
+
+
+if __name__ == "__main__":
+    test_replay_is_cached()
+    test_replay_from_sqlite_tier()
+    test_concurrent_duplicate_joins()
+    test_key_reused_with_other_documents_conflicts()
+    test_conflict_is_http_409()
+    test_cancelled_first_request_leaves_waiters_running()
+    test_failure_is_not_stored()
+    print("All idempotency tests passed.")
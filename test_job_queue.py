@@ -0,0 +1,182 @@
+"""
+Audit job queue: submissions respect JOB_MAX_QUEUED atomically, expired leases are requeued, a worker
+that lost its lease cannot finish or retry the job, retries run out, old finished jobs are purged,
+stop() requeues running jobs, and a worker survives database errors.
+Run from project root: python -m pytest test_job_queue.py  (or python test_job_queue.py)
+"""
+import asyncio
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from backend.services.job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, QueueFull
+from backend.services.upload_stream import SpooledDocument
+
+NOTES = b"30% TBSA burns, dressing"
+
+
+def _documents() -> list:
+    return [("clinical_notes", SpooledDocument("notes.txt", len(NOTES), hashlib.sha256(NOTES).hexdigest(), content=NOTES))]
+
+
+def _with_queue(test):
+    def run():
+        with tempfile.TemporaryDirectory() as directory:
+            test(lambda **kwargs: JobQueue(
+                os.path.join(directory, "jobs.sqlite3"), os.path.join(directory, "jobs"), **{"workers": 0, **kwargs}
+            ))
+    run.__name__ = test.__name__
+    return run
+
+
+def _set(queue: JobQueue, job_id: str, **columns):
+    assignments = ", ".join(f"{name} = ?" for name in columns)
+    with queue._lock:
+        queue._connect().execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*columns.values(), job_id))
+
+
+@_with_queue
+def test_submit_is_atomic_at_max_queued(make_queue):
+    queue = make_queue(max_queued=5)
+    rejected = []
+
+    def submit():
+        try:
+            queue.submit(_documents())
+        except QueueFull:
+            rejected.append(True)
+
+    threads = [threading.Thread(target=submit) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert queue.queued() == 5
+    assert len(rejected) == 15
+    # Rejected submissions leave no documents behind
+    assert len(os.listdir(queue.job_dir)) == 5
+
+
+@_with_queue
+def test_expired_lease_is_requeued_and_old_owner_ignored(make_queue):
+    first = make_queue(lease=60)
+    job_id = first.submit(_documents())
+    assert first._claim()["id"] == job_id
+    _set(first, job_id, lease_until=time.time() - 1)  # its process died
+
+    second = make_queue(lease=60)
+    row = second._claim()
+    assert row["id"] == job_id and row["attempts"] == 1  # requeued, then claimed by the new owner
+    assert second.get(job_id)["attempts"] == 2
+
+    # The first owner comes back: its outcome is dropped and the documents stay for the new owner
+    first._finish(job_id, DONE, "{}")
+    first._retry(job_id, 1, "late failure")
+    job = second.get(job_id)
+    assert job["status"] == RUNNING and "error" not in job
+    assert (first.job_dir / job_id).exists()
+
+    second._finish(job_id, DONE, '{"status": "CLEAN"}')
+    assert second.get(job_id)["result"] == {"status": "CLEAN"}
+    assert not (first.job_dir / job_id).exists()
+
+
+@_with_queue
+def test_retries_run_out(make_queue):
+    queue = make_queue(max_attempts=2)
+    job_id = queue.submit(_documents())
+    queue._claim()
+    queue._retry(job_id, 1, "OCR timed out")
+    job = queue.get(job_id)
+    assert job["status"] == QUEUED and job["error"] == "OCR timed out"
+    assert queue._claim() is None  # backing off
+    _set(queue, job_id, run_after=time.time() - 1)
+    queue._claim()
+    queue._retry(job_id, 2, "OCR timed out again")
+    job = queue.get(job_id)
+    assert job["status"] == FAILED and job["attempts"] == 2 and job["error"] == "OCR timed out again"
+    assert not (queue.job_dir / job_id).exists()
+
+
+@_with_queue
+def test_purge_deletes_old_finished_jobs(make_queue):
+    queue = make_queue(retention=3600)
+    old, recent, waiting = (queue.submit(_documents()) for _ in range(3))
+    for job_id in (old, recent):
+        _set(queue, job_id, status=DONE, result="{}", finished_at=time.time())
+    _set(queue, old, finished_at=time.time() - 7200)
+    assert queue.purge() == 1
+    assert queue.get(old) is None
+    assert queue.get(recent)["status"] == DONE
+    assert queue.get(waiting)["status"] == QUEUED
+    queue.retention = 0
+    assert queue.purge() == 0  # 0 keeps finished jobs forever
+
+
+@_with_queue
+def test_stop_requeues_running_jobs(make_queue):
+    queue = make_queue(workers=1)
+    job_id = queue.submit(_documents())
+
+    async def run():
+        started = asyncio.Event()
+
+        async def handler(documents):
+            started.set()
+            await asyncio.Event().wait()  # never finishes
+
+        queue.start(handler)
+        await asyncio.wait_for(started.wait(), 5)
+        assert queue.get(job_id)["status"] == RUNNING
+        await queue.stop()
+
+    asyncio.run(run())
+    job = queue.get(job_id)
+    assert job["status"] == QUEUED and job["attempts"] == 0
+    assert (queue.job_dir / job_id).exists()
+
+
+@_with_queue
+def test_worker_survives_database_errors(make_queue):
+    queue = make_queue(workers=1)
+    job_id = queue.submit(_documents())
+    claim = queue._claim
+    calls = []
+
+    def flaky_claim():
+        calls.append(True)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return claim()
+
+    async def run():
+        async def handler(documents):
+            assert Path(documents[0]["path"]).read_bytes() == NOTES
+            return {"status": "CLEAN"}
+
+        with mock.patch("backend.services.job_queue.POLL_INTERVAL", 0.01), mock.patch.object(queue, "_claim", flaky_claim):
+            queue.start(handler)
+            for _ in range(500):
+                if queue.get(job_id)["status"] == DONE:
+                    break
+                await asyncio.sleep(0.01)
+            await queue.stop()
+
+    asyncio.run(run())
+    assert len(calls) > 1
+    assert queue.get(job_id)["result"] == {"status": "CLEAN"}
+
+
+if __name__ == "__main__":
+    test_submit_is_atomic_at_max_queued()
+    test_expired_lease_is_requeued_and_old_owner_ignored()
+    test_retries_run_out()
+    test_purge_deletes_old_finished_jobs()
+    test_stop_requeues_running_jobs()
+    test_worker_survives_database_errors()
+    print("All job queue tests passed.")
@@ -0,0 +1,73 @@
+"""
+Parity check: the NumPy scorers (model_bundle.npz, memory-mapped model.flat) must match the sklearn pickles.
+Run from project root: python -m pytest test_numpy_inference.py  (or python test_numpy_inference.py)
+"""
+import csv
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from backend.ml.infer import BUNDLE_PATH, FLAT_PATH, MODEL_PATH, SMOKE_TEXTS, VECTORIZER_PATH, FlatScorer, NumpyScorer
+from backend.services.text_cleaner import clean_text
+
+TRAINING_CSV = Path(__file__).resolve().parent / "backend" / "data" / "training_data.csv"
+
+EXTRA_TEXTS = [
+    "",
+    "no known words here zzz",
+    "BURNS 35% TBSA!!! Ventilator; ICU; grafting",
+    "Ünïcödé burns 12 % tbsa — dressing",
+    "burns burns burns 60% 60% tbsa tbsa",
+]
+
+
+def _texts() -> list:
+    with open(TRAINING_CSV, encoding="utf-8", newline="") as f:
+        texts = [row["text"] for row in csv.DictReader(f)]
+    return [clean_text(t) for t in texts + list(SMOKE_TEXTS) + EXTRA_TEXTS]
+
+
+def test_numpy_scorer_matches_sklearn():
+    model = joblib.load(MODEL_PATH)
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    scorer = NumpyScorer.load(BUNDLE_PATH)
+    texts = _texts()
+
+    X = vectorizer.transform(texts)
+    rows = scorer.transform(texts)
+    dense = np.zeros(X.shape)
+    for r, (idx, weights) in enumerate(rows):
+        dense[r, idx] = weights
+    np.testing.assert_allclose(dense, X.toarray(), rtol=1e-12, atol=1e-12)
+
+    np.testing.assert_allclose(scorer.decision_function(rows), model.decision_function(X), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(scorer.predict_proba(rows), model.predict_proba(X), rtol=1e-9, atol=1e-12)
+    assert scorer.predict(rows).tolist() == model.predict(X).tolist()
+
+
+def test_flat_scorer_matches_sklearn():
+    model = joblib.load(MODEL_PATH)
+    vectorizer = joblib.load(VECTORIZER_PATH)
+    scorer = FlatScorer.load(FLAT_PATH)
+    texts = _texts()
+
+    # model.flat orders features by sorted term; map them back to sklearn columns
+    X = vectorizer.transform(texts)
+    n, rows, features, weights = scorer.transform(texts)
+    columns = np.array([vectorizer.vocabulary_[t.decode("utf-8")] for t in scorer.vocab.tolist()])
+    dense = np.zeros(X.shape)
+    dense[rows, columns[features]] = weights
+    np.testing.assert_allclose(dense, X.toarray(), rtol=1e-6, atol=1e-7)
+
+    batch = (n, rows, features, weights)
+    np.testing.assert_allclose(scorer.decision_function(batch), model.decision_function(X), rtol=1e-5, atol=1e-5)
+    np.testing.assert_allclose(scorer.predict_proba(batch), model.predict_proba(X), rtol=1e-5, atol=1e-6)
+    assert scorer.predict(batch).tolist() == model.predict(X).tolist()
+
+
+if __name__ == "__main__":
+    test_numpy_scorer_matches_sklearn()
+    print("NumPy scorer matches sklearn")
+    test_flat_scorer_matches_sklearn()
+    print("Memory-mapped scorer matches sklearn")
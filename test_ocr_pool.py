@@ -0,0 +1,96 @@
+"""
+OCR worker pool, with a stand-in for easyocr: same-size images of a job are read by one
+readtext_batched call, warm_up gives back the permits it took when it times out, and recognize
+cancels the jobs it already queued when the queue fills up.
+Run from project root: python -m pytest test_ocr_pool.py  (or python test_ocr_pool.py)
+"""
+import sys
+import threading
+import types
+from unittest import mock
+
+from backend.services.ocr_pool import OCRQueueFull, OCRWorkerPool
+
+
+class FakeImage:
+    def __init__(self, data: bytes):
+        size, self.text = data.decode().split(":")
+        self.shape = tuple(int(n) for n in size.split("x"))
+
+
+class FakeReader:
+    """Images are b"<w>x<h>:<text>"; records the calls it gets."""
+    calls = []
+    loaded = None  # set to a threading.Event to hold the reader load
+
+    def __init__(self, languages, gpu=False):
+        if FakeReader.loaded is not None:
+            FakeReader.loaded.wait()
+
+    def readtext(self, image, detail=0, batch_size=1):
+        FakeReader.calls.append(("readtext", 1))
+        return FakeImage(image).text.split()
+
+    def readtext_batched(self, images, detail=0, batch_size=1):
+        assert len({img.shape for img in images}) == 1, "readtext_batched needs one image size"
+        FakeReader.calls.append(("readtext_batched", len(images)))
+        return [img.text.split() for img in images]
+
+
+def _fake_easyocr():
+    easyocr = types.ModuleType("easyocr")
+    easyocr.Reader = FakeReader
+    utils = types.ModuleType("easyocr.utils")
+    utils.reformat_input = lambda image: (FakeImage(image), None)
+    easyocr.utils = utils
+    return mock.patch.dict(sys.modules, {"easyocr": easyocr, "easyocr.utils": utils})
+
+
+def test_same_size_images_are_batched():
+    FakeReader.calls = []
+    images = [b"640x480:burn wound", b"100x100:tbsa 30%", b"640x480:right arm", b"640x480:dressing"]
+    with _fake_easyocr():
+        pool = OCRWorkerPool(["en"], workers=1, batch_size=8)
+        try:
+            texts = pool.recognize(images, timeout=5)
+        finally:
+            pool.shutdown()
+    assert texts == ["burn wound", "tbsa 30%", "right arm", "dressing"]
+    assert sorted(FakeReader.calls) == [("readtext", 1), ("readtext_batched", 3)]
+
+
+def test_warm_up_timeout_returns_its_permits():
+    FakeReader.loaded = threading.Event()
+    with _fake_easyocr():
+        pool = OCRWorkerPool(["en"], workers=2)
+        try:
+            pool.start()
+            pool._ready.release()  # as if one reader had loaded
+            assert pool.warm_up(timeout=0.05) is False
+            FakeReader.loaded.set()
+            assert pool.warm_up(timeout=5) is True
+            assert pool.warm_up(timeout=0) is True
+        finally:
+            FakeReader.loaded.set()
+            FakeReader.loaded = None
+            pool.shutdown()
+
+
+def test_queue_full_cancels_queued_jobs():
+    pool = OCRWorkerPool(["en"], workers=1, queue_size=2, batch_size=1)
+    pool._threads = [object()]  # no workers: jobs stay queued
+    try:
+        pool.recognize([b"1x1:a", b"1x1:b", b"1x1:c"], timeout=1)
+    except OCRQueueFull:
+        pass
+    else:
+        raise AssertionError("expected OCRQueueFull")
+    queued = [pool._jobs.get_nowait() for _ in range(2)]
+    assert all(future.cancelled() for _, future in queued)
+
+
+if __name__ == "__main__":
+    test_same_size_images_are_batched()
+    test_warm_up_timeout_returns_its_permits()
+    test_queue_full_cancels_queued_jobs()
+    print("All OCR pool tests passed.")
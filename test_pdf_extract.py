@@ -0,0 +1,51 @@
+"""
+Parity check: page-parallel PDF extraction must give exactly the text of the serial path, whichever
+process start method the platform offers (forkserver, else spawn).
+Run from project root: python -m pytest test_pdf_extract.py  (or python test_pdf_extract.py)
+"""
+from unittest import mock
+
+from backend.config import PDF_PARALLEL_MIN_PAGES
+from backend.services import pdf_extract
+from backend.services.pdf_extract import extract_pages
+from benchmarks.synthetic import pdf_bill
+
+
+def _parallel(pdf, workers: int) -> list:
+    """extract_pages, failing unless it actually went through the process pool."""
+    with mock.patch.object(pdf_extract, "_get_pool", wraps=pdf_extract._get_pool) as get_pool:
+        pages = extract_pages(pdf, workers=workers, max_pages=0)
+    assert get_pool.called, "parallel branch not taken"
+    return pages
+
+
+def test_parallel_matches_serial():
+    pdf = pdf_bill(max(PDF_PARALLEL_MIN_PAGES, 7))
+    serial = extract_pages(pdf, workers=1, max_pages=0)
+    assert len(serial) >= PDF_PARALLEL_MIN_PAGES
+    assert any(serial)
+    for workers in (2, 3):
+        assert _parallel(pdf, workers) == serial
+
+
+def test_spawn_without_forkserver():
+    pdf = pdf_bill(PDF_PARALLEL_MIN_PAGES)
+    serial = extract_pages(pdf, workers=1, max_pages=0)
+    saved = dict(pdf_extract._pools)
+    pdf_extract._pools.clear()
+    try:
+        with mock.patch("multiprocessing.get_all_start_methods", return_value=["spawn"]):
+            assert pdf_extract._start_method() == "spawn"
+            assert _parallel(pdf, 2) == serial
+        assert pdf_extract._pools[2]._mp_context.get_start_method() == "spawn"
+    finally:
+        for pool in pdf_extract._pools.values():
+            pool.shutdown()
+        pdf_extract._pools.clear()
+        pdf_extract._pools.update(saved)
+
+
+if __name__ == "__main__":
+    test_parallel_matches_serial()
+    test_spawn_without_forkserver()
+    print("Parallel PDF extraction matches serial")
@@ -0,0 +1,119 @@
+"""
+TBSA -> package lookup in the rule engine. A value belongs to the range min_tbsa < v <= max_tbsa, and
+the lowest range also includes its min_tbsa. The bisect path (row_for_tbsa) and the searchsorted
+path (rows_for_tbsa) must agree with each other and with a linear scan, and with the lookup
+src/data/packages used before the interval index, except that negatives no longer fall back to BM001A.
+Run from project root: python -m pytest test_rule_engine.py  (or python test_rule_engine.py)
+"""
+import json
+import math
+import random
+
+from backend.config import POLICY_CATALOGUE
+from backend.services.rule_engine import Catalogue
+
+with open(POLICY_CATALOGUE, "r", encoding="utf-8") as f:
+    BURNS = Catalogue(json.load(f))
+
+# (TBSA, package) on and around the BM001A-D boundaries (0-10, 10-40, 40-60, 60-100)
+BOUNDARIES = [
+    (0, "BM001A"),
+    (0.5, "BM001A"),
+    (10, "BM001A"),
+    (10.5, "BM001B"),
+    (40, "BM001B"),
+    (40.01, "BM001C"),
+    (60, "BM001C"),
+    (61, "BM001D"),
+    (100, "BM001D"),
+    (100.01, None),
+    (150, None),
+    (-0.01, None),
+    (-5, None),
+    (math.nan, None),
+    (math.inf, None),
+    (-math.inf, None),
+]
+
+
+def _scan(catalogue: Catalogue, value: float):
+    """Reference: linear scan with the same interval rule."""
+    ranged = sorted(
+        (p for p in catalogue.packages.values() if p.get("min_tbsa") is not None and p.get("max_tbsa") is not None),
+        key=lambda p: p["min_tbsa"],
+    )
+    for k, p in enumerate(ranged):
+        if p["min_tbsa"] < value <= p["max_tbsa"] or (k == 0 and value == p["min_tbsa"]):
+            return p["package_code"]
+    return None
+
+
+def _legacy(catalogue: Catalogue, value: float):
+    """The lookup src/data/packages.get_recommended_package ran before the interval index."""
+    packages = sorted(catalogue.packages.values(), key=lambda p: p["min_tbsa"])
+    for p in packages:
+        if p["min_tbsa"] < value <= p["max_tbsa"]:
+            return p["package_code"]
+    if value <= 10:
+        return packages[0]["package_code"]
+    return None
+
+
+def _codes(catalogue: Catalogue, values: list) -> tuple:
+    code = lambda row: catalogue.codes[row] if row >= 0 else None
+    return [code(catalogue.row_for_tbsa(v)) for v in values], [code(r) for r in catalogue.rows_for_tbsa(values).tolist()]
+
+
+def test_boundaries():
+    values = [v for v, _ in BOUNDARIES]
+    expected = [code for _, code in BOUNDARIES]
+    scalar, batch = _codes(BURNS, values)
+    assert scalar == expected
+    assert batch == expected
+    assert [_scan(BURNS, v) for v in values] == expected
+
+
+def test_matches_legacy_lookup_except_negatives():
+    rng = random.Random(7)
+    values = [v for v, _ in BOUNDARIES if not math.isnan(v)] + [rng.uniform(-20, 130) for _ in range(2000)]
+    scalar, batch = _codes(BURNS, values)
+    for value, s, b in zip(values, scalar, batch):
+        legacy = _legacy(BURNS, value)
+        if value < 0:
+            assert legacy == "BM001A" and s is None and b is None, value
+        else:
+            assert s == b == legacy, value
+
+
+def test_paths_agree_on_catalogue_with_gaps():
+    # Ranges in shuffled order with holes between some of them, plus an unranged package
+    packages = [
+        {"package_code": f"SX{i:03d}", "min_tbsa": lo, "max_tbsa": hi, "max_amount": 1000.0}
+        for i, (lo, hi) in enumerate([(5, 10), (10, 12.5), (20, 30), (30, 31), (50, 75), (80, 100)])
+    ]
+    random.Random(3).shuffle(packages)
+    packages.append({"package_code": "NOTBSA", "max_amount": 500.0})
+    catalogue = Catalogue(packages)
+    rng = random.Random(11)
+    edges = [e for p in packages if "min_tbsa" in p for e in (p["min_tbsa"], p["max_tbsa"])]
+    values = edges + [e + d for e in edges for d in (-1e-9, 1e-9)] + [rng.uniform(-5, 110) for _ in range(2000)]
+    scalar, batch = _codes(catalogue, values)
+    assert scalar == batch == [_scan(catalogue, v) for v in values]
+    # The lowest range includes its min; the others, and the holes between ranges, do not
+    lowest = next(p["package_code"] for p in packages if p.get("min_tbsa") == 5)
+    assert catalogue.codes[catalogue.row_for_tbsa(5)] == lowest
+    assert catalogue.row_for_tbsa(20) == -1 and catalogue.row_for_tbsa(15) == -1
+
+
+def test_empty_catalogue():
+    catalogue = Catalogue([])
+    assert catalogue.row_for_tbsa(20) == -1
+    assert catalogue.rows_for_tbsa([0, 20, math.nan]).tolist() == [-1, -1, -1]
+
+
+if __name__ == "__main__":
+    test_boundaries()
+    test_matches_legacy_lookup_except_negatives()
+    test_paths_agree_on_catalogue_with_gaps()
+    test_empty_catalogue()
+    print("All rule engine TBSA tests passed.")
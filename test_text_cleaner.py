@@ -0,0 +1,79 @@
+"""
+Parity check: the str.translate cleaner must give exactly the output of the old regex cleaner.
+Run from project root: python -m pytest test_text_cleaner.py  (or python test_text_cleaner.py)
+"""
+import csv
+import random
+import re
+import sys
+from pathlib import Path
+
+from backend.services.text_cleaner import clean_text, clean_text_chunks, clean_texts
+
+TRAINING_CSV = Path(__file__).resolve().parent / "backend" / "data" / "training_data.csv"
+
+
+def _regex_clean_text(text: str) -> str:
+    """The cleaner previously copied into text_cleaner, infer and train."""
+    if not isinstance(text, str) or not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r"[^a-z0-9%\s]", "", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def _training_texts() -> list:
+    with open(TRAINING_CSV, encoding="utf-8", newline="") as f:
+        return [row["text"] for row in csv.DictReader(f)]
+
+
+def test_training_csv_parity():
+    for text in _training_texts():
+        assert clean_text(text) == _regex_clean_text(text), text
+
+
+def test_every_code_point():
+    for code in range(sys.maxunicode + 1):
+        if 0xD800 <= code < 0xE000:
+            continue
+        text = f"a{chr(code)}b {chr(code)}"
+        assert clean_text(text) == _regex_clean_text(text), hex(code)
+
+
+def test_chunked_matches_whole():
+    rng = random.Random(7)
+    texts = _training_texts()
+    alphabet = "aZ9% \t\n\xa0!.,-ÜİΣ"
+    texts += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(2000)]
+    texts.append("\n".join(_training_texts()))
+    for text in texts:
+        cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randint(0, 6))))
+        chunks = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+        assert "".join(clean_text_chunks(chunks)) == _regex_clean_text(text), chunks
+
+
+def test_bulk_matches_per_text():
+    rng = random.Random(11)
+    alphabet = "aZ9% \t\n\xa0!.,-ÜİΣ\x00"
+    texts = _training_texts() + ["", None, float("nan"), "  ", "a\x00b"]
+    texts += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40))) for _ in range(2000)]
+    assert clean_texts(texts) == [clean_text(t) for t in texts]
+    texts = [t for t in texts if not isinstance(t, str) or "\x00" not in t]
+    assert clean_texts(texts) == [clean_text(t) for t in texts]
+    assert clean_texts([]) == []
+
+
+def test_non_string():
+    assert clean_text(None) == ""
+    assert clean_text("") == ""
+    assert "".join(clean_text_chunks([])) == ""
+
+
+if __name__ == "__main__":
+    test_training_csv_parity()
+    test_every_code_point()
+    test_chunked_matches_whole()
+    test_bulk_matches_per_text()
+    test_non_string()
+    print("clean_text matches the regex cleaner")
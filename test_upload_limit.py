@@ -0,0 +1,116 @@
+"""
+Upload limit: a request over AYUSHMA_UPLOAD_MAX_MB gets 413, whether it declares its length or streams
+a chunked body, and a streamed body is refused as soon as the limit is crossed, leaving no spool files.
+Spool files are only ever written off the event loop.
+Run from project root: python -m pytest test_upload_limit.py  (or python test_upload_limit.py)
+"""
+import asyncio
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+import httpx
+
+from backend import app as app_module
+from backend.services import upload_stream
+
+LIMIT = 256 * 1024
+CHUNK = 16 * 1024
+BOUNDARY = "ayushma-test-boundary"
+
+
+def _body_parts(bill_size: int) -> list:
+    head = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"clinical_notes\"; filename=\"notes.txt\"\r\n\r\n"
+        "burns 30% tbsa\r\n"
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"hospital_bill\"; filename=\"bill.txt\"\r\n\r\n"
+    ).encode()
+    bill = [b"Total Rs 1000\n" * (CHUNK // 14)] * (bill_size // CHUNK)
+    return [head, *bill, f"\r\n--{BOUNDARY}--\r\n".encode()]
+
+
+async def _post(content, headers: dict) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(
+            "/audit", content=content, headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **headers}
+        )
+
+
+def _with_limits(test):
+    def run():
+        saved = app_module.UPLOAD_MAX_BYTES, upload_stream.UPLOAD_SPOOL_THRESHOLD, upload_stream.UPLOAD_SPOOL_DIR
+        with tempfile.TemporaryDirectory() as spool_dir:
+            app_module.UPLOAD_MAX_BYTES = LIMIT
+            upload_stream.UPLOAD_SPOOL_THRESHOLD = CHUNK
+            upload_stream.UPLOAD_SPOOL_DIR = spool_dir
+            try:
+                test(spool_dir)
+            finally:
+                app_module.UPLOAD_MAX_BYTES, upload_stream.UPLOAD_SPOOL_THRESHOLD, upload_stream.UPLOAD_SPOOL_DIR = saved
+    run.__name__ = test.__name__
+    return run
+
+
+@_with_limits
+def test_declared_length_over_limit(spool_dir):
+    body = b"".join(_body_parts(4 * LIMIT))
+    response = asyncio.run(_post(body, {"Content-Length": str(len(body))}))
+    assert response.status_code == 413, response.text
+    assert os.listdir(spool_dir) == []
+
+
+@_with_limits
+def test_streamed_body_over_limit(spool_dir):
+    parts = _body_parts(4 * LIMIT)
+    sent = []
+
+    async def stream():
+        for part in parts:
+            sent.append(len(part))
+            yield part
+
+    response = asyncio.run(_post(stream(), {}))
+    assert response.status_code == 413, response.text
+    # Refused once the limit was crossed, not after the whole body arrived
+    assert sum(sent) <= LIMIT + CHUNK + len(parts[0]) < sum(len(part) for part in parts)
+    assert os.listdir(spool_dir) == []
+
+
+@_with_limits
+def test_spool_writes_stay_off_the_event_loop(spool_dir):
+    # The first chunk stops on what could be a boundary ("\r\n--"), so python-multipart delivers it
+    # with the second chunk: two pieces, each fitting in memory, that cross the threshold together
+    head = (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"hospital_bill\"; filename=\"bill.txt\"\r\n\r\n"
+    ).encode()
+    chunks = [head + b"a" * (CHUNK - 10) + b"\r\n--", b"b" * 8, f"\r\n--{BOUNDARY}--\r\n".encode()]
+    spooled_from = []
+    named_temporary_file = tempfile.NamedTemporaryFile
+
+    def recording_spool(*args, **kwargs):
+        spooled_from.append(threading.current_thread() is threading.main_thread())
+        return named_temporary_file(*args, **kwargs)
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    request = SimpleNamespace(headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"}, stream=stream)
+    with mock.patch.object(upload_stream.tempfile, "NamedTemporaryFile", recording_spool):
+        form = asyncio.run(upload_stream.read_multipart(request, upload_stream.ByteBudget(LIMIT)))
+    try:
+        (bill,) = form.files["hospital_bill"]
+        assert bill.path is not None and bill.read_bytes() == b"a" * (CHUNK - 10) + b"\r\n--" + b"b" * 8
+        assert spooled_from == [False]  # created (and written) in a worker thread
+    finally:
+        form.close()
+
+
+if __name__ == "__main__":
+    test_declared_length_over_limit()
+    test_streamed_body_over_limit()
+    test_spool_writes_stay_off_the_event_loop()
+    print("Oversized uploads get 413")